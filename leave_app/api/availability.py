@@ -0,0 +1,211 @@
+"""
+Interval queries over leave requests.
+
+"Overlaps [start, end]" becomes a bounded range scan on start_date: an
+overlapping request must start no earlier than start - span, where span is
+the longest stored request (request_span_days). The span is re-read at most
+every SPAN_RECHECK_SECONDS and raised at once when this process stores a
+longer request, so another worker's longer request can be missed by the team
+queries for at most that long. The per-employee overlap check that guards
+writes does not rely on the span: one employee's requests are a short range
+on the (employee_id, start_date, end_date) index.
+
+Request length is not limited unless LEAVE_MAX_REQUEST_DAYS is set.
+
+Calendar occupancy (headcount on leave per day) is one such range query
+followed by a sweep over a difference array, so its cost is
+O(requests + days) regardless of how many days are asked for.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import Integer, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from . import models, workdays
+
+# Optional cap on request length in days; unset (the default) means no cap
+MAX_REQUEST_DAYS: Optional[int] = int(os.getenv("LEAVE_MAX_REQUEST_DAYS") or 0) or None
+ACTIVE_STATUSES = ("pending", "approved")
+MAX_OCCUPANCY_DAYS = 366
+SPAN_RECHECK_SECONDS = float(os.getenv("LEAVE_SPAN_RECHECK_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+class days_between(FunctionElement):
+    """Whole days from the first date argument to the second."""
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(days_between)
+def _days_between(element, compiler, **kw):
+    lo, hi = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"({hi} - {lo})"
+
+
+@compiles(days_between, "sqlite")
+def _days_between_sqlite(element, compiler, **kw):
+    lo, hi = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"CAST(julianday({hi}) - julianday({lo}) AS INTEGER)"
+
+
+@compiles(days_between, "mssql")
+def _days_between_mssql(element, compiler, **kw):
+    lo, hi = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"DATEDIFF(day, {lo}, {hi})"
+
+
+_span_lock = threading.Lock()
+_span_days = 1
+_span_checked_at: Optional[float] = None
+
+
+def request_span_days(db) -> int:
+    """Length in days of the longest leave request stored or noted so far (at least 1)."""
+    global _span_days, _span_checked_at
+    with _span_lock:
+        if _span_checked_at is not None and time.monotonic() - _span_checked_at < SPAN_RECHECK_SECONDS:
+            return _span_days
+        R = models.LeaveRequest
+        longest = (db.execute(select(func.max(days_between(R.start_date, R.end_date)))).scalar() or 0) + 1
+        # Never shrink: a request noted by this process may not be committed yet
+        _span_days = max(_span_days, longest)
+        _span_checked_at = time.monotonic()
+        return _span_days
+
+
+def note_request_span(start: date, end: date) -> None:
+    """Widen the cached span for a request this process is storing."""
+    global _span_days
+    with _span_lock:
+        _span_days = max(_span_days, (end - start).days + 1)
+
+
+def _overlap_criteria(start: date, end: date, statuses):
+    R = models.LeaveRequest
+    return (R.start_date <= end, R.end_date >= start, R.status.in_(statuses))
+
+
+def overlapping(db, start: date, end: date, statuses=ACTIVE_STATUSES):
+    """SELECT of requests (joined with their employee) overlapping [start, end]."""
+    R = models.LeaveRequest
+    return (
+        select(R, models.Employee)
+        .join(models.Employee, models.Employee.id == R.employee_id)
+        .where(
+            R.start_date >= start - timedelta(days=request_span_days(db) - 1),
+            *_overlap_criteria(start, end, statuses),
+        )
+    )
+
+
+def find_overlap(db, employee_id: int, start: date, end: date, exclude_id: Optional[int] = None) -> Optional[models.LeaveRequest]:
+    """First active request of ``employee_id`` overlapping [start, end], if any."""
+    R = models.LeaveRequest
+    # Exact for any request length; the employee prefix keeps the index range short
+    stmt = select(R).where(R.employee_id == employee_id, *_overlap_criteria(start, end, ACTIVE_STATUSES))
+    if exclude_id is not None:
+        stmt = stmt.where(R.id != exclude_id)
+    return db.scalars(stmt.limit(1)).first()
+
+
+def team_size(db, team: Optional[str]) -> int:
+    stmt = select(func.count(models.Employee.id))
+    if team is not None:
+        stmt = stmt.where(models.Employee.team == team)
+    return db.execute(stmt).scalar_one()
+
+
+def who_is_off(db, start: date, end: date, team: Optional[str] = None) -> list[tuple[models.LeaveRequest, models.Employee]]:
+    stmt = overlapping(db, start, end)
+    if team is not None:
+        stmt = stmt.where(models.Employee.team == team)
+    stmt = stmt.order_by(models.LeaveRequest.start_date, models.LeaveRequest.employee_id)
+    return [(r, e) for r, e in db.execute(stmt)]
+
+
+def _merge(intervals: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    """Union of inclusive date intervals, so a person is never counted twice on one day."""
+    merged: list[tuple[date, date]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def occupancy(db, start: date, end: date, team: Optional[str] = None) -> dict:
+    """
+    Headcount on leave for every day in [start, end].
+
+    ``on_leave`` counts employees with pending or approved leave, ``approved``
+    only the approved part. Both come from a single sweep: each (clipped)
+    interval adds +1 at its first day and -1 after its last day, and a
+    running sum over the days gives the headcount.
+    """
+    R = models.LeaveRequest
+    stmt = (
+        select(R.employee_id, R.start_date, R.end_date, R.status)
+        .join(models.Employee, models.Employee.id == R.employee_id)
+        .where(
+            R.start_date >= start - timedelta(days=request_span_days(db) - 1),
+            R.start_date <= end,
+            R.end_date >= start,
+            R.status.in_(ACTIVE_STATUSES),
+        )
+    )
+    if team is not None:
+        stmt = stmt.where(models.Employee.team == team)
+
+    active: dict[int, list[tuple[date, date]]] = {}
+    approved: dict[int, list[tuple[date, date]]] = {}
+    for employee_id, lo, hi, status in db.execute(stmt):
+        interval = (max(lo, start), min(hi, end))
+        active.setdefault(employee_id, []).append(interval)
+        if status == "approved":
+            approved.setdefault(employee_id, []).append(interval)
+
+    n = (end - start).days + 1
+
+    def _sweep(by_employee: dict[int, list[tuple[date, date]]]) -> list[int]:
+        diff = [0] * (n + 1)
+        for intervals in by_employee.values():
+            for lo, hi in _merge(intervals):
+                diff[(lo - start).days] += 1
+                diff[(hi - start).days + 1] -= 1
+        counts, running = [], 0
+        for i in range(n):
+            running += diff[i]
+            counts.append(running)
+        return counts
+
+    on_leave, approved_counts = _sweep(active), _sweep(approved)
+    days = []
+    for i in range(n):
+        d = start + timedelta(days=i)
+        days.append({
+            "day": d,
+            "working_day": workdays.year_calendar(d.year, workdays.DEFAULT_REGION).is_working_day(d),
+            "on_leave": on_leave[i],
+            "approved": approved_counts[i],
+            "pending": on_leave[i] - approved_counts[i],
+        })
+    peak = max(on_leave, default=0)
+    return {
+        "start_date": start,
+        "end_date": end,
+        "team": team,
+        "team_size": team_size(db, team),
+        "max_on_leave": peak,
+        "peak_days": [x["day"] for x in days if peak and x["on_leave"] == peak],
+        "days": days,
+    }
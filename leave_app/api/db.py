@@ -3,9 +3,12 @@ import logging
 from pathlib import Path
 from typing import Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.sql.elements import TextClause
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from .write_queue import WriteQueue
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -146,6 +149,45 @@ if "?" in DATABASE_URL:
     params = DATABASE_URL.split("?", 1)[1]
     logger.info(f"Final connection parameters: {params}")
 
+# SQLite production tuning: WAL journal, relaxed fsync, mmap reads and a busy
+# timeout so concurrent workers wait for the write lock instead of failing.
+SQLITE_TUNING = os.getenv("LEAVE_SQLITE_TUNING", "true").lower() in ("1", "true", "yes")
+SQLITE_JOURNAL_MODE = os.getenv("LEAVE_SQLITE_JOURNAL_MODE", "wal").upper()
+SQLITE_SYNCHRONOUS = os.getenv("LEAVE_SQLITE_SYNCHRONOUS", "normal").upper()
+SQLITE_MMAP_SIZE = int(os.getenv("LEAVE_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("LEAVE_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# In-process single-writer queue that batches small write transactions
+SQLITE_WRITE_QUEUE = os.getenv("LEAVE_SQLITE_WRITE_QUEUE", "true").lower() in ("1", "true", "yes")
+SQLITE_WRITE_BATCH = int(os.getenv("LEAVE_SQLITE_WRITE_BATCH", "64"))
+
+
+def _configure_sqlite(eng, begin: str | None = None) -> None:
+    """
+    Apply per-connection pragmas to a SQLite engine.
+    When ``begin`` is given, pysqlite's implicit transaction handling is
+    disabled and that statement (e.g. "BEGIN IMMEDIATE") is emitted instead,
+    which also makes SAVEPOINTs behave correctly.
+    """
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, _record):
+        if begin:
+            dbapi_conn.isolation_level = None
+        cur = dbapi_conn.cursor()
+        try:
+            cur.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+            cur.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+            cur.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+            cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cur.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cur.close()
+
+    if begin:
+        @event.listens_for(eng, "begin")
+        def _on_begin(conn):
+            conn.exec_driver_sql(begin)
+
+
 try:
     connect_args: dict = {"timeout": 30} if RESOLVED_PROVIDER == "mssql" else {}
     if RESOLVED_PROVIDER == "sqlite":
@@ -157,6 +199,12 @@ try:
         echo=False,  # Set to True for SQL query logging
         connect_args=connect_args
     )
+    if RESOLVED_PROVIDER == "sqlite" and SQLITE_TUNING:
+        _configure_sqlite(engine)
+        logger.info(
+            f"SQLite tuning enabled: journal_mode={SQLITE_JOURNAL_MODE}, synchronous={SQLITE_SYNCHRONOUS}, "
+            f"mmap_size={SQLITE_MMAP_SIZE}, busy_timeout={SQLITE_BUSY_TIMEOUT_MS}ms"
+        )
     # Test the connection
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
@@ -188,6 +236,22 @@ except Exception as e:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Writes go through their own engine/session factory. For SQLite the writer
+# takes the lock up front (BEGIN IMMEDIATE) so it never fails mid-transaction
+# on a read->write lock upgrade. expire_on_commit=False keeps returned objects
+# readable after the writer session has closed.
+if RESOLVED_PROVIDER == "sqlite" and SQLITE_TUNING:
+    writer_engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args={"check_same_thread": False})
+    _configure_sqlite(writer_engine, begin="BEGIN IMMEDIATE")
+else:
+    writer_engine = engine
+WriterSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=writer_engine, expire_on_commit=False)
+
+WRITE_QUEUE: Optional[WriteQueue] = None
+if RESOLVED_PROVIDER == "sqlite" and SQLITE_TUNING and SQLITE_WRITE_QUEUE:
+    WRITE_QUEUE = WriteQueue(WriterSessionLocal, max_batch=SQLITE_WRITE_BATCH)
+    logger.info(f"SQLite write queue enabled (batch size {SQLITE_WRITE_BATCH})")
+
 
 def get_db():
     db = SessionLocal()
@@ -196,6 +260,75 @@ def get_db():
     finally:
         db.close()
 
+
+def run_write(job):
+    """
+    Run ``job(session)`` in a write transaction and return its result.
+    On SQLite with the write queue enabled the job is executed by the single
+    writer thread (possibly batched with other jobs); otherwise it runs in a
+    fresh writer session and is committed immediately.
+    """
+    if WRITE_QUEUE is not None:
+        return WRITE_QUEUE.submit(job)
+    with WriterSessionLocal() as session:
+        result = job(session)
+        session.commit()
+        return result
+
+CHANGE_TRACKING_COLUMNS = ("row_version", "updated_at")
+
+def _added_column_constraint(col) -> str:
+    """NULL-ability and default for ALTER TABLE ... ADD of a model column."""
+    default = col.server_default
+    if col.nullable or default is None:
+        return "NULL"
+    if RESOLVED_PROVIDER == "sqlite" and not isinstance(default.arg, (str, TextClause)):
+        return "NULL"  # SQLite only adds columns with constant defaults; backfilled instead
+    arg = default.arg if isinstance(default.arg, str) else default.arg.compile(dialect=engine.dialect)
+    return f"NOT NULL DEFAULT {arg}"
+
+def _backfill(conn, table, col) -> None:
+    """Set NULLs in ``col`` to its Python-side default, if it has a scalar or callable one."""
+    if col.default is None or not (col.default.is_scalar or col.default.is_callable):
+        return
+    value = col.default.arg if col.default.is_scalar else col.default.arg(None)
+    result = conn.execute(table.update().where(col.is_(None)).values({col.name: value}))
+    if result.rowcount:
+        logger.info(f"Backfilled {result.rowcount} NULL {table.name}.{col.name} values")
+
+def ensure_schema() -> None:
+    """
+    Create missing tables, then add columns and indexes that were introduced
+    after a database was first created (create_all only handles new tables).
+    New columns are added NOT NULL with their server default where the
+    database supports that, otherwise as NULLable and backfilled from the
+    Python-side default. Change-tracking columns (row_version, updated_at)
+    are backfilled on every start: rows inserted by plain SQL into a schema
+    without defaults have NULLs there, which the ORM's version check and the
+    ?since= feeds cannot handle.
+    """
+    Base.metadata.create_all(bind=engine)
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing_cols = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing_cols:
+                    continue
+                col_type = col.type.compile(dialect=engine.dialect)
+                add = "ADD COLUMN" if RESOLVED_PROVIDER == "sqlite" else "ADD"
+                conn.execute(text(f"ALTER TABLE {table.name} {add} {col.name} {col_type} {_added_column_constraint(col)}"))
+                logger.info(f"Added column {table.name}.{col.name}")
+                _backfill(conn, table, col)
+            for name in CHANGE_TRACKING_COLUMNS:
+                if name in table.columns and name in existing_cols:
+                    _backfill(conn, table, table.columns[name])
+            existing_idx = {i["name"] for i in insp.get_indexes(table.name)}
+            for idx in table.indexes:
+                if idx.name not in existing_idx:
+                    idx.create(bind=conn)
+                    logger.info(f"Created index {idx.name}")
+
 # Optional bootstrap helpers (used by main.py)
 def should_seed() -> bool:
     return os.getenv("LEAVE_SEED_ON_START", "true").lower() in ("1", "true", "yes")
@@ -0,0 +1,248 @@
+"""
+In-memory employee directory for name/email lookups.
+
+The index keeps two structures over each employee's name and email:
+
+* a sorted token list plus token -> ids postings, for prefix search
+  ("ali" -> "alice") via bisect
+* trigram -> ids postings, for substring and typo-tolerant search
+  ("lice", "alcie")
+
+It is loaded with a plain select of every employee and then kept current
+from the employee change feed (sync.changes): a search refreshes it when the
+last refresh is older than DIRECTORY_REFRESH_SECONDS, pulling only rows
+changed since its cursor. Writes made by this process are applied directly
+(``upsert``) so they are searchable immediately. The feed holds rows back
+for SYNC_SETTLE_SECONDS, so a query the index cannot answer falls back to a
+LIKE query on the table (``search_db``) and finds people created a moment
+ago by another process.
+"""
+
+import os
+import re
+import threading
+import time
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Optional
+
+from sqlalchemy import func, or_, select
+
+from . import models, sync
+from .db import SessionLocal
+
+DIRECTORY_REFRESH_SECONDS = float(os.getenv("LEAVE_DIRECTORY_REFRESH_SECONDS", "2"))
+MIN_FUZZY_SIMILARITY = 0.5
+DB_MATCH_SCORE = 0.7  # a LIKE match is a substring match
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_TOKEN_SPLIT.split(text.lower())).strip()
+
+
+def _local_part(email: str) -> str:
+    # The domain is shared by most people and would match everyone
+    return email.lower().split("@", 1)[0]
+
+
+def _tokens(name: str, email: str) -> set[str]:
+    email = email.lower()
+    tokens = {t for t in _TOKEN_SPLIT.split(name.lower()) if t}
+    tokens.update(t for t in _TOKEN_SPLIT.split(_local_part(email)) if t)
+    tokens.add(email)
+    tokens.add(_normalize(name))  # "alice johnson" matches a full-name prefix
+    return tokens
+
+
+def _person(emp: models.Employee) -> dict[str, Any]:
+    return {"id": emp.id, "name": emp.name, "email": emp.email, "team": emp.team}
+
+
+def _trigrams(text: str) -> set[str]:
+    """Trigrams of each word, padded so word starts and ends carry weight."""
+    grams: set[str] = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class DirectoryIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()  # guards the index structures
+        self._refresh_lock = threading.Lock()  # one change-feed reader at a time
+        self._people: dict[int, dict[str, Any]] = {}
+        self._token_ids: dict[str, set[int]] = {}
+        self._sorted_tokens: list[str] = []
+        self._trigram_ids: dict[str, set[int]] = {}
+        self._cursor: Optional[str] = None
+        self._refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._people)
+
+    # -- maintenance --------------------------------------------------------
+
+    def _add(self, person: dict[str, Any]) -> None:
+        pid = person["id"]
+        person["_tokens"] = _tokens(person["name"], person["email"])
+        person["_text"] = _normalize(f"{person['name']} {_local_part(person['email'])}")
+        person["_trigrams"] = _trigrams(person["_text"])
+        person["_sort"] = person["name"].lower()
+        self._people[pid] = person
+        for tok in person["_tokens"]:
+            ids = self._token_ids.get(tok)
+            if ids is None:
+                self._token_ids[tok] = {pid}
+                insort(self._sorted_tokens, tok)
+            else:
+                ids.add(pid)
+        for tri in person["_trigrams"]:
+            self._trigram_ids.setdefault(tri, set()).add(pid)
+
+    def _remove(self, pid: int) -> None:
+        person = self._people.pop(pid, None)
+        if person is None:
+            return
+        for tok in person["_tokens"]:
+            ids = self._token_ids[tok]
+            ids.discard(pid)
+            if not ids:
+                del self._token_ids[tok]
+                del self._sorted_tokens[bisect_left(self._sorted_tokens, tok)]
+        for tri in person["_trigrams"]:
+            ids = self._trigram_ids[tri]
+            ids.discard(pid)
+            if not ids:
+                del self._trigram_ids[tri]
+
+    def upsert(self, emp: models.Employee) -> None:
+        with self._lock:
+            self._remove(emp.id)
+            self._add(_person(emp))
+
+    def forget(self, employee_id: int) -> None:
+        with self._lock:
+            self._remove(employee_id)
+
+    def load(self, db) -> int:
+        """Rebuild the index from the employees table. Returns the number loaded."""
+        with self._refresh_lock:
+            # The feed resumes a settle window before the read, so rows committed
+            # around it are applied again instead of being skipped
+            cursor = sync.encode_cursor(models.utcnow() - timedelta(seconds=sync.SYNC_SETTLE_SECONDS), 0)
+            people = [_person(e) for e in db.scalars(select(models.Employee))]
+            with self._lock:
+                self._people.clear()
+                self._token_ids.clear()
+                self._sorted_tokens.clear()
+                self._trigram_ids.clear()
+                for person in people:
+                    self._add(person)
+            self._cursor = cursor
+            self._refreshed_at = time.monotonic()
+        return len(people)
+
+    def refresh(self, db) -> int:
+        """Apply employee changes since the last refresh (loading the index first). Returns the number applied."""
+        if self._cursor is None:
+            return self.load(db)
+        applied = 0
+        with self._refresh_lock:
+            while True:
+                # Read outside the index lock so searches are not blocked on the database
+                page = sync.changes(db, models.Employee, self._cursor, sync.MAX_SYNC_PAGE)
+                people = [_person(e) for e in page["items"]]
+                with self._lock:
+                    for person in people:
+                        self._remove(person["id"])
+                        self._add(person)
+                applied += len(people)
+                self._cursor = page["next_cursor"]
+                if not page["has_more"]:
+                    break
+            self._refreshed_at = time.monotonic()
+        return applied
+
+    def refresh_if_stale(self) -> None:
+        if time.monotonic() - self._refreshed_at < DIRECTORY_REFRESH_SECONDS:
+            return
+        with SessionLocal() as db:
+            self.refresh(db)
+
+    # -- lookups ------------------------------------------------------------
+
+    def _prefix_ids(self, prefix: str) -> set[int]:
+        found: set[int] = set()
+        i = bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            found |= self._token_ids[self._sorted_tokens[i]]
+            i += 1
+        return found
+
+    def _substring_ids(self, text: str) -> set[int]:
+        """People whose text contains ``text``: intersect the postings of its inner trigrams."""
+        grams = sorted(
+            (self._trigram_ids.get(text[i:i + 3], set()) for i in range(len(text) - 2)),
+            key=len,
+        )
+        if not grams or not grams[0]:
+            return set()
+        candidates = set(grams[0]).intersection(*grams[1:])
+        return {pid for pid in candidates if text in self._people[pid]["_text"]}
+
+    def search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Rank: exact email (1.0, returned alone) > token prefix (0.9) >
+        substring (0.7) > trigram similarity (up to 0.5, typo tolerant).
+        """
+        q = query.strip().lower()
+        if not q:
+            return []
+        norm = _normalize(q)
+        scores: dict[int, float] = {}
+        with self._lock:
+            for pid in self._token_ids.get(q, ()):
+                if self._people[pid]["email"].lower() == q:
+                    scores[pid] = 1.0
+            # Each weaker tier only runs while the stronger ones leave room in the top ``limit``
+            if not scores:
+                for pid in self._prefix_ids(q) | (self._prefix_ids(norm) if norm != q else set()):
+                    scores[pid] = 0.9
+                if len(scores) < limit and len(norm) >= 3:
+                    for pid in self._substring_ids(norm):
+                        scores.setdefault(pid, 0.7)
+                if len(scores) < limit and len(norm) >= 3:
+                    grams = _trigrams(norm)
+                    hits = Counter(pid for tri in grams for pid in self._trigram_ids.get(tri, ()))
+                    for pid, shared in hits.items():
+                        similarity = shared / len(grams)
+                        if pid not in scores and similarity >= MIN_FUZZY_SIMILARITY:
+                            scores[pid] = round(0.5 * similarity, 3)
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda kv: (-kv[1], self._people[kv[0]]["_sort"], kv[0]))
+            return [
+                {k: v for k, v in self._people[pid].items() if not k.startswith("_")} | {"score": score}
+                for pid, score in ranked
+            ]
+
+
+index = DirectoryIndex()
+
+
+def search_db(db, query: str, limit: int = 10) -> list[dict[str, Any]]:
+    """Employees whose name or email contains ``query``, read from the table."""
+    q = query.strip().lower()
+    if not q:
+        return []
+    E = models.Employee
+    stmt = (
+        select(E)
+        .where(or_(func.lower(E.name).contains(q, autoescape=True), func.lower(E.email).contains(q, autoescape=True)))
+        .order_by(E.name, E.id)
+        .limit(limit)
+    )
+    return [_person(e) | {"score": DB_MATCH_SCORE} for e in db.scalars(stmt)]
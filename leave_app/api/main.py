@@ -1,19 +1,27 @@
-from datetime import date
+from datetime import date, timedelta
 from typing import List, Optional
 
+import json
 import os
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+import time
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.concurrency import run_in_threadpool
 
-from .db import Base, SessionLocal, engine, get_db, should_seed, provider
-from . import models, schemas
+from .db import Base, SessionLocal, engine, ensure_schema, get_db, run_write, should_seed, provider
+from . import availability, directory, etags, models, onboarding, outbox, repository, responses, schemas, services, sync, workdays
 
-Base.metadata.create_all(bind=engine)
+ensure_schema()
 
 # Idempotent seed for SQLite or empty DBs
 if should_seed():
-    from sqlalchemy import select
     try:
         with engine.begin() as conn:
             # Check employees count
@@ -34,7 +42,15 @@ if should_seed():
         # Don't block app start on seed issues
         pass
 
-app = FastAPI(title="Leave Application API")
+app = FastAPI(title="Leave Application API", **responses.app_options())
+# gzip only when the client accepts it and the body is worth compressing
+app.add_middleware(GZipMiddleware, minimum_size=responses.GZIP_MIN_SIZE, compresslevel=responses.GZIP_LEVEL)
+
+
+@app.exception_handler(StaleDataError)
+def stale_data_handler(request: Request, exc: StaleDataError):
+    # row_version check failed: another request updated the row first
+    return JSONResponse(status_code=409, content={"detail": "Record was modified by another request; reload and retry"})
 
 
 @app.get("/health")
@@ -44,147 +60,322 @@ def health():
 
 # Employees
 @app.post("/employees", response_model=schemas.Employee)
-def create_employee(emp: schemas.EmployeeCreate, db=Depends(get_db)):
-    existing = db.query(models.Employee).filter(models.Employee.email == emp.email).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Employee with this email already exists")
-    obj = models.Employee(name=emp.name, email=emp.email)
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    # initialize balance
-    bal = models.LeaveBalance(employee_id=obj.id, annual_balance=emp.annual_balance or 20, sick_balance=emp.sick_balance or 10)
-    db.add(bal)
-    db.commit()
+def create_employee(emp: schemas.EmployeeCreate):
+    # employee + balance + event in one transaction; the unique email index catches duplicates
+    try:
+        obj = onboarding.create_employee(emp)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail=onboarding.DUPLICATE_EMAIL)
+    directory.index.upsert(obj)
     return obj
 
 
+@app.post("/employees/bulk", response_model=schemas.BulkEmployeeResult)
+def create_employees_bulk(employees: List[schemas.EmployeeCreate]):
+    """Onboard many employees at once; rows with a taken or repeated email are returned as conflicts."""
+    if len(employees) > onboarding.MAX_BULK_EMPLOYEES:
+        raise HTTPException(status_code=413, detail=f"At most {onboarding.MAX_BULK_EMPLOYEES} employees per request")
+    result = onboarding.create_employees(employees)
+    for obj in result["created"]:
+        directory.index.upsert(obj)
+    return result
+
+
 @app.get("/employees", response_model=List[schemas.Employee])
-def list_employees(db=Depends(get_db)):
+def list_employees(request: Request, response: Response, db=Depends(get_db)):
+    cached = etags.not_modified(request, response, etags.for_collection(db, models.Employee))
+    if cached:
+        return cached
     return db.query(models.Employee).all()
 
 
+def _changes(db, model, since: Optional[str], limit: int, *criteria):
+    try:
+        return sync.changes(db, model, since, limit, *criteria)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Change feeds: pass the returned next_cursor as ?since= on the next call
+@app.get("/employees/changes", response_model=schemas.EmployeeChanges)
+def employee_changes(since: Optional[str] = None, limit: int = 500, db=Depends(get_db)):
+    return _changes(db, models.Employee, since, limit)
+
+
+@app.get("/balances/changes", response_model=schemas.LeaveBalanceChanges)
+def balance_changes(since: Optional[str] = None, limit: int = 500, db=Depends(get_db)):
+    return _changes(db, models.LeaveBalance, since, limit)
+
+
+@app.get("/leave-requests/changes", response_model=schemas.LeaveRequestChanges)
+def leave_request_changes(since: Optional[str] = None, limit: int = 500, employee_id: Optional[int] = None, db=Depends(get_db)):
+    criteria = [] if employee_id is None else [models.LeaveRequest.employee_id == employee_id]
+    return _changes(db, models.LeaveRequest, since, limit, *criteria)
+
+
+@app.get("/employees/search", response_model=List[schemas.EmployeeMatch])
+def search_employees(q: str, limit: int = 10):
+    """Find employees by name or email prefix, substring or near match (e.g. "ali", "alice@", "alise")."""
+    return services.search_employees(q, limit)
+
+
 @app.get("/employees/{employee_id}", response_model=schemas.Employee)
-def get_employee(employee_id: int, db=Depends(get_db)):
-    obj = db.query(models.Employee).get(employee_id)
+def get_employee(employee_id: int, request: Request, response: Response, db=Depends(get_db)):
+    obj = repository.get_employee(db, employee_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Employee not found")
+    cached = etags.not_modified(request, response, etags.for_row(obj))
+    if cached:
+        return cached
     return obj
 
 
+PROFILE_FIELDS = {"balance", "recent_requests"}
+MAX_PROFILE_REQUESTS = 100
+
+
+@app.get(
+    "/employees/{employee_id}/profile",
+    response_model=schemas.EmployeeProfile,
+    response_model_exclude_unset=True,
+)
+def get_employee_profile(
+    employee_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    days: int = 90,
+    limit: int = 20,
+    db=Depends(get_db),
+):
+    """
+    Employee, balance and recent leave requests in one call. ``fields`` is a
+    comma-separated subset of balance,recent_requests (default: both).
+    Recent requests are those ending within the last ``days`` days or later,
+    newest first, at most ``limit`` of them.
+    """
+    wanted = PROFILE_FIELDS if fields is None else {f.strip() for f in fields.split(",") if f.strip()}
+    if wanted - PROFILE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(wanted - PROFILE_FIELDS))}")
+    limit = max(1, min(limit, MAX_PROFILE_REQUESTS))
+    # balance rides along in the employee SELECT; requests come from one SELECT ... IN
+    stmt = select(models.Employee).where(models.Employee.id == employee_id)
+    if "balance" in wanted:
+        stmt = stmt.options(joinedload(models.Employee.balance))
+    since = date.today() - timedelta(days=max(0, days))
+    if "recent_requests" in wanted:
+        stmt = stmt.options(selectinload(models.Employee.requests.and_(models.LeaveRequest.end_date >= since)))
+    emp = db.scalars(stmt).first()
+    if not emp:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    parts = [emp]
+    data = {c: getattr(emp, c) for c in ("id", "name", "email", "team", "updated_at", "row_version")}
+    if "balance" in wanted:
+        data["balance"] = emp.balance
+        parts.append(emp.balance)
+    if "recent_requests" in wanted:
+        data["recent_requests"] = sorted(emp.requests, key=lambda r: (r.start_date, r.id), reverse=True)[:limit]
+        parts.extend(data["recent_requests"])
+    etag = etags.for_rows(parts, sorted(wanted), since, limit)
+    cached = etags.not_modified(request, response, etag)
+    if cached:
+        return cached
+    return schemas.EmployeeProfile(**data)
+
+
 # Leave balance
 @app.get("/employees/{employee_id}/balance", response_model=schemas.LeaveBalance)
-def get_balance(employee_id: int, db=Depends(get_db)):
-    bal = (
-        db.query(models.LeaveBalance)
-        .filter(models.LeaveBalance.employee_id == employee_id)
-        .first()
-    )
-    if not bal:
-        raise HTTPException(status_code=404, detail="Balance not found")
+def get_balance(employee_id: int, request: Request, response: Response, db=Depends(get_db)):
+    bal = services.get_balance(db, employee_id)
+    cached = etags.not_modified(request, response, etags.for_row(bal))
+    if cached:
+        return cached
     return bal
 
 
+@app.get("/balances", response_model=schemas.LeaveBalanceBatch)
+def get_balances(
+    request: Request,
+    response: Response,
+    employee_ids: List[int] = Query(..., description="Repeat for each employee (employee_ids=1&employee_ids=2)"),
+    db=Depends(get_db),
+):
+    """Balances for up to MAX_BATCH_EMPLOYEES employees in one round trip."""
+    result = services.get_balances(db, employee_ids)
+    cached = etags.not_modified(request, response, etags.for_rows(result["balances"], result["missing"]))
+    if cached:
+        return cached
+    return result
+
+
 @app.post("/employees/{employee_id}/balance", response_model=schemas.LeaveBalance)
-def set_balance(employee_id: int, data: schemas.LeaveBalanceUpdate, db=Depends(get_db)):
-    bal = (
-        db.query(models.LeaveBalance)
-        .filter(models.LeaveBalance.employee_id == employee_id)
-        .first()
-    )
-    if not bal:
-        bal = models.LeaveBalance(employee_id=employee_id, annual_balance=0, sick_balance=0)
-        db.add(bal)
-        db.flush()
-    if data.annual_balance is not None:
-        bal.annual_balance = data.annual_balance
-    if data.sick_balance is not None:
-        bal.sick_balance = data.sick_balance
-    db.commit()
-    db.refresh(bal)
-    return bal
+def set_balance(employee_id: int, data: schemas.LeaveBalanceUpdate):
+    return services.set_balance(employee_id, data)
 
 
 # Leave requests
 @app.post("/employees/{employee_id}/leave-requests", response_model=schemas.LeaveRequest)
-def create_leave_request(employee_id: int, req: schemas.LeaveRequestCreate, db=Depends(get_db)):
-    emp = db.query(models.Employee).get(employee_id)
-    if not emp:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    # simple balance check for annual leave type
-    days = (req.end_date - req.start_date).days + 1
-    bal = (
-        db.query(models.LeaveBalance)
-        .filter(models.LeaveBalance.employee_id == employee_id)
-        .first()
-    )
-    if not bal:
-        raise HTTPException(status_code=400, detail="Balance not initialized")
-    if req.leave_type.lower() == "annual" and bal.annual_balance < days:
-        raise HTTPException(status_code=400, detail="Insufficient annual leave balance")
-    if req.leave_type.lower() == "sick" and bal.sick_balance < days:
-        raise HTTPException(status_code=400, detail="Insufficient sick leave balance")
-
-    obj = models.LeaveRequest(
-        employee_id=employee_id,
-        start_date=req.start_date,
-        end_date=req.end_date,
-        leave_type=req.leave_type,
-        reason=req.reason,
-        status="pending",
-    )
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+def create_leave_request(employee_id: int, req: schemas.LeaveRequestCreate):
+    return services.create_leave_request(employee_id, req)
 
 
 @app.get("/employees/{employee_id}/leave-requests", response_model=List[schemas.LeaveRequest])
-def list_leave_requests(employee_id: int, db=Depends(get_db)):
-    return (
-        db.query(models.LeaveRequest)
-        .filter(models.LeaveRequest.employee_id == employee_id)
-        .order_by(models.LeaveRequest.start_date.desc())
-        .all()
+def list_leave_requests(employee_id: int, request: Request, response: Response, db=Depends(get_db)):
+    etag = etags.for_collection(db, models.LeaveRequest, models.LeaveRequest.employee_id == employee_id)
+    cached = etags.not_modified(request, response, etag)
+    if cached:
+        return cached
+    return services.list_leave_requests(db, employee_id)
+
+
+@app.get("/employees/{employee_id}/leave-requests/page", response_model=schemas.LeaveRequestPage)
+def leave_request_page(
+    employee_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """Bounded alternative to the full list: newest first, optional date window, keyset cursor."""
+    return services.leave_request_page(db, employee_id, start_date, end_date, limit, cursor)
+
+
+@app.get("/leave-requests/off", response_model=schemas.TeamAvailability)
+def who_is_off(start_date: date, end_date: date, team: Optional[str] = None, db=Depends(get_db)):
+    """Pending/approved leave overlapping the date range, optionally limited to one team."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    rows = availability.who_is_off(db, start_date, end_date, team)
+    size = availability.team_size(db, team)
+    off = len({e.id for _, e in rows})
+    return schemas.TeamAvailability(
+        start_date=start_date,
+        end_date=end_date,
+        team=team,
+        team_size=size,
+        employees_off=off,
+        off_ratio=round(off / size, 3) if size else 0.0,
+        requests=[
+            schemas.EmployeeOnLeave(
+                employee_id=e.id, name=e.name, team=e.team, request_id=r.id,
+                start_date=r.start_date, end_date=r.end_date, leave_type=r.leave_type, status=r.status,
+            )
+            for r, e in rows
+        ],
     )
 
 
 @app.post("/leave-requests/{request_id}/status", response_model=schemas.LeaveRequest)
-def update_leave_status(request_id: int, data: schemas.LeaveStatusUpdate, db=Depends(get_db)):
-    obj = db.query(models.LeaveRequest).get(request_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Leave request not found")
-    if data.status not in {"approved", "rejected", "pending"}:
-        raise HTTPException(status_code=400, detail="Invalid status")
-    # adjust balance if moving to approved from non-approved or vice-versa
-    days = (obj.end_date - obj.start_date).days + 1
-    bal = (
-        db.query(models.LeaveBalance)
-        .filter(models.LeaveBalance.employee_id == obj.employee_id)
-        .first()
+def update_leave_status(request_id: int, data: schemas.LeaveStatusUpdate):
+    return services.update_leave_status(request_id, data)
+
+
+# Business-day calendar
+@app.get("/calendar/holidays")
+def calendar_holidays(year: Optional[int] = None, region: Optional[str] = None):
+    """Public holidays for a year and region (defaults: current year, LEAVE_CALENDAR_REGION)."""
+    year = year or date.today().year
+    try:
+        return {"year": year, "region": workdays.normalize_region(region), "holidays": workdays.holidays(year, region)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/calendar/working-days")
+def calendar_working_days(start_date: date, end_date: date, region: Optional[str] = None):
+    """Number of working days (as deducted from balances) in an inclusive date range."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if end_date.year - start_date.year >= workdays.MAX_SPAN_YEARS:
+        raise HTTPException(
+            status_code=400, detail=f"Date range may span at most {workdays.MAX_SPAN_YEARS} calendar years"
+        )
+    try:
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "region": workdays.normalize_region(region),
+            "calendar_days": (end_date - start_date).days + 1,
+            "working_days": workdays.working_days(start_date, end_date, region),
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/calendar/occupancy", response_model=schemas.LeaveOccupancy)
+def calendar_occupancy(start_date: date, end_date: date, team: Optional[str] = None, db=Depends(get_db)):
+    """Per-day headcount on pending/approved leave, optionally limited to one team."""
+    return services.occupancy(db, start_date, end_date, team)
+
+
+# Event feed (transactional outbox)
+SSE_HEARTBEAT_SECONDS = 15.0
+MAX_EVENTS_WAIT_SECONDS = 30.0
+
+
+@app.get("/events", response_model=schemas.LeaveEventPage)
+async def list_events(after: int = 0, limit: int = 100, wait: float = 0, employee_id: Optional[int] = None):
+    """
+    Events with id > ``after``, oldest first. With ``wait`` > 0 this is a long
+    poll: the call returns as soon as an event arrives or after ``wait`` seconds.
+    Pass the returned ``next_cursor`` as ``after`` on the next call.
+    """
+    limit = max(1, min(limit, outbox.MAX_EVENTS_PAGE))
+    deadline = time.monotonic() + max(0.0, min(wait, MAX_EVENTS_WAIT_SECONDS))
+    while True:
+        version = outbox.notifier.version
+        events = await run_in_threadpool(outbox.read_page, after, limit, employee_id)
+        remaining = deadline - time.monotonic()
+        if events or remaining <= 0:
+            break
+        await outbox.notifier.wait(version, min(remaining, outbox.EVENTS_POLL_SECONDS))
+    return {"events": events, "next_cursor": events[-1]["id"] if events else after}
+
+
+@app.get("/events/stream")
+async def stream_events(
+    request: Request,
+    after: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    last_event_id: Optional[str] = Header(default=None),
+):
+    """
+    Server-Sent Events feed. Resumes after the Last-Event-ID header (sent by
+    EventSource on reconnect) or ``after``; otherwise starts at the current end.
+    """
+    if last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+    elif after is not None:
+        cursor = after
+    else:
+        cursor = await run_in_threadpool(outbox.read_latest_id)
+
+    async def _stream():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        idle_since = time.monotonic()
+        while not await request.is_disconnected():
+            version = outbox.notifier.version
+            events = await run_in_threadpool(outbox.read_page, cursor, outbox.MAX_EVENTS_PAGE, employee_id)
+            for ev in events:
+                cursor = ev["id"]
+                data = json.dumps(jsonable_encoder(ev))
+                yield f"id: {ev['id']}\nevent: {ev['event_type']}\ndata: {data}\n\n"
+            if events:
+                idle_since = time.monotonic()
+                continue
+            if time.monotonic() - idle_since >= SSE_HEARTBEAT_SECONDS:
+                yield ": keep-alive\n\n"
+                idle_since = time.monotonic()
+            await outbox.notifier.wait(version, min(SSE_HEARTBEAT_SECONDS, outbox.EVENTS_POLL_SECONDS))
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    if not bal:
-        raise HTTPException(status_code=400, detail="Balance not initialized")
-    prev = obj.status
-    new = data.status
-    if prev != "approved" and new == "approved":
-        if obj.leave_type.lower() == "annual":
-            if bal.annual_balance < days:
-                raise HTTPException(status_code=400, detail="Insufficient annual balance for approval")
-            bal.annual_balance -= days
-        elif obj.leave_type.lower() == "sick":
-            if bal.sick_balance < days:
-                raise HTTPException(status_code=400, detail="Insufficient sick balance for approval")
-            bal.sick_balance -= days
-    elif prev == "approved" and new != "approved":
-        if obj.leave_type.lower() == "annual":
-            bal.annual_balance += days
-        elif obj.leave_type.lower() == "sick":
-            bal.sick_balance += days
-    obj.status = new
-    db.commit()
-    db.refresh(obj)
-    return obj
 
 
 # Serve simple web UI (mount at the end so it doesn't interfere with API routes)
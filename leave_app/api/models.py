@@ -1,27 +1,72 @@
-from datetime import date
-from sqlalchemy import Date, ForeignKey, String, Integer
+from datetime import date, datetime, timezone
+from sqlalchemy import Date, DateTime, ForeignKey, Index, text, String, Integer, Text
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.sql.functions import FunctionElement
 
 from .db import Base
 
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp (the form stored in DateTime columns)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class utc_timestamp(FunctionElement):
+    """Database-side UTC now, for server defaults (rows inserted outside the ORM)."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_timestamp)
+def _utc_timestamp(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # UTC on SQLite
+
+
+@compiles(utc_timestamp, "mssql")
+def _utc_timestamp_mssql(element, compiler, **kw):
+    return "SYSUTCDATETIME()"
+
+# Change tracking (see sync.py): every synced table carries updated_at, set on
+# insert and update, and row_version, which the ORM bumps on each UPDATE and
+# checks in its WHERE clause (a concurrent writer gets StaleDataError).
+# Both are NOT NULL with server defaults, so rows inserted by plain SQL
+# (seed.sql) are versioned and show up in the change feeds too.
+# The (updated_at, id) index backs the ?since= keyset scans.
+
 class Employee(Base):
     __tablename__ = "employees"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    team: Mapped[str | None] = mapped_column(String(100), index=True, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow, server_default=utc_timestamp(), nullable=False
+    )
+    row_version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"), nullable=False)
 
     balance: Mapped["LeaveBalance"] = relationship("LeaveBalance", back_populates="employee", uselist=False)
     requests: Mapped[list["LeaveRequest"]] = relationship("LeaveRequest", back_populates="employee")
 
+    __table_args__ = (Index("ix_employees_sync", "updated_at", "id"),)
+    __mapper_args__ = {"version_id_col": row_version}
+
 class LeaveBalance(Base):
     __tablename__ = "leave_balances"
     id: Mapped[int] = mapped_column(primary_key=True)
     employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id"), index=True, nullable=False)
     annual_balance: Mapped[int] = mapped_column(Integer, default=20)
     sick_balance: Mapped[int] = mapped_column(Integer, default=10)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow, server_default=utc_timestamp(), nullable=False
+    )
+    row_version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"), nullable=False)
 
     employee: Mapped[Employee] = relationship("Employee", back_populates="balance")
 
+    __table_args__ = (Index("ix_leave_balances_sync", "updated_at", "id"),)
+    __mapper_args__ = {"version_id_col": row_version}
+
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -31,5 +76,35 @@ class LeaveRequest(Base):
     leave_type: Mapped[str] = mapped_column(String, nullable=False)  # 'annual' | 'sick'
     reason: Mapped[str | None] = mapped_column(String, nullable=True)
     status: Mapped[str] = mapped_column(String, default="pending")  # 'pending' | 'approved' | 'rejected'
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow, server_default=utc_timestamp(), nullable=False
+    )
+    row_version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"), nullable=False)
 
     employee: Mapped[Employee] = relationship("Employee", back_populates="requests")
+
+    # Interval lookups: no request is longer than the longest stored one (see
+    # availability.request_span_days), so an overlap with [s, e] must start
+    # within [s - span, e] and the start_date range scan stays bounded.
+    __table_args__ = (
+        Index("ix_leave_requests_employee_interval", "employee_id", "start_date", "end_date"),
+        Index("ix_leave_requests_interval", "start_date", "end_date"),
+        Index("ix_leave_requests_sync", "updated_at", "id"),
+    )
+    __mapper_args__ = {"version_id_col": row_version}
+
+class LeaveEvent(Base):
+    """Outbox row written in the same transaction as the change it describes.
+
+    ``id`` is the consumer cursor; AUTOINCREMENT keeps it from being reused
+    on SQLite.
+    """
+    __tablename__ = "leave_events"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    employee_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False)
+    request_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)  # JSON document
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = {"sqlite_autoincrement": True}
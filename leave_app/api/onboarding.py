@@ -0,0 +1,99 @@
+"""
+Employee onboarding: employee row, initial balance and outbox event in one
+transaction.
+
+Duplicate emails are detected by the unique index on employees.email (an
+IntegrityError at flush) instead of a separate existence query. Bulk
+onboarding pre-checks each chunk's emails with one IN query, inserts the
+chunk with a single flush and, if a concurrent insert still trips the
+index, retries that chunk row by row in savepoints.
+"""
+
+import os
+from typing import Any, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from . import models, outbox, schemas
+from .db import run_write
+
+MAX_BULK_EMPLOYEES = int(os.getenv("LEAVE_MAX_BULK_EMPLOYEES", "10000"))
+BULK_CHUNK_SIZE = 500
+DUPLICATE_EMAIL = "Employee with this email already exists"
+
+
+def _build(emp: schemas.EmployeeCreate) -> models.Employee:
+    return models.Employee(
+        name=emp.name,
+        email=emp.email,
+        team=emp.team,
+        balance=models.LeaveBalance(annual_balance=emp.annual_balance or 20, sick_balance=emp.sick_balance or 10),
+    )
+
+
+def add_employees(db, rows: list[schemas.EmployeeCreate]) -> list[models.Employee]:
+    """Add employees with their balances to ``db`` in one flush (not committed)."""
+    objs = [_build(emp) for emp in rows]
+    db.add_all(objs)
+    db.flush()
+    for obj in objs:
+        outbox.record(db, outbox.BALANCE_UPDATED, obj.id, outbox.balance_payload(obj.balance))
+    return objs
+
+
+def create_employee(emp: schemas.EmployeeCreate) -> models.Employee:
+    """Raises IntegrityError when the email is taken."""
+    return run_write(lambda db: add_employees(db, [emp])[0])
+
+
+def _insert_chunk(db, chunk: list[tuple[int, schemas.EmployeeCreate]]) -> tuple[list[models.Employee], list[dict[str, Any]]]:
+    emails = [emp.email for _, emp in chunk]
+    taken = set(db.scalars(select(models.Employee.email).where(models.Employee.email.in_(emails))))
+    conflicts = [{"index": i, "email": emp.email, "detail": DUPLICATE_EMAIL} for i, emp in chunk if emp.email in taken]
+    todo = [(i, emp) for i, emp in chunk if emp.email not in taken]
+    try:
+        with db.begin_nested():
+            return add_employees(db, [emp for _, emp in todo]), conflicts
+    except IntegrityError:
+        pass
+    # Lost a race with another writer: find the offending rows one by one
+    created = []
+    for i, emp in todo:
+        try:
+            with db.begin_nested():
+                created.extend(add_employees(db, [emp]))
+        except IntegrityError:
+            conflicts.append({"index": i, "email": emp.email, "detail": DUPLICATE_EMAIL})
+    return created, conflicts
+
+
+def create_employees(rows: Iterable[schemas.EmployeeCreate]) -> dict[str, Any]:
+    """
+    Onboard many employees; each chunk commits on its own. Rows whose email
+    is already taken (or repeated earlier in the batch) are reported as
+    conflicts with their position in ``rows``.
+    """
+    created: list[models.Employee] = []
+    conflicts: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    chunk: list[tuple[int, schemas.EmployeeCreate]] = []
+
+    def _flush_chunk() -> None:
+        done, clashes = run_write(lambda db: _insert_chunk(db, chunk))
+        created.extend(done)
+        conflicts.extend(clashes)
+
+    for i, emp in enumerate(rows):
+        if emp.email in seen:
+            conflicts.append({"index": i, "email": emp.email, "detail": "Email repeated within the batch"})
+            continue
+        seen.add(emp.email)
+        chunk.append((i, emp))
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            _flush_chunk()
+            chunk = []
+    if chunk:
+        _flush_chunk()
+    conflicts.sort(key=lambda c: c["index"])
+    return {"created": created, "conflicts": conflicts}
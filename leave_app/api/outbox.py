@@ -0,0 +1,157 @@
+"""
+Transactional outbox for leave lifecycle events.
+
+Every change to a leave request or balance also adds a ``leave_events`` row
+in the same session, so the event is committed (or rolled back) together
+with the change itself. Consumers read the table through a cursor (the event
+id) via long-poll (/events) or SSE (/events/stream) instead of re-listing
+requests.
+
+Waiters in this process are woken when a commit that wrote events lands;
+they also re-check the table every EVENTS_POLL_SECONDS to pick up events
+written by other processes. On SQLite commits are serialized, so ids become
+visible in order. On SQL Server an IDENTITY value can commit after a higher
+one, so readers there only return events older than EVENTS_SETTLE_SECONDS.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from datetime import timedelta
+from typing import Any, Optional
+
+from sqlalchemy import event, func, select
+
+from . import models
+from .db import SessionLocal, WriterSessionLocal, provider
+
+EVENTS_POLL_SECONDS = float(os.getenv("LEAVE_EVENTS_POLL_SECONDS", "2"))
+EVENTS_SETTLE_SECONDS = float(
+    os.getenv("LEAVE_EVENTS_SETTLE_SECONDS", "0" if provider() == "sqlite" else "2")
+)
+MAX_EVENTS_PAGE = 500
+
+REQUEST_CREATED = "leave_request.created"
+REQUEST_STATUS_CHANGED = "leave_request.status_changed"
+BALANCE_UPDATED = "leave_balance.updated"
+
+
+def _jsonable(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def request_payload(obj: models.LeaveRequest) -> dict[str, Any]:
+    return {
+        "id": obj.id,
+        "employee_id": obj.employee_id,
+        "start_date": obj.start_date,
+        "end_date": obj.end_date,
+        "leave_type": obj.leave_type,
+        "reason": obj.reason,
+        "status": obj.status,
+    }
+
+
+def balance_payload(bal: models.LeaveBalance) -> dict[str, Any]:
+    return {"employee_id": bal.employee_id, "annual_balance": bal.annual_balance, "sick_balance": bal.sick_balance}
+
+
+def record(db, event_type: str, employee_id: int, payload: dict[str, Any], request_id: Optional[int] = None) -> None:
+    """Add an event to ``db``; it is committed with the caller's transaction."""
+    db.add(models.LeaveEvent(
+        event_type=event_type,
+        employee_id=employee_id,
+        request_id=request_id,
+        payload=json.dumps({k: _jsonable(v) for k, v in payload.items()}),
+        created_at=models.utcnow(),
+    ))
+    db.info["leave_events_pending"] = True
+
+
+class _Notifier:
+    """Wake async waiters (on any event loop) after events are committed."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._version = 0
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def notify(self) -> None:
+        with self._lock:
+            self._version += 1
+            waiters = list(self._waiters)
+        for loop, ev in waiters:
+            loop.call_soon_threadsafe(ev.set)
+
+    async def wait(self, seen_version: int, timeout: float) -> None:
+        """Return after a commit newer than ``seen_version`` or after ``timeout``."""
+        ev = asyncio.Event()
+        entry = (asyncio.get_running_loop(), ev)
+        with self._lock:
+            if self._version != seen_version:
+                return
+            self._waiters.add(entry)
+        try:
+            await asyncio.wait_for(ev.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(entry)
+
+
+notifier = _Notifier()
+
+
+def _after_commit(session) -> None:
+    if session.info.pop("leave_events_pending", False):
+        notifier.notify()
+
+
+def _after_rollback(session) -> None:
+    session.info.pop("leave_events_pending", None)
+
+
+for _factory in (SessionLocal, WriterSessionLocal):
+    event.listen(_factory, "after_commit", _after_commit)
+    event.listen(_factory, "after_rollback", _after_rollback)
+
+
+def latest_id(db) -> int:
+    return db.execute(select(func.max(models.LeaveEvent.id))).scalar() or 0
+
+
+def fetch(db, after: int, limit: int, employee_id: Optional[int] = None) -> list[models.LeaveEvent]:
+    E = models.LeaveEvent
+    stmt = select(E).where(E.id > after)
+    if EVENTS_SETTLE_SECONDS > 0:
+        stmt = stmt.where(E.created_at <= models.utcnow() - timedelta(seconds=EVENTS_SETTLE_SECONDS))
+    if employee_id is not None:
+        stmt = stmt.where(E.employee_id == employee_id)
+    return list(db.scalars(stmt.order_by(E.id).limit(limit)))
+
+
+def to_dict(ev: models.LeaveEvent) -> dict[str, Any]:
+    return {
+        "id": ev.id,
+        "event_type": ev.event_type,
+        "employee_id": ev.employee_id,
+        "request_id": ev.request_id,
+        "payload": json.loads(ev.payload),
+        "created_at": ev.created_at,
+    }
+
+
+def read_page(after: int, limit: int, employee_id: Optional[int] = None) -> list[dict[str, Any]]:
+    with SessionLocal() as db:
+        return [to_dict(ev) for ev in fetch(db, after, limit, employee_id)]
+
+
+def read_latest_id() -> int:
+    with SessionLocal() as db:
+        return latest_id(db)
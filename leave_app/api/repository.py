@@ -0,0 +1,123 @@
+"""
+Primary-key lookups shared by the routes.
+
+Lookups go through ``Session.get``, which answers from the session's
+identity map when the row is already loaded and only then issues a SELECT.
+
+Validation-only checks ("does employee N exist?") use ``employee_exists``,
+backed by a per-process cache of known employee ids. The cache only holds
+positive answers, each for EMPLOYEE_CACHE_TTL_SECONDS, so an id that is
+missing is always re-checked against the database. Session hooks keep the
+cache current for writes made by this process: ids of committed inserts are
+added and deleted employees are evicted at flush. Deletes made by another
+process are picked up when the entry expires.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event, select
+
+from . import models
+from .db import SessionLocal, WriterSessionLocal
+
+EMPLOYEE_CACHE_TTL_SECONDS = float(os.getenv("LEAVE_EMPLOYEE_CACHE_TTL_SECONDS", "300"))
+EMPLOYEE_CACHE_MAX_SIZE = 100_000
+
+
+class _ExistenceCache:
+    """Thread-safe id -> expiry map holding positive answers only."""
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._expires: dict[int, float] = {}
+
+    def __contains__(self, key: int) -> bool:
+        expires = self._expires.get(key)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            with self._lock:
+                self._expires.pop(key, None)
+            return False
+        return True
+
+    def add(self, key: int) -> None:
+        if self._ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._expires) >= self._max_size:
+                self._expires = {k: v for k, v in self._expires.items() if v >= now}
+                if len(self._expires) >= self._max_size:
+                    self._expires.clear()
+            self._expires[key] = now + self._ttl
+
+    def discard(self, key: int) -> None:
+        with self._lock:
+            self._expires.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires.clear()
+
+
+known_employees = _ExistenceCache(EMPLOYEE_CACHE_TTL_SECONDS, EMPLOYEE_CACHE_MAX_SIZE)
+
+
+def get_employee(db, employee_id: int) -> Optional[models.Employee]:
+    emp = db.get(models.Employee, employee_id)
+    if emp is not None:
+        known_employees.add(employee_id)
+    return emp
+
+
+def employee_exists(db, employee_id: int) -> bool:
+    """Existence check that skips the database for recently seen employees."""
+    return employee_id in known_employees or get_employee(db, employee_id) is not None
+
+
+def get_leave_request(db, request_id: int) -> Optional[models.LeaveRequest]:
+    return db.get(models.LeaveRequest, request_id)
+
+
+def get_balance(db, employee_id: int) -> Optional[models.LeaveBalance]:
+    return db.scalars(
+        select(models.LeaveBalance).where(models.LeaveBalance.employee_id == employee_id).limit(1)
+    ).first()
+
+
+# -- cache maintenance --------------------------------------------------------
+
+_NEW_EMPLOYEES = "repository_new_employee_ids"
+
+
+def _after_flush(session, _flush_context) -> None:
+    for obj in session.new:
+        if isinstance(obj, models.Employee):
+            session.info.setdefault(_NEW_EMPLOYEES, set()).add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, models.Employee):
+            # Evict now rather than at commit: a stale "exists" is worse than a cache miss
+            known_employees.discard(obj.id)
+
+
+def _after_commit(session) -> None:
+    for employee_id in session.info.pop(_NEW_EMPLOYEES, ()):
+        known_employees.add(employee_id)
+
+
+def _after_soft_rollback(session, _previous_transaction) -> None:
+    # Also fires for a rolled-back savepoint (write queue jobs); forgetting the
+    # whole set only costs cache misses
+    session.info.pop(_NEW_EMPLOYEES, None)
+
+
+for _factory in (SessionLocal, WriterSessionLocal):
+    event.listen(_factory, "after_flush", _after_flush)
+    event.listen(_factory, "after_commit", _after_commit)
+    event.listen(_factory, "after_soft_rollback", _after_soft_rollback)
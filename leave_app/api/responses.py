@@ -0,0 +1,39 @@
+"""
+JSON encoding and compression settings for the API.
+
+Recent FastAPI releases serialize response models straight to JSON bytes
+with Pydantic's Rust encoder, but only while no custom response class is
+set, so they are left alone. Older releases build a dict and json.dumps it;
+there orjson (an optional dependency) is used when it is installed.
+"""
+
+import inspect
+import os
+from typing import Any
+
+from fastapi import routing
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+GZIP_MIN_SIZE = int(os.getenv("LEAVE_GZIP_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("LEAVE_GZIP_LEVEL", "5"))
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _pydantic_serializes_responses() -> bool:
+    return "dump_json" in inspect.signature(routing.serialize_response).parameters
+
+
+def app_options() -> dict[str, Any]:
+    """Extra FastAPI() arguments: the orjson response class where it helps."""
+    if orjson is not None and not _pydantic_serializes_responses():
+        return {"default_response_class": ORJSONResponse}
+    return {}
@@ -1,10 +1,11 @@
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 class EmployeeBase(BaseModel):
     name: str
     email: str
+    team: Optional[str] = None
 
 class EmployeeCreate(EmployeeBase):
     annual_balance: Optional[int] = Field(default=20)
@@ -12,6 +13,8 @@ class EmployeeCreate(EmployeeBase):
 
 class Employee(EmployeeBase):
     id: int
+    updated_at: Optional[datetime] = None
+    row_version: Optional[int] = None
     class Config:
         from_attributes = True
 
@@ -20,9 +23,15 @@ class LeaveBalance(BaseModel):
     employee_id: int
     annual_balance: int
     sick_balance: int
+    updated_at: Optional[datetime] = None
+    row_version: Optional[int] = None
     class Config:
         from_attributes = True
 
+class LeaveBalanceBatch(BaseModel):
+    balances: List[LeaveBalance]
+    missing: List[int]
+
 class LeaveBalanceUpdate(BaseModel):
     annual_balance: Optional[int] = None
     sick_balance: Optional[int] = None
@@ -40,8 +49,97 @@ class LeaveRequest(LeaveRequestBase):
     id: int
     employee_id: int
     status: str
+    updated_at: Optional[datetime] = None
+    row_version: Optional[int] = None
     class Config:
         from_attributes = True
 
+class LeaveRequestPage(BaseModel):
+    items: List[LeaveRequest]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
 class LeaveStatusUpdate(BaseModel):
     status: str
+
+class EmployeeOnLeave(BaseModel):
+    employee_id: int
+    name: str
+    team: Optional[str] = None
+    request_id: int
+    start_date: date
+    end_date: date
+    leave_type: str
+    status: str
+
+class TeamAvailability(BaseModel):
+    start_date: date
+    end_date: date
+    team: Optional[str] = None
+    team_size: int
+    employees_off: int
+    off_ratio: float
+    requests: List[EmployeeOnLeave]
+
+class DayOccupancy(BaseModel):
+    day: date
+    working_day: bool
+    on_leave: int
+    approved: int
+    pending: int
+
+class LeaveOccupancy(BaseModel):
+    start_date: date
+    end_date: date
+    team: Optional[str] = None
+    team_size: int
+    max_on_leave: int
+    peak_days: List[date]
+    days: List[DayOccupancy]
+
+class LeaveEvent(BaseModel):
+    id: int
+    event_type: str
+    employee_id: int
+    request_id: Optional[int] = None
+    payload: Dict[str, Any]
+    created_at: datetime
+
+class LeaveEventPage(BaseModel):
+    events: List[LeaveEvent]
+    next_cursor: int
+
+class EmployeeChanges(BaseModel):
+    items: List[Employee]
+    next_cursor: str
+    has_more: bool
+
+class LeaveBalanceChanges(BaseModel):
+    items: List[LeaveBalance]
+    next_cursor: str
+    has_more: bool
+
+class LeaveRequestChanges(BaseModel):
+    items: List[LeaveRequest]
+    next_cursor: str
+    has_more: bool
+
+class EmployeeMatch(BaseModel):
+    id: int
+    name: str
+    email: str
+    team: Optional[str] = None
+    score: float
+
+class EmployeeProfile(Employee):
+    balance: Optional[LeaveBalance] = None
+    recent_requests: Optional[List[LeaveRequest]] = None
+
+class EmployeeConflict(BaseModel):
+    index: int
+    email: str
+    detail: str
+
+class BulkEmployeeResult(BaseModel):
+    created: List[Employee]
+    conflicts: List[EmployeeConflict]
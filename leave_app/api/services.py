@@ -0,0 +1,230 @@
+"""
+Leave operations shared by the HTTP routes (main.py) and in-process callers
+such as the MCP server's direct backend.
+
+Functions raise HTTPException for client errors so both entry points report
+the same status codes and messages.
+"""
+
+from datetime import date
+from typing import Any, Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+
+from . import availability, directory, models, outbox, repository, schemas, workdays
+from .db import SessionLocal, run_write
+
+MAX_BATCH_EMPLOYEES = 500
+MAX_HISTORY_PAGE = 500
+
+
+def get_balance(db, employee_id: int) -> models.LeaveBalance:
+    bal = repository.get_balance(db, employee_id)
+    if not bal:
+        raise HTTPException(status_code=404, detail="Balance not found")
+    return bal
+
+
+def batch_ids(employee_ids: Iterable[int]) -> list[int]:
+    """De-duplicate a batch of employee ids (first occurrence wins) and enforce the batch limit."""
+    ids = list(dict.fromkeys(employee_ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="employee_ids must not be empty")
+    if len(ids) > MAX_BATCH_EMPLOYEES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_EMPLOYEES} employee_ids per request")
+    return ids
+
+
+def get_balances(db, employee_ids: Iterable[int]) -> dict[str, Any]:
+    """Balances for many employees in one query; ids without a balance are listed in ``missing``."""
+    ids = batch_ids(employee_ids)
+    found = {
+        bal.employee_id: bal
+        for bal in db.scalars(select(models.LeaveBalance).where(models.LeaveBalance.employee_id.in_(ids)))
+    }
+    return {
+        "balances": [found[i] for i in ids if i in found],
+        "missing": [i for i in ids if i not in found],
+    }
+
+
+def list_leave_requests(db, employee_id: int) -> list[models.LeaveRequest]:
+    return (
+        db.query(models.LeaveRequest)
+        .filter(models.LeaveRequest.employee_id == employee_id)
+        .order_by(models.LeaveRequest.start_date.desc())
+        .all()
+    )
+
+
+def _decode_history_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        day, _, row_id = cursor.partition(".")
+        return date.fromisoformat(day), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def leave_request_page(
+    db,
+    employee_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    One page of an employee's leave requests, newest first, optionally only
+    those overlapping [start_date, end_date]. Keyset paging on
+    (start_date, id): pass ``next_cursor`` back as ``cursor``.
+    """
+    R = models.LeaveRequest
+    limit = max(1, min(limit, MAX_HISTORY_PAGE))
+    stmt = select(R).where(R.employee_id == employee_id)
+    if start_date:
+        stmt = stmt.where(R.end_date >= start_date)
+    if end_date:
+        stmt = stmt.where(R.start_date <= end_date)
+    if cursor:
+        day, row_id = _decode_history_cursor(cursor)
+        stmt = stmt.where(or_(R.start_date < day, and_(R.start_date == day, R.id < row_id)))
+    rows = list(db.scalars(stmt.order_by(R.start_date.desc(), R.id.desc()).limit(limit + 1)))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = f"{rows[-1].start_date.isoformat()}.{rows[-1].id}" if has_more else None
+    return {"items": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def create_leave_request(employee_id: int, req: schemas.LeaveRequestCreate) -> models.LeaveRequest:
+    if req.end_date < req.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    cap = availability.MAX_REQUEST_DAYS
+    if cap is not None and (req.end_date - req.start_date).days + 1 > cap:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Leave requests are limited to {cap} days; split longer absences",
+        )
+
+    def _create(db):
+        if not repository.employee_exists(db, employee_id):
+            raise HTTPException(status_code=404, detail="Employee not found")
+        clash = availability.find_overlap(db, employee_id, req.start_date, req.end_date)
+        if clash:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Overlaps {clash.status} leave request {clash.id} ({clash.start_date} to {clash.end_date})",
+            )
+        # balance check counts working days only (weekends and public holidays are free)
+        days = workdays.working_days(req.start_date, req.end_date)
+        if days == 0:
+            raise HTTPException(status_code=400, detail="Requested dates contain no working days")
+        bal = repository.get_balance(db, employee_id)
+        if not bal:
+            raise HTTPException(status_code=400, detail="Balance not initialized")
+        if req.leave_type.lower() == "annual" and bal.annual_balance < days:
+            raise HTTPException(status_code=400, detail="Insufficient annual leave balance")
+        if req.leave_type.lower() == "sick" and bal.sick_balance < days:
+            raise HTTPException(status_code=400, detail="Insufficient sick leave balance")
+
+        obj = models.LeaveRequest(
+            employee_id=employee_id,
+            start_date=req.start_date,
+            end_date=req.end_date,
+            leave_type=req.leave_type,
+            reason=req.reason,
+            status="pending",
+        )
+        db.add(obj)
+        db.flush()
+        availability.note_request_span(obj.start_date, obj.end_date)
+        outbox.record(db, outbox.REQUEST_CREATED, employee_id, outbox.request_payload(obj), request_id=obj.id)
+        return obj
+
+    # Inserts go through the single-writer path (batched on SQLite)
+    return run_write(_create)
+
+
+def set_balance(employee_id: int, data: schemas.LeaveBalanceUpdate) -> models.LeaveBalance:
+    def _set(db):
+        bal = repository.get_balance(db, employee_id)
+        if not bal:
+            bal = models.LeaveBalance(employee_id=employee_id, annual_balance=0, sick_balance=0)
+            db.add(bal)
+            db.flush()
+        if data.annual_balance is not None:
+            bal.annual_balance = data.annual_balance
+        if data.sick_balance is not None:
+            bal.sick_balance = data.sick_balance
+        outbox.record(db, outbox.BALANCE_UPDATED, employee_id, outbox.balance_payload(bal))
+        return bal
+
+    return run_write(_set)
+
+
+def update_leave_status(request_id: int, data: schemas.LeaveStatusUpdate) -> models.LeaveRequest:
+    def _update(db):
+        obj = repository.get_leave_request(db, request_id)
+        if not obj:
+            raise HTTPException(status_code=404, detail="Leave request not found")
+        if data.status not in {"approved", "rejected", "pending"}:
+            raise HTTPException(status_code=400, detail="Invalid status")
+        # adjust balance if moving to approved from non-approved or vice-versa
+        days = workdays.working_days(obj.start_date, obj.end_date)
+        bal = repository.get_balance(db, obj.employee_id)
+        if not bal:
+            raise HTTPException(status_code=400, detail="Balance not initialized")
+        prev = obj.status
+        new = data.status
+        if prev not in availability.ACTIVE_STATUSES and new in availability.ACTIVE_STATUSES:
+            clash = availability.find_overlap(db, obj.employee_id, obj.start_date, obj.end_date, exclude_id=obj.id)
+            if clash:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Overlaps {clash.status} leave request {clash.id} ({clash.start_date} to {clash.end_date})",
+                )
+        if prev != "approved" and new == "approved":
+            if obj.leave_type.lower() == "annual":
+                if bal.annual_balance < days:
+                    raise HTTPException(status_code=400, detail="Insufficient annual balance for approval")
+                bal.annual_balance -= days
+            elif obj.leave_type.lower() == "sick":
+                if bal.sick_balance < days:
+                    raise HTTPException(status_code=400, detail="Insufficient sick balance for approval")
+                bal.sick_balance -= days
+        elif prev == "approved" and new != "approved":
+            if obj.leave_type.lower() == "annual":
+                bal.annual_balance += days
+            elif obj.leave_type.lower() == "sick":
+                bal.sick_balance += days
+        obj.status = new
+        if prev != new:
+            outbox.record(
+                db, outbox.REQUEST_STATUS_CHANGED, obj.employee_id,
+                {**outbox.request_payload(obj), "previous_status": prev}, request_id=obj.id,
+            )
+            if (prev == "approved") != (new == "approved") and obj.leave_type.lower() in ("annual", "sick"):
+                outbox.record(db, outbox.BALANCE_UPDATED, obj.employee_id, outbox.balance_payload(bal))
+        return obj
+
+    # Balance and status change together on the single-writer path
+    return run_write(_update)
+
+
+def search_employees(q: str, limit: int = 10) -> list[dict[str, Any]]:
+    limit = max(1, min(limit, 50))
+    directory.index.refresh_if_stale()
+    found = directory.index.search(q, limit)
+    if not found:
+        # The index lags writes made by other processes by the feed's settle window
+        with SessionLocal() as db:
+            found = directory.search_db(db, q, limit)
+    return found
+
+
+def occupancy(db, start_date: date, end_date: date, team: Optional[str] = None) -> dict[str, Any]:
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if (end_date - start_date).days + 1 > availability.MAX_OCCUPANCY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range cannot exceed {availability.MAX_OCCUPANCY_DAYS} days")
+    return availability.occupancy(db, start_date, end_date, team)
@@ -0,0 +1,166 @@
+"""
+Business-day calendar used for leave day counts.
+
+For every (year, region) we build once, and cache, a bitmap of working days
+(weekdays that are not public holidays) plus a prefix-sum array over it, so
+the number of working days between two dates is a subtraction per calendar
+year spanned instead of a walk over every day.
+
+Regions:
+  US    the eleven federal holidays (5 U.S.C. 6103): New Year's Day, Martin
+        Luther King Jr. Day, Washington's Birthday, Memorial Day, Juneteenth
+        (from 2021), Independence Day, Labor Day, Columbus Day, Veterans Day,
+        Thanksgiving, Christmas (weekend holidays observed Fri/Mon)
+  UK    England & Wales bank holidays (with substitute days)
+  NONE  weekends only
+"""
+
+import os
+from array import array
+from datetime import MAXYEAR, MINYEAR, date, timedelta
+from functools import lru_cache
+
+DEFAULT_REGION = os.getenv("LEAVE_CALENDAR_REGION", "US").upper()
+REGIONS = ("US", "UK", "NONE")
+# Longest range GET /calendar/working-days will count; each year spanned
+# builds (and caches) one YearCalendar.
+MAX_SPAN_YEARS = 5
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based) ``weekday`` (Mon=0) of the month; n=-1 for the last one."""
+    if n > 0:
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    d = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _us_holidays(year: int) -> list[tuple[date, str]]:
+    def observed(d: date) -> date:
+        if d.weekday() == 5:
+            return d - timedelta(days=1)
+        if d.weekday() == 6:
+            return d + timedelta(days=1)
+        return d
+
+    result = [
+        (observed(date(year, 1, 1)), "New Year's Day"),
+        (_nth_weekday(year, 1, 0, 3), "Martin Luther King Jr. Day"),
+        (_nth_weekday(year, 2, 0, 3), "Washington's Birthday"),
+        (_nth_weekday(year, 5, 0, -1), "Memorial Day"),
+        (observed(date(year, 7, 4)), "Independence Day"),
+        (_nth_weekday(year, 9, 0, 1), "Labor Day"),
+        (_nth_weekday(year, 10, 0, 2), "Columbus Day"),
+        (observed(date(year, 11, 11)), "Veterans Day"),
+        (_nth_weekday(year, 11, 3, 4), "Thanksgiving"),
+        (observed(date(year, 12, 25)), "Christmas Day"),
+    ]
+    if year >= 2021:
+        result.append((observed(date(year, 6, 19)), "Juneteenth"))
+    return result
+
+
+def _uk_holidays(year: int) -> list[tuple[date, str]]:
+    easter = _easter(year)
+    result = [
+        (easter - timedelta(days=2), "Good Friday"),
+        (easter + timedelta(days=1), "Easter Monday"),
+        (_nth_weekday(year, 5, 0, 1), "Early May Bank Holiday"),
+        (_nth_weekday(year, 5, 0, -1), "Spring Bank Holiday"),
+        (_nth_weekday(year, 8, 0, -1), "Summer Bank Holiday"),
+    ]
+    # Weekend New Year's Day moves to the next Monday
+    ny = date(year, 1, 1)
+    if ny.weekday() >= 5:
+        ny += timedelta(days=7 - ny.weekday())
+    result.append((ny, "New Year's Day"))
+    # Christmas/Boxing Day on a weekend get substitute weekdays after them
+    xmas, boxing = date(year, 12, 25), date(year, 12, 26)
+    if xmas.weekday() == 5:  # Sat/Sun -> Mon/Tue
+        result += [(xmas + timedelta(days=2), "Christmas Day (substitute)"), (boxing + timedelta(days=2), "Boxing Day (substitute)")]
+    elif xmas.weekday() == 6:  # Sun/Mon -> Tue/Mon
+        result += [(xmas + timedelta(days=2), "Christmas Day (substitute)"), (boxing, "Boxing Day")]
+    elif xmas.weekday() == 4:  # Fri/Sat -> Fri/Mon
+        result += [(xmas, "Christmas Day"), (boxing + timedelta(days=2), "Boxing Day (substitute)")]
+    else:
+        result += [(xmas, "Christmas Day"), (boxing, "Boxing Day")]
+    return result
+
+
+_RULES = {"US": _us_holidays, "UK": _uk_holidays, "NONE": lambda year: []}
+
+
+def normalize_region(region: str | None) -> str:
+    key = (region or DEFAULT_REGION).upper()
+    if key not in _RULES:
+        raise ValueError(f"Unknown calendar region '{region}'; expected one of {', '.join(REGIONS)}")
+    return key
+
+
+class YearCalendar:
+    """Working-day bitmap and prefix sums for one calendar year."""
+
+    def __init__(self, year: int, region: str):
+        self.year = year
+        self.region = region
+        self.start = date(year, 1, 1)
+        # Observed dates can spill over a year boundary (e.g. Jan 1 on Saturday);
+        # there is no neighbour to spill from outside MINYEAR..MAXYEAR
+        rules = _RULES[region]
+        neighbours = range(max(year - 1, MINYEAR), min(year + 1, MAXYEAR) + 1)
+        self.holidays = sorted((d, name) for y in neighbours for d, name in rules(y) if d.year == year)
+        holiday_days = {d for d, _ in self.holidays}
+        n = (date(year, 12, 31) - self.start).days + 1
+        self.bitmap = bytearray(n)
+        self.prefix = array("H", [0]) * (n + 1)
+        for i in range(n):
+            d = self.start + timedelta(days=i)
+            self.bitmap[i] = 1 if d.weekday() < 5 and d not in holiday_days else 0
+            self.prefix[i + 1] = self.prefix[i] + self.bitmap[i]
+
+    def count(self, start: date, end: date) -> int:
+        """Working days in [start, end], both within this year."""
+        return self.prefix[(end - self.start).days + 1] - self.prefix[(start - self.start).days]
+
+    def is_working_day(self, d: date) -> bool:
+        return bool(self.bitmap[(d - self.start).days])
+
+
+@lru_cache(maxsize=128)
+def year_calendar(year: int, region: str = DEFAULT_REGION) -> YearCalendar:
+    return YearCalendar(year, normalize_region(region))
+
+
+def working_days(start: date, end: date, region: str | None = None) -> int:
+    """Working days in [start, end] inclusive (0 when end < start)."""
+    if end < start:
+        return 0
+    region = normalize_region(region)
+    total = 0
+    for year in range(start.year, end.year + 1):
+        lo = max(start, date(year, 1, 1))
+        hi = min(end, date(year, 12, 31))
+        total += year_calendar(year, region).count(lo, hi)
+    return total
+
+
+def holidays(year: int, region: str | None = None) -> list[dict[str, str]]:
+    cal = year_calendar(year, normalize_region(region))
+    return [{"date": d.isoformat(), "name": name} for d, name in cal.holidays]
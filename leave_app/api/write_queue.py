@@ -0,0 +1,83 @@
+"""
+Single-writer queue for SQLite deployments.
+
+SQLite only allows one writer at a time. When several request threads write
+concurrently they fight over the database lock and some of them fail with
+"database is locked". Routing writes through one background thread removes
+that contention and lets several small transactions share one commit (and
+one fsync).
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+WriteJob = Callable[[Session], Any]
+
+
+class WriteQueue:
+    """Run write jobs on a dedicated thread, committing them in batches.
+
+    Each job receives the writer's session and runs inside its own SAVEPOINT,
+    so a job that raises (e.g. an HTTPException from validation) is rolled
+    back on its own and its exception is re-raised in the calling thread,
+    while the other jobs of the batch still commit together.
+    """
+
+    def __init__(self, session_factory: sessionmaker, max_batch: int = 64):
+        self._session_factory = session_factory
+        self._max_batch = max(1, max_batch)
+        self._jobs: "queue.Queue[tuple[WriteJob, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, job: WriteJob) -> Any:
+        """Queue ``job`` and block until its batch has been committed."""
+        fut: Future = Future()
+        self._jobs.put((job, fut))
+        return fut.result()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._jobs.get()]
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process(batch)
+            except Exception as e:  # never let the writer thread die
+                logger.error(f"Write queue batch failed: {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    def _process(self, batch: list[tuple[WriteJob, Future]]) -> None:
+        done: list[tuple[Future, Any]] = []
+        with self._session_factory() as session:
+            for job, fut in batch:
+                try:
+                    with session.begin_nested():
+                        result = job(session)
+                except BaseException as e:
+                    fut.set_exception(e)
+                    continue
+                done.append((fut, result))
+            try:
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Write queue commit failed for {len(done)} job(s): {e}")
+                for fut, _ in done:
+                    fut.set_exception(e)
+                return
+        logger.debug(f"Write queue committed {len(done)} job(s) in one transaction")
+        for fut, result in done:
+            fut.set_result(result)
@@ -1,8 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 from typing import Dict, List, Any
 import requests
 import os
+import json
+import hashlib
 from datetime import datetime, timedelta
 
 LEAVE_API_URL = os.getenv("LEAVE_API_URL", "http://localhost:8001")
@@ -23,6 +25,56 @@ class PromptRequest(BaseModel):
 class ResourceRequest(BaseModel):
     uri: str
 
+def _content_version(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+class _StaticBody:
+    """
+    A JSON payload serialized once at import time. ``version`` is a hash of
+    the body, so it only changes when the content does; it doubles as the
+    ETag for conditional GETs and as ``_meta.version`` in listings.
+    """
+
+    def __init__(self, payload: dict, version: str | None = None):
+        self.body = json.dumps(payload, separators=(",", ":")).encode()
+        self.version = version or _content_version(self.body)
+        self.etag = f'"{self.version}"'
+
+    @classmethod
+    def resource(cls, uri: str, mime_type: str, text: str) -> "_StaticBody":
+        version = _content_version(text.encode())
+        contents = {"uri": uri, "mimeType": mime_type, "text": text, "_meta": {"version": version}}
+        return cls({"contents": [contents]}, version)
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match list names this body (weak comparison, ``*`` matches)."""
+        if if_none_match.strip() == "*":
+            return True
+        tags = (tag.strip() for tag in if_none_match.split(","))
+        return any((tag[2:] if tag.startswith("W/") else tag) == self.etag for tag in tags)
+
+    def response(self, request: Request | None = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if request is not None and self.matches(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+def _month_bounds(month: str) -> tuple[str, str]:
+    """First and last day (ISO) of a YYYY-MM month."""
+    first = datetime.strptime(month, "%Y-%m")
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")
+
+def _fetch_occupancy(month: str, team: str | None = None) -> dict:
+    """Per-day headcount on leave for a month, computed by the leave API."""
+    start, end = _month_bounds(month)
+    params = {"start_date": start, "end_date": end}
+    if team:
+        params["team"] = team
+    r = requests.get(f"{LEAVE_API_URL}/calendar/occupancy", params=params, timeout=5)
+    r.raise_for_status()
+    return r.json()
+
 @app.get("/mcp/health")
 def health():
     return {"status": "mcp server ok"}
@@ -31,39 +83,41 @@ def health():
 # MCP TOOLS - Actions the server can perform
 # ============================================================================
 
+TOOL_LIST = _StaticBody({
+    "tools": [
+        {
+            "name": "apply_leave",
+            "description": "Apply for leave on behalf of an employee",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "employee_id": {"type": "integer", "description": "Employee ID"},
+                    "start_date": {"type": "string", "description": "Leave start date (YYYY-MM-DD)"},
+                    "end_date": {"type": "string", "description": "Leave end date (YYYY-MM-DD)"},
+                    "leave_type": {"type": "string", "description": "Type of leave (vacation, sick, personal)"},
+                    "reason": {"type": "string", "description": "Optional reason for leave"}
+                },
+                "required": ["employee_id", "start_date", "end_date", "leave_type"]
+            }
+        },
+        {
+            "name": "get_balance",
+            "description": "Get leave balance for an employee",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "employee_id": {"type": "integer", "description": "Employee ID"}
+                },
+                "required": ["employee_id"]
+            }
+        }
+    ]
+})
+
 @app.get("/mcp/tools/list")
-def list_tools():
+def list_tools(http_request: Request):
     """List all available tools"""
-    return {
-        "tools": [
-            {
-                "name": "apply_leave",
-                "description": "Apply for leave on behalf of an employee",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "employee_id": {"type": "integer", "description": "Employee ID"},
-                        "start_date": {"type": "string", "description": "Leave start date (YYYY-MM-DD)"},
-                        "end_date": {"type": "string", "description": "Leave end date (YYYY-MM-DD)"},
-                        "leave_type": {"type": "string", "description": "Type of leave (vacation, sick, personal)"},
-                        "reason": {"type": "string", "description": "Optional reason for leave"}
-                    },
-                    "required": ["employee_id", "start_date", "end_date", "leave_type"]
-                }
-            },
-            {
-                "name": "get_balance",
-                "description": "Get leave balance for an employee",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "employee_id": {"type": "integer", "description": "Employee ID"}
-                    },
-                    "required": ["employee_id"]
-                }
-            }
-        ]
-    }
+    return TOOL_LIST.response(http_request)
 
 @app.post("/mcp/tools/apply_leave")
 def mcp_apply_leave(payload: ApplyLeavePayload):
@@ -92,40 +146,43 @@ def mcp_get_balance(employee_id: int):
 # MCP PROMPTS - Pre-defined prompt templates for common tasks
 # ============================================================================
 
+PROMPT_LIST = _StaticBody({
+    "prompts": [
+        {
+            "name": "leave_request_email",
+            "description": "Generate a professional email template for leave requests",
+            "arguments": [
+                {"name": "employee_name", "description": "Name of the employee", "required": True},
+                {"name": "start_date", "description": "Leave start date", "required": True},
+                {"name": "end_date", "description": "Leave end date", "required": True},
+                {"name": "leave_type", "description": "Type of leave", "required": True},
+                {"name": "reason", "description": "Reason for leave", "required": False}
+            ]
+        },
+        {
+            "name": "leave_policy_summary",
+            "description": "Generate a summary of leave policies for an employee",
+            "arguments": [
+                {"name": "employee_id", "description": "Employee ID to get current balance", "required": True},
+                {"name": "focus_area", "description": "Specific area to focus on (vacation, sick, etc.)", "required": False}
+            ]
+        },
+        {
+            "name": "leave_calendar_planning",
+            "description": "Help plan leave requests around holidays and team availability",
+            "arguments": [
+                {"name": "month", "description": "Month to plan for (YYYY-MM)", "required": True},
+                {"name": "team_size", "description": "Size of the team", "required": False},
+                {"name": "team", "description": "Team name used to look up existing bookings", "required": False}
+            ]
+        }
+    ]
+})
+
 @app.get("/mcp/prompts/list")
-def list_prompts():
+def list_prompts(http_request: Request):
     """List all available prompts"""
-    return {
-        "prompts": [
-            {
-                "name": "leave_request_email",
-                "description": "Generate a professional email template for leave requests",
-                "arguments": [
-                    {"name": "employee_name", "description": "Name of the employee", "required": True},
-                    {"name": "start_date", "description": "Leave start date", "required": True},
-                    {"name": "end_date", "description": "Leave end date", "required": True},
-                    {"name": "leave_type", "description": "Type of leave", "required": True},
-                    {"name": "reason", "description": "Reason for leave", "required": False}
-                ]
-            },
-            {
-                "name": "leave_policy_summary",
-                "description": "Generate a summary of leave policies for an employee",
-                "arguments": [
-                    {"name": "employee_id", "description": "Employee ID to get current balance", "required": True},
-                    {"name": "focus_area", "description": "Specific area to focus on (vacation, sick, etc.)", "required": False}
-                ]
-            },
-            {
-                "name": "leave_calendar_planning",
-                "description": "Help plan leave requests around holidays and team availability",
-                "arguments": [
-                    {"name": "month", "description": "Month to plan for (YYYY-MM)", "required": True},
-                    {"name": "team_size", "description": "Size of the team", "required": False}
-                ]
-            }
-        ]
-    }
+    return PROMPT_LIST.response(http_request)
 
 @app.post("/mcp/prompts/get")
 def get_prompt(request: PromptRequest):
@@ -211,6 +268,21 @@ For specific questions, please contact HR or your manager."""
         month = args.get("month", datetime.now().strftime("%Y-%m"))
         team_size = args.get("team_size", "small")
         
+        coverage_info = ""
+        try:
+            occ = _fetch_occupancy(month, args.get("team"))
+            busy = [d for d in occ["days"] if d["on_leave"]]
+            coverage_info = f"""
+
+### Current Bookings
+- People in scope: {occ["team_size"]}
+- Peak simultaneous leave: {occ["max_on_leave"]}{" on " + ", ".join(occ["peak_days"]) if occ["peak_days"] else ""}
+- Days with someone on leave: {len(busy)}"""
+            for d in busy:
+                coverage_info += f"\n  - {d['day']}: {d['on_leave']} off ({d['approved']} approved, {d['pending']} pending)"
+        except Exception:
+            pass
+        
         template = f"""Leave Calendar Planning for {month}
 
 ## Planning Considerations
@@ -218,7 +290,7 @@ For specific questions, please contact HR or your manager."""
 ### Team Coverage Guidelines
 - Team size: {team_size}
 - Maximum simultaneous leave: {"1 person" if team_size == "small" else "20% of team"}
-- Critical periods: Month-end, project deadlines, team meetings
+- Critical periods: Month-end, project deadlines, team meetings{coverage_info}
 
 ### Best Practices
 1. **Plan Early**: Submit requests 2-4 weeks in advance
@@ -250,50 +322,7 @@ Remember: Early planning leads to better approval rates and less stress for ever
 # MCP RESOURCES - Data and content the server can provide
 # ============================================================================
 
-@app.get("/mcp/resources/list")
-def list_resources():
-    """List all available resources"""
-    return {
-        "resources": [
-            {
-                "uri": "leave://policies/annual",
-                "name": "Annual Leave Policy",
-                "description": "Complete annual leave policy document",
-                "mimeType": "text/plain"
-            },
-            {
-                "uri": "leave://policies/sick", 
-                "name": "Sick Leave Policy",
-                "description": "Sick leave policy and procedures",
-                "mimeType": "text/plain"
-            },
-            {
-                "uri": "leave://forms/application",
-                "name": "Leave Application Form",
-                "description": "Standard leave application form template",
-                "mimeType": "text/plain"
-            },
-            {
-                "uri": "leave://calendar/holidays",
-                "name": "Public Holidays Calendar",
-                "description": "Current year public holidays list",
-                "mimeType": "application/json"
-            },
-            {
-                "uri": "leave://reports/team-status",
-                "name": "Team Leave Status",
-                "description": "Current leave status for all team members",
-                "mimeType": "application/json"
-            }
-        ]
-    }
-
-@app.post("/mcp/resources/read")
-def read_resource(request: ResourceRequest):
-    """Read a specific resource"""
-    
-    if request.uri == "leave://policies/annual":
-        content = """ANNUAL LEAVE POLICY
+ANNUAL_LEAVE_POLICY = """ANNUAL LEAVE POLICY
 
 1. ENTITLEMENT
    - Full-time employees: 25 days per calendar year
@@ -320,10 +349,7 @@ def read_resource(request: ResourceRequest):
    - Do not count against annual leave entitlement
    - If holiday falls during leave period, leave day is credited back"""
 
-        return {"contents": [{"uri": request.uri, "mimeType": "text/plain", "text": content}]}
-    
-    elif request.uri == "leave://policies/sick":
-        content = """SICK LEAVE POLICY
+SICK_LEAVE_POLICY = """SICK LEAVE POLICY
 
 1. ENTITLEMENT
    - 10 days per calendar year for all employees
@@ -350,10 +376,7 @@ def read_resource(request: ResourceRequest):
    - Contact HR for assistance and options
    - May require independent medical examination"""
 
-        return {"contents": [{"uri": request.uri, "mimeType": "text/plain", "text": content}]}
-    
-    elif request.uri == "leave://forms/application":
-        content = """LEAVE APPLICATION FORM
+LEAVE_APPLICATION_FORM = """LEAVE APPLICATION FORM
 
 Employee Information:
 - Name: ________________
@@ -393,11 +416,88 @@ HR Use Only:
 - Processed by: ________________
 - Date: ________"""
 
-        return {"contents": [{"uri": request.uri, "mimeType": "text/plain", "text": content}]}
-    
-    elif request.uri == "leave://calendar/holidays":
-        # Get current year holidays (simplified example)
+# Fixed documents, served from a precomputed body (see _StaticBody)
+STATIC_RESOURCES = {
+    "leave://policies/annual": _StaticBody.resource("leave://policies/annual", "text/plain", ANNUAL_LEAVE_POLICY),
+    "leave://policies/sick": _StaticBody.resource("leave://policies/sick", "text/plain", SICK_LEAVE_POLICY),
+    "leave://forms/application": _StaticBody.resource("leave://forms/application", "text/plain", LEAVE_APPLICATION_FORM),
+}
+
+_RESOURCE_LIST = {
+    "resources": [
+        {
+            "uri": "leave://policies/annual",
+            "name": "Annual Leave Policy",
+            "description": "Complete annual leave policy document",
+            "mimeType": "text/plain"
+        },
+        {
+            "uri": "leave://policies/sick", 
+            "name": "Sick Leave Policy",
+            "description": "Sick leave policy and procedures",
+            "mimeType": "text/plain"
+        },
+        {
+            "uri": "leave://forms/application",
+            "name": "Leave Application Form",
+            "description": "Standard leave application form template",
+            "mimeType": "text/plain"
+        },
+        {
+            "uri": "leave://calendar/holidays",
+            "name": "Public Holidays Calendar",
+            "description": "Current year public holidays list",
+            "mimeType": "application/json"
+        },
+        {
+            "uri": "leave://calendar/occupancy",
+            "name": "Leave Occupancy Calendar",
+            "description": "Per-day headcount on leave for a month; use leave://calendar/occupancy/YYYY-MM, optionally with ?team=NAME",
+            "mimeType": "application/json"
+        },
+        {
+            "uri": "leave://reports/team-status",
+            "name": "Team Leave Status",
+            "description": "Current leave status for all team members",
+            "mimeType": "application/json"
+        }
+    ]
+}
+for _entry in _RESOURCE_LIST["resources"]:
+    if _entry["uri"] in STATIC_RESOURCES:
+        _entry["_meta"] = {"version": STATIC_RESOURCES[_entry["uri"]].version}
+RESOURCE_LIST = _StaticBody(_RESOURCE_LIST)
+
+@app.get("/mcp/resources/list")
+def list_resources(http_request: Request):
+    """List all available resources"""
+    return RESOURCE_LIST.response(http_request)
+
+@app.get("/mcp/resources/read")
+def read_resource_conditional(uri: str, http_request: Request):
+    """Read a resource by query string; fixed documents honour If-None-Match."""
+    static = STATIC_RESOURCES.get(uri)
+    if static is not None:
+        return static.response(http_request)
+    return read_resource(ResourceRequest(uri=uri))
+
+@app.post("/mcp/resources/read")
+def read_resource(request: ResourceRequest):
+    """Read a specific resource"""
+    static = STATIC_RESOURCES.get(request.uri)
+    if static is not None:
+        return static.response()
+
+    if request.uri == "leave://calendar/holidays":
+        # Holiday calendar comes from the API (same calendar used for leave day counts)
         current_year = datetime.now().year
+        try:
+            response = requests.get(f"{LEAVE_API_URL}/calendar/holidays", params={"year": current_year}, timeout=5)
+            if response.status_code == 200:
+                return {"contents": [{"uri": request.uri, "mimeType": "application/json", "text": json.dumps(response.json())}]}
+        except requests.RequestException:
+            pass
+        # Fallback when the API is unreachable (simplified example)
         holidays = {
             "year": current_year,
             "holidays": [
@@ -410,6 +510,20 @@ HR Use Only:
         }
         return {"contents": [{"uri": request.uri, "mimeType": "application/json", "text": str(holidays)}]}
     
+    elif request.uri.startswith("leave://calendar/occupancy"):
+        path, _, query = request.uri.partition("?")
+        month = path[len("leave://calendar/occupancy"):].strip("/") or datetime.now().strftime("%Y-%m")
+        team = query[len("team="):] if query.startswith("team=") else None
+        try:
+            _month_bounds(month)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid month '{month}', expected YYYY-MM")
+        try:
+            occupancy = _fetch_occupancy(month, team)
+        except requests.RequestException as e:
+            raise HTTPException(status_code=502, detail=f"Leave API unavailable: {e}")
+        return {"contents": [{"uri": request.uri, "mimeType": "application/json", "text": json.dumps(occupancy)}]}
+    
     elif request.uri == "leave://reports/team-status":
         # This would typically fetch from the API, but for demo purposes:
         try:
@@ -424,11 +538,11 @@ HR Use Only:
                 
                 for emp in employees[:5]:  # Limit to first 5 for demo
                     try:
-                        balance_response = requests.get(f"{LEAVE_API_URL}/employees/{emp['id']}/balance", timeout=5)
-                        requests_response = requests.get(f"{LEAVE_API_URL}/employees/{emp['id']}/leave-requests", timeout=5)
-                        
-                        balance = balance_response.json() if balance_response.status_code == 200 else {}
-                        recent_requests = requests_response.json() if requests_response.status_code == 200 else []
+                        # One call for balance + recent requests instead of two
+                        profile_response = requests.get(f"{LEAVE_API_URL}/employees/{emp['id']}/profile", timeout=5)
+                        profile = profile_response.json() if profile_response.status_code == 200 else {}
+                        balance = profile.get("balance") or {}
+                        recent_requests = profile.get("recent_requests") or []
                         
                         # Check for pending or approved future leave
                         upcoming_leave = []
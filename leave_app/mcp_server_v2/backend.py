@@ -0,0 +1,167 @@
+"""
+Data access for the Leave MCP server.
+
+LEAVE_MCP_BACKEND picks how tools reach leave data:
+
+* ``http`` (default): calls the Leave API at LEAVE_API_URL over a pooled
+  keep-alive session.
+* ``direct``: imports ``leave_app.api`` and runs the same service functions
+  the API routes use, against the database configured for this process
+  (LEAVE_DATABASE_URL and friends). For deployments where the MCP server
+  can reach the database itself, this removes the HTTP hop and the extra
+  JSON round trip.
+
+Both backends return JSON-shaped dicts and lists, and raise BackendError
+when the API would have answered with an error status.
+"""
+
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Optional
+from urllib.parse import quote
+
+import requests
+
+LEAVE_MCP_BACKEND = os.getenv("LEAVE_MCP_BACKEND", "http").strip().lower()
+
+
+class BackendError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _segment(value: Any) -> str:
+    """``value`` escaped for use as one URL path segment."""
+    return quote(str(value), safe="")
+
+
+class HttpBackend:
+    name = "http"
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def _call(self, method: str, path: str, **kwargs) -> Any:
+        response = self._session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        if response.status_code != 200:
+            raise BackendError(response.status_code, response.text)
+        try:
+            return response.json()
+        except ValueError:
+            raise BackendError(502, f"Invalid JSON in response from leave API: {response.text[:200]}")
+
+    def create_leave_request(self, employee_id: int, data: dict[str, Any]) -> dict[str, Any]:
+        return self._call("POST", f"/employees/{_segment(employee_id)}/leave-requests", json=data)
+
+    def get_balance(self, employee_id: int) -> dict[str, Any]:
+        return self._call("GET", f"/employees/{_segment(employee_id)}/balance")
+
+    def get_balances(self, employee_ids: list[int]) -> dict[str, Any]:
+        return self._call("GET", "/balances", params={"employee_ids": employee_ids})
+
+    def list_leave_requests(self, employee_id: int) -> list[dict[str, Any]]:
+        return self._call("GET", f"/employees/{_segment(employee_id)}/leave-requests")
+
+    def leave_request_page(self, employee_id: int, start: Optional[date], end: Optional[date],
+                           limit: int, cursor: Optional[str]) -> dict[str, Any]:
+        params = {"start_date": start and start.isoformat(), "end_date": end and end.isoformat(),
+                  "limit": limit, "cursor": cursor}
+        return self._call("GET", f"/employees/{_segment(employee_id)}/leave-requests/page", params=params)
+
+    def search_employees(self, query: str, limit: int) -> list[dict[str, Any]]:
+        return self._call("GET", "/employees/search", params={"q": query, "limit": limit})
+
+    def occupancy(self, start: date, end: date, team: Optional[str] = None) -> dict[str, Any]:
+        params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+        if team:
+            params["team"] = team
+        return self._call("GET", "/calendar/occupancy", params=params)
+
+
+def _import_leave_api() -> None:
+    try:
+        import leave_app.api  # noqa: F401
+    except ImportError:
+        # Running from leave_app/mcp_server_v2 inside the repository checkout
+        sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+class DirectBackend:
+    name = "direct"
+
+    def __init__(self) -> None:
+        _import_leave_api()
+        from fastapi import HTTPException
+        from pydantic import ValidationError
+        from leave_app.api import db, schemas, services
+
+        db.ensure_schema()
+        self._SessionLocal = db.SessionLocal
+        self._schemas = schemas
+        self._services = services
+        self._HTTPException = HTTPException
+        self._ValidationError = ValidationError
+
+    def _run(self, fn: Callable[..., Any], *args: Any, with_db: bool = True) -> Any:
+        """Call a service function, mapping its client errors to BackendError like the API would."""
+        try:
+            if not with_db:
+                return fn(*args)
+            with self._SessionLocal() as session:
+                return fn(session, *args)
+        except self._HTTPException as e:
+            raise BackendError(e.status_code, json.dumps({"detail": e.detail}))
+        except self._ValidationError as e:
+            raise BackendError(422, str(e))
+
+    def _dump(self, model, obj) -> dict[str, Any]:
+        return model.model_validate(obj).model_dump(mode="json")
+
+    def create_leave_request(self, employee_id: int, data: dict[str, Any]) -> dict[str, Any]:
+        def _create() -> Any:
+            req = self._schemas.LeaveRequestCreate(**data)
+            return self._dump(self._schemas.LeaveRequest, self._services.create_leave_request(employee_id, req))
+        return self._run(_create, with_db=False)
+
+    def get_balance(self, employee_id: int) -> dict[str, Any]:
+        return self._run(lambda db: self._dump(self._schemas.LeaveBalance, self._services.get_balance(db, employee_id)))
+
+    def get_balances(self, employee_ids: list[int]) -> dict[str, Any]:
+        return self._run(lambda db: self._dump(
+            self._schemas.LeaveBalanceBatch, self._services.get_balances(db, employee_ids)
+        ))
+
+    def list_leave_requests(self, employee_id: int) -> list[dict[str, Any]]:
+        return self._run(lambda db: [
+            self._dump(self._schemas.LeaveRequest, r) for r in self._services.list_leave_requests(db, employee_id)
+        ])
+
+    def leave_request_page(self, employee_id: int, start: Optional[date], end: Optional[date],
+                           limit: int, cursor: Optional[str]) -> dict[str, Any]:
+        return self._run(lambda db: self._dump(
+            self._schemas.LeaveRequestPage,
+            self._services.leave_request_page(db, employee_id, start, end, limit, cursor),
+        ))
+
+    def search_employees(self, query: str, limit: int) -> list[dict[str, Any]]:
+        return self._run(self._services.search_employees, query, limit, with_db=False)
+
+    def occupancy(self, start: date, end: date, team: Optional[str] = None) -> dict[str, Any]:
+        return self._run(lambda db: self._dump(
+            self._schemas.LeaveOccupancy, self._services.occupancy(db, start, end, team)
+        ))
+
+
+def make_backend(base_url: str, timeout: float):
+    if LEAVE_MCP_BACKEND == "direct":
+        return DirectBackend()
+    if LEAVE_MCP_BACKEND != "http":
+        raise ValueError(f"Unknown LEAVE_MCP_BACKEND '{LEAVE_MCP_BACKEND}', expected 'http' or 'direct'")
+    return HttpBackend(base_url, timeout)
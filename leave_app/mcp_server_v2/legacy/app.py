@@ -1,14 +1,25 @@
 import asyncio
 import os
+import sys
 import logging
 import json
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 import requests
+from urllib.parse import quote
+
+try:
+    from mcp_common.sse import PROTOCOL_VERSIONS, JsonRpcError, SseRegistry
+except ImportError:
+    # Started as a script from this directory inside the repository checkout; appended so
+    # uvicorn's "app:app" still finds this module rather than the checkout's top-level app.py
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from mcp_common.sse import PROTOCOL_VERSIONS, JsonRpcError, SseRegistry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -65,6 +76,13 @@ _default_leave_api = (
 )
 LEAVE_API_URL = os.getenv("LEAVE_API_URL", _default_leave_api)
 
+# MCP over SSE (see mcp_common/sse.py): GET /mcp opens the stream, JSON-RPC messages
+# are POSTed to /mcp/messages?session_id=... and answered on the stream.
+SSE_QUEUE_SIZE = int(os.getenv("LEAVE_MCP_SSE_QUEUE_SIZE", "64"))
+SSE_MAX_INFLIGHT = int(os.getenv("LEAVE_MCP_SSE_MAX_INFLIGHT", "16"))
+SSE_MAX_CONNECTIONS = int(os.getenv("LEAVE_MCP_SSE_MAX_CONNECTIONS", "1000"))
+SSE_IDLE_TIMEOUT_SECONDS = float(os.getenv("LEAVE_MCP_SSE_IDLE_TIMEOUT_SECONDS", "300"))
+
 @app.get("/")
 async def root():
     """Root endpoint with server information"""
@@ -72,9 +90,11 @@ async def root():
         "name": "Leave MCP Server v2",
         "version": "2.0.0",
         "description": "MCP-compliant leave management server",
-        "transport": "streamable-http",
+        "transport": "sse",
         "endpoints": {
-                "mcp": "/mcp",
+            "mcp": "/mcp",
+            "messages": "/mcp/messages?session_id=...",
+            "sse_metrics": "/mcp/metrics",
             "health": "/health",
             "tools": "/mcp/tools/list",
             "prompts": "/mcp/prompts/list",
@@ -96,35 +116,18 @@ async def health_check():
 
 @app.get("/mcp")
 async def mcp_endpoint(request: Request):
-    """Streamable HTTP endpoint for MCP communication"""
-    logger.info("MCP HTTP stream connection established")
-    
-    async def event_stream():
-        try:
-            # Send initial hello message
-            yield f"data: {json.dumps({'type': 'hello', 'server': 'Leave MCP Server v2', 'version': '2.0.0'})}\n\n"
-            
-            # Keep connection alive with periodic pings
-            counter = 0
-            while True:
-                counter += 1
-                yield f"data: {json.dumps({'type': 'ping', 'timestamp': counter})}\n\n"
-                await asyncio.sleep(30)
-                
-        except Exception as e:
-            logger.error(f"SSE stream error: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-    
-    return StreamingResponse(
-        event_stream(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*"
-        }
-    )
+    """MCP over SSE: event stream for one client connection"""
+    return await sse_registry.stream(request, "/mcp/messages")
+
+@app.post("/mcp/messages")
+async def post_message(request: Request, session_id: str):
+    """JSON-RPC messages for the SSE connection `session_id`; answers arrive on its stream"""
+    return await sse_registry.post(request, session_id)
+
+@app.get("/mcp/metrics")
+async def sse_metrics():
+    """Open SSE connections, their in-flight requests and queued messages"""
+    return sse_registry.metrics()
 
 @app.post("/mcp/tools/list")
 async def list_tools():
@@ -182,9 +185,8 @@ async def apply_leave(arguments: Dict[str, Any]) -> Dict[str, Any]:
             if field not in arguments:
                 raise ValueError(f"Missing required field: {field}")
         
-        # Prepare request data
+        # Prepare request data (field names of the Leave API's LeaveRequestCreate)
         leave_data = {
-            "employee_id": arguments["employee_id"],
             "start_date": arguments["start_date"],
             "end_date": arguments["end_date"],
             "leave_type": arguments["leave_type"],
@@ -192,8 +194,9 @@ async def apply_leave(arguments: Dict[str, Any]) -> Dict[str, Any]:
         }
         
         # Make API call
-        response = requests.post(
-            f"{LEAVE_API_URL}/leave",
+        response = await asyncio.to_thread(
+            requests.post,
+            f"{LEAVE_API_URL}/employees/{quote(str(arguments['employee_id']), safe='')}/leave-requests",
             json=leave_data,
             timeout=30
         )
@@ -253,8 +256,9 @@ async def get_balance(arguments: Dict[str, Any]) -> Dict[str, Any]:
             raise ValueError("employee_id is required")
         
         # Make API call
-        response = requests.get(
-            f"{LEAVE_API_URL}/balance/{employee_id}",
+        response = await asyncio.to_thread(
+            requests.get,
+            f"{LEAVE_API_URL}/employees/{quote(str(employee_id), safe='')}/balance",
             timeout=30
         )
         
@@ -351,6 +355,41 @@ async def list_resources():
     ]
     return {"resources": [resource.dict() for resource in resources]}
 
+TOOL_HANDLERS = {
+    "apply_leave": apply_leave,
+    "get_balance": get_balance,
+}
+
+async def dispatch(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Result of one JSON-RPC request received over SSE"""
+    if method == "initialize":
+        requested = params.get("protocolVersion")
+        return {
+            "protocolVersion": requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0],
+            # Prompts and resources are only listed over REST (no get/read), so not offered here
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": "Leave MCP Server v2", "version": "2.0.0"},
+        }
+    if method == "ping":
+        return {}
+    if method == "tools/list":
+        return await list_tools()
+    if method == "tools/call":
+        handler = TOOL_HANDLERS.get(params.get("name"))
+        if handler is None:
+            raise JsonRpcError(-32602, f"Unknown tool: {params.get('name')}")
+        return await handler(params.get("arguments") or {})
+    raise JsonRpcError(-32601, f"Method not found: {method}")
+
+sse_registry = SseRegistry(
+    dispatch,
+    max_connections=SSE_MAX_CONNECTIONS,
+    max_inflight=SSE_MAX_INFLIGHT,
+    queue_size=SSE_QUEUE_SIZE,
+    idle_timeout_seconds=SSE_IDLE_TIMEOUT_SECONDS,
+    logger=logger,
+)
+
 def main():
     """Main entry point for the web application"""
     port = int(os.getenv("PORT", 8000))
@@ -1,11 +1,14 @@
 import asyncio
+import functools
 import json
 import os
 import logging
 from typing import Any, Dict, List, Optional, Union, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import requests
+from requests.adapters import HTTPAdapter
 from mcp.server import Server
 from mcp.types import (
     Resource, Tool, Prompt, TextContent, CallToolRequest, CallToolResult,
@@ -24,9 +27,21 @@ logger = logging.getLogger("leave-mcp-v2")
 # Environment configuration
 LEAVE_API_URL = os.getenv("LEAVE_API_URL", "http://localhost:8001")
 
+# The API client is blocking: requests run on a bounded thread pool so a slow call does not
+# stall the event loop (and with it every other session), and each tool may have at most
+# LEAVE_MCP_TOOL_CONCURRENCY calls in flight so one busy tool cannot take all the threads.
+API_THREADS = int(os.getenv("LEAVE_MCP_API_THREADS", "16"))
+TOOL_CONCURRENCY = int(os.getenv("LEAVE_MCP_TOOL_CONCURRENCY", "8"))
+API_TIMEOUT = 30
+
 class LeaveMcpServer:
     def __init__(self):
         self.app = Server("leave-mcp-v2")
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_maxsize=API_THREADS))
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=API_THREADS))
+        self._executor = ThreadPoolExecutor(max_workers=API_THREADS, thread_name_prefix="leave-api")
+        self._tool_limits = {name: asyncio.Semaphore(TOOL_CONCURRENCY) for name in ("apply_leave", "get_balance")}
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -292,6 +307,12 @@ LEAVE POLICIES AND PROCEDURES
                 logger.error(f"Error reading resource {uri}: {str(e)}")
                 raise McpError(ErrorCode.INTERNAL_ERROR, f"Resource reading failed: {str(e)}")
 
+    async def _api(self, tool: str, method: str, path: str, **kwargs) -> requests.Response:
+        """Send an API request from the thread pool, within the calling tool's concurrency limit"""
+        async with self._tool_limits[tool]:
+            call = functools.partial(self._session.request, method, f"{LEAVE_API_URL}{path}", timeout=API_TIMEOUT, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
     async def _apply_leave(self, arguments: Dict[str, Any]) -> CallToolResult:
         """Apply for leave using the leave API"""
         try:
@@ -311,11 +332,7 @@ LEAVE POLICIES AND PROCEDURES
             }
             
             # Make API call
-            response = requests.post(
-                f"{LEAVE_API_URL}/leave",
-                json=leave_data,
-                timeout=30
-            )
+            response = await self._api("apply_leave", "POST", "/leave", json=leave_data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -372,10 +389,7 @@ LEAVE POLICIES AND PROCEDURES
                 raise ValueError("employee_id is required")
             
             # Make API call
-            response = requests.get(
-                f"{LEAVE_API_URL}/balance/{employee_id}",
-                timeout=30
-            )
+            response = await self._api("get_balance", "GET", f"/balance/{employee_id}")
             
             if response.status_code == 200:
                 balance_data = response.json()
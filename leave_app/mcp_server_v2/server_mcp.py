@@ -11,12 +11,27 @@ import requests
 import time
 import json
 import uuid
+import hashlib
+from datetime import date, datetime, timedelta
+from pathlib import Path
 from typing import Any, Literal, cast
 
 # Supported MCP transports type alias (module scope to satisfy type checkers)
 TransportType = Literal["stdio", "sse", "streamable-http"]
-from mcp.server.fastmcp import FastMCP
+import anyio
+import uvicorn
 from pydantic import BaseModel, Field
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+try:
+    from backend import BackendError, make_backend  # started as a script from this directory
+    from cache import employee_tag, tool_cache
+    from results import ShapedFastMCP
+except ImportError:
+    from .backend import BackendError, make_backend
+    from .cache import employee_tag, tool_cache
+    from .results import ShapedFastMCP
 
 # Configure logging (level and format via env)
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -59,10 +74,25 @@ _default_leave_api = (
 )
 LEAVE_API_URL = os.getenv("LEAVE_API_URL", _default_leave_api)
 
+# Resource pages stay small enough for model context; the NDJSON export streams bigger pages
+RESOURCE_PAGE_SIZE = int(os.getenv("LEAVE_MCP_RESOURCE_PAGE_SIZE", "100"))
+EXPORT_PAGE_SIZE = 500
+
+# Leave data source: the Leave API over HTTP, or in-process (LEAVE_MCP_BACKEND=direct)
+backend = make_backend(LEAVE_API_URL, HTTP_TIMEOUT)
+
+# Horizontal scaling: with several uvicorn workers (or instances behind a load balancer)
+# consecutive requests of one client land on different processes, so streamable-http runs
+# stateless: no MCP session is kept between requests. Share the tool cache through
+# LEAVE_MCP_CACHE_URL so writes invalidate it everywhere.
+WORKERS = max(1, int(os.getenv("LEAVE_MCP_WORKERS", "1")))
+STATELESS_HTTP = os.getenv("LEAVE_MCP_STATELESS_HTTP", "true" if WORKERS > 1 else "false").strip().lower() in {"1", "true", "yes"}
+
 # Create FastMCP server
-mcp = FastMCP(
+mcp = ShapedFastMCP(
     name="Leave Management Server v2",
-    instructions="A leave management system for applying for leave and checking balances. Only 'annual' and 'sick' leave types are supported."
+    instructions="A leave management system for applying for leave and checking balances. Only 'annual' and 'sick' leave types are supported.",
+    stateless_http=STATELESS_HTTP,
 )
 
 # Pydantic models for structured responses
@@ -82,6 +112,19 @@ class LeaveBalance(BaseModel):
     annual_balance: int = Field(description="Annual leave days remaining")
     sick_balance: int = Field(description="Sick leave days remaining")
 
+class LeaveBalances(BaseModel):
+    """Leave balances for several employees."""
+    balances: list[LeaveBalance] = Field(description="Balances, in the order the employee IDs were given")
+    missing_employee_ids: list[int] = Field(description="Employee IDs with no balance on record")
+
+class EmployeeMatch(BaseModel):
+    """Employee directory search hit."""
+    employee_id: int = Field(description="Employee ID")
+    name: str = Field(description="Employee name")
+    email: str = Field(description="Employee email")
+    team: str | None = Field(default=None, description="Team, if set")
+    score: float = Field(description="Match quality from 0 to 1 (1 = exact email)")
+
 @mcp.tool()
 def apply_leave(
     employee_id: int,
@@ -119,40 +162,30 @@ def apply_leave(
             "reason": reason,
         }
 
-        url = f"{LEAVE_API_URL}/employees/{employee_id}/leave-requests"
-        logger.info(f"[{cid}] apply_leave called for employee_id={employee_id}, url={url}")
+        logger.info(f"[{cid}] apply_leave called for employee_id={employee_id}, backend={backend.name}")
         logger.debug(f"[{cid}] Payload: {_safe_json(leave_data)}")
 
-        # Make API call
         t0 = time.monotonic()
-        response = requests.post(url, json=leave_data, timeout=HTTP_TIMEOUT)
+        try:
+            result = backend.create_leave_request(employee_id, leave_data)
+        except BackendError as e:
+            logger.error(f"[{cid}] Leave application failed: {e.status_code} - {_truncate(e.detail)}")
+            raise Exception(f"Leave application failed: {e.detail}")
+        finally:
+            # Even a failed call may have reached the database (e.g. a timeout)
+            tool_cache.invalidate(employee_tag(employee_id))
         elapsed_ms = int((time.monotonic() - t0) * 1000)
-        logger.info(
-            f"[{cid}] POST {url} -> {response.status_code} in {elapsed_ms}ms"
+        logger.info(f"[{cid}] create_leave_request -> ok in {elapsed_ms}ms")
+        logger.debug(f"[{cid}] Parsed response: {_safe_json(result)}")
+        return LeaveApplication(
+            employee_id=employee_id,
+            start_date=start_date,
+            end_date=end_date,
+            leave_type=cast(Literal["annual", "sick"], normalized_type),
+            reason=reason,
+            status=result.get("status", "submitted"),
+            application_id=result.get("id", 0),
         )
-        logger.debug(f"[{cid}] Response headers: {_safe_json(dict(response.headers), 1500)}")
-
-        if response.status_code == 200:
-            try:
-                result = response.json()
-            except ValueError:
-                logger.error(f"[{cid}] Failed to parse JSON response: {response.text}")
-                raise Exception("Invalid JSON in response from leave API")
-            logger.debug(f"[{cid}] Parsed response: {_safe_json(result)}")
-            return LeaveApplication(
-                employee_id=employee_id,
-                start_date=start_date,
-                end_date=end_date,
-                leave_type=cast(Literal["annual", "sick"], normalized_type),
-                reason=reason,
-                status=result.get("status", "submitted"),
-                application_id=result.get("id", 0),
-            )
-        else:
-            logger.error(
-                f"[{cid}] Leave application failed: {response.status_code} - {_truncate(response.text)}"
-            )
-            raise Exception(f"Leave application failed: {response.text}")
 
     except requests.exceptions.RequestException as e:
         logger.error(f"[{cid}] Network error applying for leave: {e}", exc_info=True)
@@ -174,34 +207,25 @@ def get_balance(employee_id: int) -> LeaveBalance:
     """
     cid = _new_cid()
     try:
-        url = f"{LEAVE_API_URL}/employees/{employee_id}/balance"
-        logger.info(f"[{cid}] get_balance called for employee_id={employee_id}, url={url}")
+        logger.info(f"[{cid}] get_balance called for employee_id={employee_id}, backend={backend.name}")
 
-        # Make API call
         t0 = time.monotonic()
-        response = requests.get(url, timeout=HTTP_TIMEOUT)
-        elapsed_ms = int((time.monotonic() - t0) * 1000)
-        logger.info(f"[{cid}] GET {url} -> {response.status_code} in {elapsed_ms}ms")
-
-        if response.status_code == 200:
-            try:
-                result = response.json()
-            except ValueError:
-                logger.error(f"[{cid}] Failed to parse JSON response: {response.text}")
-                raise Exception("Invalid JSON in response from leave API")
-            logger.debug(f"[{cid}] Parsed response: {_safe_json(result)}")
-            annual = result.get("annual_balance", 0)
-            sick = result.get("sick_balance", 0)
-            return LeaveBalance(
-                employee_id=employee_id,
-                annual_balance=annual,
-                sick_balance=sick,
+        try:
+            result = tool_cache.get_or_call(
+                "get_balance", {"employee_id": employee_id}, [employee_tag(employee_id)],
+                lambda: backend.get_balance(employee_id),
             )
-        else:
-            logger.error(
-                f"[{cid}] Balance check failed: {response.status_code} - {_truncate(response.text)}"
-            )
-            raise Exception(f"Balance check failed: {response.text}")
+        except BackendError as e:
+            logger.error(f"[{cid}] Balance check failed: {e.status_code} - {_truncate(e.detail)}")
+            raise Exception(f"Balance check failed: {e.detail}")
+        elapsed_ms = int((time.monotonic() - t0) * 1000)
+        logger.info(f"[{cid}] get_balance -> ok in {elapsed_ms}ms")
+        logger.debug(f"[{cid}] Parsed response: {_safe_json(result)}")
+        return LeaveBalance(
+            employee_id=employee_id,
+            annual_balance=result.get("annual_balance", 0),
+            sick_balance=result.get("sick_balance", 0),
+        )
 
     except requests.exceptions.RequestException as e:
         logger.error(f"[{cid}] Network error getting balance: {e}", exc_info=True)
@@ -210,81 +234,253 @@ def get_balance(employee_id: int) -> LeaveBalance:
         logger.error(f"[{cid}] Error getting balance: {e}", exc_info=True)
         raise Exception(f"Error getting balance: {str(e)}")
 
-@mcp.resource("leave://employee/{employee_id}/applications")
-def get_employee_applications(employee_id: str) -> str:
+@mcp.tool()
+def get_balances(employee_ids: list[int]) -> LeaveBalances:
     """
-    Get leave applications for a specific employee.
+    Get leave balances for several employees at once (annual and sick only).
+    Prefer this over repeated get_balance calls, e.g. for a whole team.
 
     Args:
-        employee_id: Employee ID to get applications for
+        employee_ids: IDs of the employees to check (up to 500)
 
     Returns:
-        JSON string containing the employee's leave applications
+        LeaveBalances: One balance per employee found, plus the IDs that were not found
     """
     cid = _new_cid()
-    url = f"{LEAVE_API_URL}/leave/{employee_id}/applications"
     try:
-        logger.info(f"[{cid}] get_employee_applications called for employee_id={employee_id}, url={url}")
+        ids = list(dict.fromkeys(employee_ids))
+        logger.info(f"[{cid}] get_balances called for {len(ids)} employees, backend={backend.name}")
+
         t0 = time.monotonic()
-        response = requests.get(url, timeout=HTTP_TIMEOUT)
+        try:
+            result = tool_cache.get_or_call(
+                "get_balances", {"employee_ids": sorted(ids)}, [employee_tag(i) for i in ids],
+                lambda: backend.get_balances(ids),
+            )
+        except BackendError as e:
+            logger.error(f"[{cid}] Balance check failed: {e.status_code} - {_truncate(e.detail)}")
+            raise Exception(f"Balance check failed: {e.detail}")
         elapsed_ms = int((time.monotonic() - t0) * 1000)
-        logger.info(f"[{cid}] GET {url} -> {response.status_code} in {elapsed_ms}ms")
+        logger.info(f"[{cid}] get_balances -> {len(result['balances'])} balances in {elapsed_ms}ms")
+        by_id = {b["employee_id"]: b for b in result["balances"]}
+        return LeaveBalances(
+            balances=[
+                LeaveBalance(
+                    employee_id=i,
+                    annual_balance=by_id[i].get("annual_balance", 0),
+                    sick_balance=by_id[i].get("sick_balance", 0),
+                )
+                for i in ids if i in by_id
+            ],
+            missing_employee_ids=[i for i in ids if i not in by_id],
+        )
+
+    except requests.exceptions.RequestException as e:
+        logger.error(f"[{cid}] Network error getting balances: {e}", exc_info=True)
+        raise Exception(f"Network error: {str(e)}")
+    except Exception as e:
+        logger.error(f"[{cid}] Error getting balances: {e}", exc_info=True)
+        raise Exception(f"Error getting balances: {str(e)}")
+
+@mcp.tool()
+def find_employee(query: str, limit: int = 5) -> list[EmployeeMatch]:
+    """
+    Look up employees by name or email so you can get their employee ID.
+
+    Args:
+        query: Name, part of a name, or email (e.g. "Alice", "alice@example.com")
+        limit: Maximum number of matches to return
 
-        if response.status_code == 200:
-            body = _truncate(response.text, 2000)
-            logger.debug(f"[{cid}] Applications response body: {body}")
-            return response.text
-        else:
-            logger.error(f"[{cid}] Failed to get applications: {response.status_code} - {_truncate(response.text)}")
-            return f'{{"error": "Failed to get applications for employee {employee_id}"}}'
+    Returns:
+        list[EmployeeMatch]: Best matches first
+    """
+    cid = _new_cid()
+    try:
+        logger.info(f"[{cid}] find_employee called for query={query!r}, backend={backend.name}")
+
+        t0 = time.monotonic()
+        try:
+            matches = backend.search_employees(query, limit)
+        except BackendError as e:
+            logger.error(f"[{cid}] Employee search failed: {e.status_code} - {_truncate(e.detail)}")
+            raise Exception(f"Employee search failed: {e.detail}")
+        elapsed_ms = int((time.monotonic() - t0) * 1000)
+        logger.info(f"[{cid}] search_employees -> {len(matches)} matches in {elapsed_ms}ms")
+        return [
+            EmployeeMatch(
+                employee_id=m["id"], name=m["name"], email=m["email"], team=m.get("team"), score=m["score"],
+            )
+            for m in matches
+        ]
 
+    except requests.exceptions.RequestException as e:
+        logger.error(f"[{cid}] Network error searching employees: {e}", exc_info=True)
+        raise Exception(f"Network error: {str(e)}")
+    except Exception as e:
+        logger.error(f"[{cid}] Error searching employees: {e}", exc_info=True)
+        raise Exception(f"Error searching employees: {str(e)}")
+
+def _applications_page(employee_id: str, start_date: str | None, end_date: str | None, cursor: str | None) -> str:
+    """One page of an employee's leave applications as the JSON body of the applications resources."""
+    cid = _new_cid()
+    try:
+        logger.info(f"[{cid}] get_employee_applications called for employee_id={employee_id}, backend={backend.name}")
+        start = date.fromisoformat(start_date) if start_date else None
+        end = date.fromisoformat(end_date) if end_date else None
+        t0 = time.monotonic()
+        page = backend.leave_request_page(int(employee_id), start, end, RESOURCE_PAGE_SIZE, cursor)
+        elapsed_ms = int((time.monotonic() - t0) * 1000)
+        logger.info(f"[{cid}] leave_request_page -> {len(page['items'])} rows in {elapsed_ms}ms")
+        base = f"leave://employee/{employee_id}/applications"
+        if start_date and end_date:
+            base += f"/{start_date}/{end_date}"
+        next_cursor = page.get("next_cursor")
+        return json.dumps({
+            "items": page["items"],
+            "next_cursor": next_cursor,
+            "next_uri": f"{base}/page/{next_cursor}" if next_cursor else None,
+        })
+
+    except BackendError as e:
+        logger.error(f"[{cid}] Failed to get applications: {e.status_code} - {_truncate(e.detail)}")
+        return json.dumps({"error": f"Failed to get applications for employee {employee_id}"})
     except Exception as e:
         logger.error(f"[{cid}] Error getting applications: {e}", exc_info=True)
-        return f'{{"error": "Error getting applications: {str(e)}"}}'
+        return json.dumps({"error": f"Error getting applications: {str(e)}"})
 
-@mcp.resource("leave://policies")
-def get_leave_policies() -> str:
+@mcp.resource("leave://employee/{employee_id}/applications")
+def get_employee_applications(employee_id: str) -> str:
     """
-    Get company leave policies and guidelines (annual and sick only).
+    Get the most recent leave applications for a specific employee.
+
+    Args:
+        employee_id: Employee ID to get applications for
 
     Returns:
-        JSON string containing leave policies
+        JSON string with up to LEAVE_MCP_RESOURCE_PAGE_SIZE applications, newest
+        first, and next_uri for the following page (null on the last page)
     """
-    logger.info("Retrieving leave policies")
-    policies = {
-        "annual_leave": {
-            "description": "Annual vacation leave",
-            "allocation": "20 days per year",
-            "carryover": "Up to 5 days can be carried over to next year",
-            "notice_period": "2 weeks advance notice required"
-        },
-        "sick_leave": {
-            "description": "Medical leave for illness",
-            "allocation": "10 days per year",
-            "documentation": "Medical certificate required for leaves > 3 days",
-            "notice_period": "As soon as possible"
-        }
-    }
+    return _applications_page(employee_id, None, None, None)
 
-    payload = json.dumps(policies, indent=2)
-    logger.debug(f"Policies payload length: {len(payload)} bytes")
-    return payload
+@mcp.resource("leave://employee/{employee_id}/applications/page/{cursor}")
+def get_employee_applications_page(employee_id: str, cursor: str) -> str:
+    """Next page of leave://employee/{employee_id}/applications (follow next_uri)."""
+    return _applications_page(employee_id, None, None, cursor)
 
-@mcp.prompt()
-def leave_application_template(employee_name: str, leave_type: Literal["annual", "sick"] = "annual") -> str:
+@mcp.resource("leave://employee/{employee_id}/applications/{start_date}/{end_date}")
+def get_employee_applications_window(employee_id: str, start_date: str, end_date: str) -> str:
     """
-    Generate a leave application template.
+    Get an employee's leave applications overlapping a date window.
 
     Args:
-        employee_name: Name of the employee
-        leave_type: Type of leave ('annual' or 'sick')
+        employee_id: Employee ID to get applications for
+        start_date: Window start (YYYY-MM-DD)
+        end_date: Window end (YYYY-MM-DD)
 
     Returns:
-        A formatted leave application template
+        JSON string with the first page of matching applications and next_uri
     """
-    logger.info(f"Generating leave_application_template for employee_name={employee_name}, type={leave_type}")
-    templates = {
-        "annual": f"""
+    return _applications_page(employee_id, start_date, end_date, None)
+
+@mcp.resource("leave://employee/{employee_id}/applications/{start_date}/{end_date}/page/{cursor}")
+def get_employee_applications_window_page(employee_id: str, start_date: str, end_date: str, cursor: str) -> str:
+    """Next page of a date-window applications resource (follow next_uri)."""
+    return _applications_page(employee_id, start_date, end_date, cursor)
+
+@mcp.custom_route("/export/employees/{employee_id}/applications.ndjson", methods=["GET"])
+async def export_employee_applications(request: Request) -> Response:
+    """
+    Full application history as NDJSON (one application per line), streamed
+    page by page with chunked transfer encoding. Served next to the MCP
+    endpoint when running over streamable-http or SSE; accepts optional
+    start_date and end_date query parameters.
+    """
+    try:
+        employee_id = int(request.path_params["employee_id"])
+        start_date = request.query_params.get("start_date")
+        end_date = request.query_params.get("end_date")
+        start = date.fromisoformat(start_date) if start_date else None
+        end = date.fromisoformat(end_date) if end_date else None
+        # Fetch the first page up front so a bad request gets a proper status code
+        first = await anyio.to_thread.run_sync(
+            backend.leave_request_page, employee_id, start, end, EXPORT_PAGE_SIZE, None
+        )
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    except BackendError as e:
+        return JSONResponse({"detail": e.detail}, status_code=e.status_code)
+
+    async def _lines():
+        page = first
+        while True:
+            yield "".join(json.dumps(item) + "\n" for item in page["items"])
+            if not page.get("next_cursor"):
+                return
+            page = await anyio.to_thread.run_sync(
+                backend.leave_request_page, employee_id, start, end, EXPORT_PAGE_SIZE, page["next_cursor"]
+            )
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+@mcp.resource("leave://calendar/occupancy/{month}")
+def get_leave_occupancy(month: str) -> str:
+    """
+    Get per-day headcount on leave (pending and approved) for a month.
+
+    Args:
+        month: Month in YYYY-MM format
+
+    Returns:
+        JSON string with daily counts, peak simultaneous leave and team size
+    """
+    cid = _new_cid()
+    try:
+        first = datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        return json.dumps({"error": f"Invalid month '{month}', expected YYYY-MM"})
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    try:
+        logger.info(f"[{cid}] get_leave_occupancy called for month={month}, backend={backend.name}")
+        t0 = time.monotonic()
+        occupancy = backend.occupancy(first, last)
+        elapsed_ms = int((time.monotonic() - t0) * 1000)
+        logger.info(f"[{cid}] occupancy -> ok in {elapsed_ms}ms")
+        return json.dumps(occupancy)
+
+    except BackendError as e:
+        logger.error(f"[{cid}] Failed to get occupancy: {e.status_code} - {_truncate(e.detail)}")
+        return json.dumps({"error": f"Failed to get leave occupancy for {month}"})
+    except Exception as e:
+        logger.error(f"[{cid}] Error getting occupancy: {e}", exc_info=True)
+        return json.dumps({"error": f"Error getting leave occupancy: {str(e)}"})
+
+# ---------------------------------------------------------------------------
+# Static resources and prompts
+#
+# These never depend on request data, so their text is built once at import
+# and every read returns the same string. STATIC_VERSIONS holds a content hash
+# per URI / prompt name; clients can read leave://manifest and only refetch
+# entries whose version changed.
+# ---------------------------------------------------------------------------
+
+LEAVE_POLICIES = {
+    "annual_leave": {
+        "description": "Annual vacation leave",
+        "allocation": "20 days per year",
+        "carryover": "Up to 5 days can be carried over to next year",
+        "notice_period": "2 weeks advance notice required"
+    },
+    "sick_leave": {
+        "description": "Medical leave for illness",
+        "allocation": "10 days per year",
+        "documentation": "Medical certificate required for leaves > 3 days",
+        "notice_period": "As soon as possible"
+    }
+}
+LEAVE_POLICIES_JSON = json.dumps(LEAVE_POLICIES, indent=2)
+
+LEAVE_APPLICATION_TEMPLATES = {
+    "annual": """
 Dear Manager,
 
 I would like to request annual leave for the following period:
@@ -302,7 +498,7 @@ Please let me know if you need any additional information.
 Best regards,
 {employee_name}
         """,
-        "sick": f"""
+    "sick": """
 Dear Manager,
 
 I need to request sick leave due to medical reasons:
@@ -320,12 +516,73 @@ Thank you for your understanding.
 Best regards,
 {employee_name}
         """
-    }
+}
+
+LEAVE_BALANCE_INQUIRY = """
+To check your leave balance, I can help you retrieve your current leave allowances including:
+
+- Annual leave days remaining
+- Sick leave days available
+
+Please provide your employee ID to check your current leave balance.
+
+Example: "What is the leave balance for employee ID 123?"
+    """
+
+
+def _version(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+STATIC_VERSIONS = {
+    "resources": {
+        "leave://policies": {"version": _version(LEAVE_POLICIES_JSON), "size": len(LEAVE_POLICIES_JSON.encode())},
+    },
+    "prompts": {
+        "leave_application_template": {"version": _version(json.dumps(LEAVE_APPLICATION_TEMPLATES, sort_keys=True))},
+        "leave_balance_inquiry": {"version": _version(LEAVE_BALANCE_INQUIRY)},
+    },
+}
+STATIC_MANIFEST_JSON = json.dumps(STATIC_VERSIONS, indent=2)
+
+@mcp.resource("leave://manifest")
+def get_static_manifest() -> str:
+    """
+    Get content versions of the static resources and prompts.
+
+    Returns:
+        JSON string mapping each static resource URI and prompt name to a
+        content hash; an unchanged version means a cached copy is current.
+    """
+    return STATIC_MANIFEST_JSON
+
+@mcp.resource("leave://policies")
+def get_leave_policies() -> str:
+    """
+    Get company leave policies and guidelines (annual and sick only).
+
+    Returns:
+        JSON string containing leave policies
+    """
+    logger.debug("Retrieving leave policies")
+    return LEAVE_POLICIES_JSON
 
+@mcp.prompt()
+def leave_application_template(employee_name: str, leave_type: Literal["annual", "sick"] = "annual") -> str:
+    """
+    Generate a leave application template.
+
+    Args:
+        employee_name: Name of the employee
+        leave_type: Type of leave ('annual' or 'sick')
+
+    Returns:
+        A formatted leave application template
+    """
+    logger.info(f"Generating leave_application_template for employee_name={employee_name}, type={leave_type}")
     key = str(leave_type).strip().lower()
-    result = templates.get(key, templates["annual"])
-    logger.debug(f"Template generated, length={len(result)} chars")
-    return result
+    template = LEAVE_APPLICATION_TEMPLATES.get(key, LEAVE_APPLICATION_TEMPLATES["annual"])
+    return template.replace("{employee_name}", employee_name)
 
 @mcp.prompt()
 def leave_balance_inquiry() -> str:
@@ -335,17 +592,7 @@ def leave_balance_inquiry() -> str:
     Returns:
         A template for leave balance inquiry
     """
-    logger.info("Generating leave_balance_inquiry prompt")
-    return """
-To check your leave balance, I can help you retrieve your current leave allowances including:
-
-- Annual leave days remaining
-- Sick leave days available
-
-Please provide your employee ID to check your current leave balance.
-
-Example: "What is the leave balance for employee ID 123?"
-    """
+    return LEAVE_BALANCE_INQUIRY
 
 def main():
     """Main entry point for the MCP server."""
@@ -356,7 +603,9 @@ def main():
     logger.info(f"Environment: {env_name}")
     logger.info(f"Log level: {LOG_LEVEL}")
     logger.info(f"HTTP timeout: {HTTP_TIMEOUT}s")
-    logger.info(f"Leave API URL: {LEAVE_API_URL}")
+    logger.info(f"Leave backend: {backend.name}")
+    if backend.name == "http":
+        logger.info(f"Leave API URL: {LEAVE_API_URL}")
     logger.info(f"Server name: {mcp.name}")
     # Default to streamable-http to prefer HTTP stream endpoints in web deployments
     transport_env = os.getenv("MCP_TRANSPORT", "streamable-http").strip().lower()
@@ -376,8 +625,30 @@ def main():
     mcp.settings.host = "0.0.0.0"
     mcp.settings.port = port
 
+    if WORKERS > 1 and transport == "streamable-http":
+        if not STATELESS_HTTP:
+            logger.warning("LEAVE_MCP_STATELESS_HTTP=false with several workers: clients must stick to one worker")
+        logger.info(f"Workers: {WORKERS} (stateless HTTP: {STATELESS_HTTP})")
+        # Each worker imports this module and builds its own app through http_app()
+        uvicorn.run(
+            f"{Path(__file__).stem}:http_app",
+            factory=True,
+            app_dir=str(Path(__file__).resolve().parent),
+            host=mcp.settings.host,
+            port=port,
+            workers=WORKERS,
+            log_level=mcp.settings.log_level.lower(),
+        )
+        return
+    if WORKERS > 1:
+        logger.warning(f"LEAVE_MCP_WORKERS is ignored for the {transport} transport")
+
     # Run the server with selected transport (SSE for Inspector, streamable-http for HTTP clients)
     mcp.run(transport=transport)
 
+def http_app():
+    """Streamable-HTTP ASGI app, for uvicorn workers (``--factory server_mcp:http_app``)."""
+    return mcp.streamable_http_app()
+
 if __name__ == "__main__":
     main()
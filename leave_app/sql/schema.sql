@@ -3,15 +3,23 @@
 CREATE TABLE dbo.employees (
   id INT IDENTITY(1,1) PRIMARY KEY,
   name NVARCHAR(200) NOT NULL,
-  email NVARCHAR(200) NOT NULL UNIQUE
+  email NVARCHAR(200) NOT NULL UNIQUE,
+  team NVARCHAR(100) NULL,
+  updated_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+  row_version INT NOT NULL DEFAULT 1
 );
 GO
 
+CREATE INDEX ix_employees_team ON dbo.employees(team);
+GO
+
 CREATE TABLE dbo.leave_balances (
   id INT IDENTITY(1,1) PRIMARY KEY,
   employee_id INT NOT NULL,
   annual_balance INT NOT NULL DEFAULT 20,
   sick_balance INT NOT NULL DEFAULT 10,
+  updated_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+  row_version INT NOT NULL DEFAULT 1,
   CONSTRAINT FK_leave_balances_employee FOREIGN KEY (employee_id) REFERENCES dbo.employees(id)
 );
 GO
@@ -24,6 +32,8 @@ CREATE TABLE dbo.leave_requests (
   leave_type NVARCHAR(50) NOT NULL,
   reason NVARCHAR(1000) NULL,
   status NVARCHAR(50) NOT NULL DEFAULT 'pending',
+  updated_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+  row_version INT NOT NULL DEFAULT 1,
   CONSTRAINT FK_leave_requests_employee FOREIGN KEY (employee_id) REFERENCES dbo.employees(id)
 );
 GO
@@ -33,3 +43,32 @@ GO
 
 CREATE INDEX IX_leave_balances_employee ON dbo.leave_balances(employee_id);
 GO
+
+CREATE INDEX ix_leave_requests_employee_interval ON dbo.leave_requests(employee_id, start_date, end_date);
+GO
+
+CREATE INDEX ix_leave_requests_interval ON dbo.leave_requests(start_date, end_date);
+GO
+
+-- Change feeds (?since=) scan these in (updated_at, id) order
+CREATE INDEX ix_employees_sync ON dbo.employees(updated_at, id);
+GO
+
+CREATE INDEX ix_leave_balances_sync ON dbo.leave_balances(updated_at, id);
+GO
+
+CREATE INDEX ix_leave_requests_sync ON dbo.leave_requests(updated_at, id);
+GO
+
+CREATE TABLE dbo.leave_events (
+  id INT IDENTITY(1,1) PRIMARY KEY,
+  event_type NVARCHAR(50) NOT NULL,
+  employee_id INT NOT NULL,
+  request_id INT NULL,
+  payload NVARCHAR(MAX) NOT NULL,
+  created_at DATETIME2 NOT NULL
+);
+GO
+
+CREATE INDEX ix_leave_events_employee_id ON dbo.leave_events(employee_id);
+GO
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Point the API at a throwaway SQLite database before leave_app.api.db is imported
+_tmp = tempfile.mkdtemp(prefix="leave-tests-")
+os.environ.setdefault("LEAVE_DATABASE_URL", f"sqlite:///{_tmp}/leave.db")
+os.environ.setdefault("LEAVE_SEED_ON_START", "false")
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from leave_app.api import availability, db, models
+from leave_app.api.main import app
+
+
+@pytest.fixture
+def session(monkeypatch):
+    db.Base.metadata.drop_all(bind=db.engine)
+    db.Base.metadata.create_all(bind=db.engine)
+    monkeypatch.setattr(availability, "_span_checked_at", None)
+    monkeypatch.setattr(availability, "_span_days", 1)
+    with db.SessionLocal() as session:
+        session.add(models.Employee(id=1, name="Grace Hopper", email="grace@example.com", team="ops"))
+        session.add(models.LeaveBalance(employee_id=1, annual_balance=20, sick_balance=200))
+        session.commit()
+        yield session
+
+
+def _request(session, start: date, end: date) -> None:
+    session.add(models.LeaveRequest(employee_id=1, start_date=start, end_date=end, leave_type="annual", status="approved"))
+    session.commit()
+
+
+def test_overlap_found_inside_a_long_stored_request(session):
+    start = date(2024, 1, 1)
+    end = start + timedelta(days=199)
+    _request(session, start, end)
+    probe = end - timedelta(days=3)
+
+    assert availability.request_span_days(session) == 200
+    assert availability.find_overlap(session, 1, probe, probe) is not None
+    assert [r.id for r, _ in availability.who_is_off(session, probe, probe, "ops")] == [1]
+    assert availability.occupancy(session, probe, probe)["max_on_leave"] == 1
+
+
+def test_find_overlap_does_not_depend_on_the_cached_span(session):
+    availability.request_span_days(session)  # caches a span of 1 for the empty table
+    _request(session, date(2024, 3, 4), date(2024, 6, 28))
+    assert availability.find_overlap(session, 1, date(2024, 6, 28), date(2024, 7, 5)) is not None
+    assert availability.find_overlap(session, 1, date(2024, 6, 29), date(2024, 7, 5)) is None
+
+
+def test_long_request_is_accepted_and_seen_by_team_queries_at_once(session):
+    availability.request_span_days(session)  # cached before the request exists
+    with TestClient(app) as client:
+        created = client.post("/employees/1/leave-requests", json={
+            "start_date": "2025-01-06", "end_date": "2025-04-25", "leave_type": "sick",
+        })
+        assert created.status_code == 200
+        off = client.get("/leave-requests/off", params={"start_date": "2025-04-21", "end_date": "2025-04-21"})
+        assert off.json()["employees_off"] == 1
+
+
+def test_length_cap_is_opt_in(session, monkeypatch):
+    monkeypatch.setattr(availability, "MAX_REQUEST_DAYS", 30)
+    with TestClient(app) as client:
+        rejected = client.post("/employees/1/leave-requests", json={
+            "start_date": "2025-01-06", "end_date": "2025-04-25", "leave_type": "sick",
+        })
+    assert rejected.status_code == 400
+    assert "limited to 30 days" in rejected.json()["detail"]
@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from leave_app.api import db, directory, models
+from leave_app.api.main import app
+
+
+@pytest.fixture
+def tables():
+    db.Base.metadata.drop_all(bind=db.engine)
+    db.Base.metadata.create_all(bind=db.engine)
+
+
+@pytest.fixture
+def client(tables, monkeypatch):
+    monkeypatch.setattr(directory, "index", directory.DirectoryIndex())
+    with TestClient(app) as client:
+        yield client
+
+
+def _names(response) -> list[str]:
+    assert response.status_code == 200
+    return [m["name"] for m in response.json()]
+
+
+def test_employee_created_through_the_api_is_found_immediately(client):
+    assert _names(client.get("/employees/search", params={"q": "zara"})) == []
+
+    created = client.post("/employees", json={"name": "Zara Quinn", "email": "zara.quinn@example.com"})
+    assert created.status_code == 200
+
+    assert _names(client.get("/employees/search", params={"q": "zara"})) == ["Zara Quinn"]
+
+
+def test_employee_written_by_another_process_is_found_before_the_feed_settles(client):
+    client.get("/employees/search", params={"q": "anyone"})  # load the index
+    with db.SessionLocal() as session:
+        # Written straight to the table, as another API worker would
+        session.add(models.Employee(name="Omar Haddad", email="omar.haddad@example.com"))
+        session.commit()
+
+    assert _names(client.get("/employees/search", params={"q": "omar"})) == ["Omar Haddad"]
+    assert _names(client.get("/employees/search", params={"q": "haddad@"})) == ["Omar Haddad"]
+
+
+def test_index_is_loaded_from_the_table_including_unsettled_rows(tables):
+    with db.SessionLocal() as session:
+        session.add(models.Employee(name="Lena Park", email="lena.park@example.com"))
+        session.commit()
+        index = directory.DirectoryIndex()
+        index.refresh(session)
+
+    assert [m["name"] for m in index.search("lena")] == ["Lena Park"]
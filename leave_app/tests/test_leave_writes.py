@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from leave_app.api import db
+from leave_app.api.main import app
+
+
+@pytest.fixture
+def client():
+    db.Base.metadata.drop_all(bind=db.engine)
+    db.Base.metadata.create_all(bind=db.engine)
+    with TestClient(app) as client:
+        yield client
+
+
+def _employee(client) -> int:
+    created = client.post("/employees", json={"name": "Ada Lovelace", "email": "ada@example.com", "annual_balance": 5})
+    assert created.status_code == 200
+    return created.json()["id"]
+
+
+def test_set_balance(client):
+    emp = _employee(client)
+    updated = client.post(f"/employees/{emp}/balance", json={"annual_balance": 12})
+    assert updated.status_code == 200
+    assert (updated.json()["annual_balance"], updated.json()["sick_balance"]) == (12, 10)
+    assert client.get(f"/employees/{emp}/balance").json()["annual_balance"] == 12
+
+
+def test_approving_and_revoking_a_request_moves_the_balance(client):
+    emp = _employee(client)
+    # Mon-Wed, no holidays
+    req = client.post(f"/employees/{emp}/leave-requests", json={
+        "start_date": "2025-02-03", "end_date": "2025-02-05", "leave_type": "annual",
+    })
+    assert req.status_code == 200
+    rid = req.json()["id"]
+
+    approved = client.post(f"/leave-requests/{rid}/status", json={"status": "approved"})
+    assert approved.status_code == 200
+    assert approved.json()["status"] == "approved"
+    assert client.get(f"/employees/{emp}/balance").json()["annual_balance"] == 2
+
+    assert client.post(f"/leave-requests/{rid}/status", json={"status": "rejected"}).status_code == 200
+    assert client.get(f"/employees/{emp}/balance").json()["annual_balance"] == 5
+
+
+def test_status_update_errors(client):
+    emp = _employee(client)
+    assert client.post("/leave-requests/999/status", json={"status": "approved"}).status_code == 404
+    rid = client.post(f"/employees/{emp}/leave-requests", json={
+        "start_date": "2025-02-03", "end_date": "2025-02-07", "leave_type": "annual",
+    }).json()["id"]
+    assert client.post(f"/leave-requests/{rid}/status", json={"status": "bogus"}).status_code == 400
+    # Five working days against a balance of five
+    assert client.post(f"/leave-requests/{rid}/status", json={"status": "approved"}).status_code == 200
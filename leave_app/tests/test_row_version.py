@@ -0,0 +1,36 @@
+from sqlalchemy import text
+
+from leave_app.api import db, models
+
+
+def _create_pre_versioning_tables() -> None:
+    """Tables as a schema.sql without defaults left them, with a seed.sql-style row."""
+    db.Base.metadata.drop_all(bind=db.engine)
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE employees (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, email VARCHAR NOT NULL UNIQUE,"
+            " team VARCHAR(100), updated_at DATETIME NULL, row_version INTEGER NULL)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE leave_balances (id INTEGER PRIMARY KEY, employee_id INTEGER NOT NULL REFERENCES employees(id),"
+            " annual_balance INTEGER, sick_balance INTEGER, updated_at DATETIME NULL, row_version INTEGER NULL)"
+        ))
+        conn.execute(text("INSERT INTO employees (id, name, email) VALUES (1, 'Alice', 'alice@example.com')"))
+        conn.execute(text("INSERT INTO leave_balances (id, employee_id, annual_balance, sick_balance) VALUES (1, 1, 20, 10)"))
+
+
+def test_row_with_null_version_can_be_updated_after_ensure_schema():
+    _create_pre_versioning_tables()
+    db.ensure_schema()
+
+    with db.SessionLocal() as session:
+        bal = session.get(models.LeaveBalance, 1)
+        assert bal.row_version == 1
+        assert bal.updated_at is not None
+        bal.annual_balance -= 3
+        session.commit()
+
+    with db.SessionLocal() as session:
+        bal = session.get(models.LeaveBalance, 1)
+        assert (bal.annual_balance, bal.row_version) == (17, 2)
+        assert session.get(models.Employee, 1).updated_at is not None
@@ -0,0 +1,63 @@
+from datetime import date
+
+from leave_app.api import workdays
+
+
+def _holidays(year: int, region: str) -> list[date]:
+    return [d for d, _ in workdays.year_calendar(year, region).holidays]
+
+
+def test_us_federal_holidays_2024():
+    assert _holidays(2024, "US") == [
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 5, 27),
+        date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 10, 14),
+        date(2024, 11, 11), date(2024, 11, 28), date(2024, 12, 25),
+    ]
+
+
+def test_us_weekend_holidays_are_observed_on_the_nearest_weekday():
+    # Juneteenth and Jul 4 fell on a weekend; New Year's Day 2022 was a Saturday
+    assert _holidays(2021, "US") == [
+        date(2021, 1, 1), date(2021, 1, 18), date(2021, 2, 15), date(2021, 5, 31),
+        date(2021, 6, 18), date(2021, 7, 5), date(2021, 9, 6), date(2021, 10, 11),
+        date(2021, 11, 11), date(2021, 11, 25), date(2021, 12, 24), date(2021, 12, 31),
+    ]
+
+
+def test_juneteenth_starts_in_2021():
+    assert date(2020, 6, 19) not in _holidays(2020, "US")
+    assert len(_holidays(2020, "US")) == 10
+
+
+def test_uk_bank_holidays_2024():
+    assert _holidays(2024, "UK") == [
+        date(2024, 1, 1), date(2024, 3, 29), date(2024, 4, 1), date(2024, 5, 6),
+        date(2024, 5, 27), date(2024, 8, 26), date(2024, 12, 25), date(2024, 12, 26),
+    ]
+
+
+def test_working_days_across_a_year_boundary():
+    # Dec 23 2024 .. Jan 3 2025: ten weekdays less Christmas and New Year's Day
+    assert workdays.working_days(date(2024, 12, 23), date(2025, 1, 3), "US") == 8
+    assert workdays.working_days(date(2024, 12, 23), date(2025, 1, 3), "NONE") == 10
+
+
+def test_first_and_last_representable_years():
+    # Dec 20-31 9999 is two Mon-Fri weeks less Christmas (observed Fri 24th)
+    assert workdays.working_days(date(9999, 12, 20), date(9999, 12, 31), "US") == 9
+    assert _holidays(9999, "US")[-1] == date(9999, 12, 24)
+    assert workdays.working_days(date(1, 1, 1), date(1, 1, 7), "UK") == 4
+    assert _holidays(1, "UK")[0] == date(1, 1, 1)
+
+
+def test_working_days_endpoint_bounds_the_span():
+    from fastapi.testclient import TestClient
+
+    from leave_app.api.main import app
+
+    client = TestClient(app)
+    ok = client.get("/calendar/working-days", params={"start_date": "9999-12-20", "end_date": "9999-12-31"})
+    assert ok.status_code == 200 and ok.json()["working_days"] == 9
+    too_long = client.get("/calendar/working-days", params={"start_date": "0001-01-01", "end_date": "9999-12-31"})
+    assert too_long.status_code == 400
+    assert "at most" in too_long.json()["detail"]
@@ -0,0 +1,233 @@
+"""
+MCP over SSE, shared by the FastAPI web apps of the timesheet and leave MCP servers.
+
+GET on the stream URL opens an event stream whose first "endpoint" event names the URL
+the client POSTs JSON-RPC messages to. Requests run concurrently and their responses come
+back on the stream, so one connection can carry many calls. Each connection has a bounded
+outgoing queue (a slow reader holds up its own handlers, not the server) and at most
+``max_inflight`` requests in progress; beyond that POSTs get 429.
+
+Connection management: at most ``max_connections`` open streams (more get 503), and a
+stream with no traffic either way for ``idle_timeout_seconds`` is closed. Idle streams
+wake every ``poll_seconds`` to notice disconnected clients and timeouts.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+SSE_KEEPALIVE_SECONDS = 30
+SSE_POLL_SECONDS = 5
+PROTOCOL_VERSIONS = ("2025-06-18", "2025-03-26", "2024-11-05")
+
+Dispatch = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+class JsonRpcError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class SseSession:
+    """One SSE connection: its outgoing message queue and the requests it has in flight."""
+
+    def __init__(self, dispatch: Dispatch, queue_size: int, logger: logging.Logger) -> None:
+        self.id = uuid.uuid4().hex
+        self.dispatch = dispatch
+        self.logger = logger
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.tasks: Dict[Any, asyncio.Task] = {}
+        self.opened = self.last_active = time.monotonic()
+        self.streaming = False
+
+    def idle_for(self) -> float:
+        """Seconds since the last message in either direction; never idle while requests run."""
+        return 0.0 if self.tasks else time.monotonic() - self.last_active
+
+    async def accept(self, message: Dict[str, Any]) -> None:
+        """Start handling one client message; its response (if any) is queued on the stream."""
+        self.last_active = time.monotonic()
+        method = message.get("method")
+        if method is None:
+            return  # a response to a server request; this server sends none
+        if method == "notifications/cancelled":
+            task = self.tasks.get((message.get("params") or {}).get("requestId"))
+            if task:
+                task.cancel()
+            return
+        if "id" not in message:
+            return  # other notifications need no answer
+        request_id = message["id"]
+        if not isinstance(request_id, (str, int)) or isinstance(request_id, bool):
+            await self._reject(None, "Request id must be a string or an integer")
+        elif request_id in self.tasks:
+            # Replacing the running task would leave it impossible to cancel
+            await self._reject(request_id, f"Request id {request_id!r} is already in flight")
+        else:
+            self.tasks[request_id] = asyncio.create_task(self._handle(message))
+
+    async def _reject(self, request_id: Any, message: str) -> None:
+        await self.outbox.put({"jsonrpc": "2.0", "id": request_id, "error": {"code": -32600, "message": message}})
+
+    async def _handle(self, message: Dict[str, Any]) -> None:
+        request_id = message["id"]
+        try:
+            try:
+                result = await self.dispatch(message["method"], message.get("params") or {})
+                reply = {"jsonrpc": "2.0", "id": request_id, "result": result}
+            except JsonRpcError as e:
+                reply = {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+            except asyncio.CancelledError:
+                raise  # cancelled requests get no response
+            except Exception as e:
+                self.logger.error(f"Error handling {message['method']}: {e}")
+                reply = {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32603, "message": str(e)}}
+            # Waits while the queue is full: backpressure from a slow SSE reader
+            await self.outbox.put(reply)
+        finally:
+            self.tasks.pop(request_id, None)
+
+    def close(self) -> None:
+        for task in list(self.tasks.values()):
+            task.cancel()
+
+class SseRegistry:
+    """Open SSE connections: enforces the connection and in-flight limits and counts what happened to them."""
+
+    def __init__(
+        self,
+        dispatch: Dispatch,
+        *,
+        max_connections: int,
+        max_inflight: int,
+        queue_size: int,
+        idle_timeout_seconds: float,
+        poll_seconds: float = SSE_POLL_SECONDS,
+        keepalive_seconds: float = SSE_KEEPALIVE_SECONDS,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.dispatch = dispatch
+        self.max_connections = max_connections
+        self.max_inflight = max_inflight
+        self.queue_size = queue_size
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.poll_seconds = poll_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.logger = logger or logging.getLogger(__name__)
+        self.sessions: Dict[str, SseSession] = {}
+        self.counters = {"opened": 0, "rejected": 0, "closed_idle": 0, "closed_disconnected": 0}
+
+    def open(self) -> Optional[SseSession]:
+        """Register a new connection, or return None when the limit is reached."""
+        if len(self.sessions) >= self.max_connections:
+            # Drop registrations whose stream never started (client gone before the first byte)
+            now = time.monotonic()
+            for stale in [s for s in self.sessions.values() if not s.streaming and now - s.opened > self.poll_seconds]:
+                self.close(stale, "disconnected")
+        if len(self.sessions) >= self.max_connections:
+            self.counters["rejected"] += 1
+            return None
+        session = SseSession(self.dispatch, self.queue_size, self.logger)
+        self.sessions[session.id] = session
+        self.counters["opened"] += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[SseSession]:
+        return self.sessions.get(session_id)
+
+    def close(self, session: SseSession, reason: str) -> None:
+        if self.sessions.pop(session.id, None) is not None:
+            self.counters[f"closed_{reason}"] += 1
+            session.close()
+
+    async def stream(self, request: Request, messages_path: str) -> Response:
+        """Response for GET on the stream URL; clients POST to ``messages_path``."""
+        session = self.open()
+        if session is None:
+            self.logger.warning(f"Rejected SSE connection: {self.max_connections} already open")
+            return JSONResponse(
+                status_code=503,
+                content={"error": "Too many open connections"},
+                headers={"Retry-After": str(int(self.poll_seconds))},
+            )
+        self.logger.info(f"SSE connection {session.id} established")
+
+        async def event_stream():
+            session.streaming = True
+            reason = "disconnected"
+            last_write = time.monotonic()
+            try:
+                # Tell the client where to POST its JSON-RPC messages
+                yield f"event: endpoint\ndata: {messages_path}?session_id={session.id}\n\n"
+                while True:
+                    try:
+                        message = await asyncio.wait_for(session.outbox.get(), self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            break
+                        if session.idle_for() >= self.idle_timeout_seconds:
+                            reason = "idle"
+                            break
+                        if time.monotonic() - last_write >= self.keepalive_seconds:
+                            # Comment line: keeps proxies from closing an idle connection
+                            yield ": ping\n\n"
+                            last_write = time.monotonic()
+                        continue
+                    yield f"event: message\ndata: {json.dumps(message)}\n\n"
+                    session.last_active = last_write = time.monotonic()
+            finally:
+                self.close(session, reason)
+                self.logger.info(f"SSE connection {session.id} closed ({reason})")
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Headers": "*"
+            }
+        )
+
+    async def post(self, request: Request, session_id: str) -> Response:
+        """Response for a POST of JSON-RPC messages to the connection ``session_id``."""
+        session = self.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown or closed session")
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+        messages = body if isinstance(body, list) else [body]
+        if not all(isinstance(m, dict) and m.get("jsonrpc") == "2.0" for m in messages):
+            raise HTTPException(status_code=400, detail="Expected JSON-RPC 2.0 messages")
+        new_requests = sum(1 for m in messages if "method" in m and "id" in m)
+        if len(session.tasks) + new_requests > self.max_inflight:
+            return JSONResponse(
+                status_code=429,
+                content={"error": f"At most {self.max_inflight} requests in flight per connection"},
+                headers={"Retry-After": "1"},
+            )
+        for message in messages:
+            await session.accept(message)
+        return Response(status_code=202)
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        sessions = list(self.sessions.values())
+        return {
+            "open_connections": len(sessions),
+            "max_connections": self.max_connections,
+            "idle_timeout_seconds": self.idle_timeout_seconds,
+            "in_flight_requests": sum(len(s.tasks) for s in sessions),
+            "queued_messages": sum(s.outbox.qsize() for s in sessions),
+            "oldest_connection_seconds": round(max((now - s.opened for s in sessions), default=0.0), 1),
+            **{f"{name}_total": count for name, count in self.counters.items()},
+        }
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the list endpoints of the leave and timesheet APIs in-process.
+
+Seeds throwaway SQLite databases, then times repeated GETs through
+FastAPI's TestClient with and without gzip negotiation and reports the
+median latency and the bytes on the wire.
+
+    python scripts/bench_api_lists.py --employees 2000 --rows 5000 --repeat 30
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def _configure(tmp: str) -> None:
+    os.environ["LEAVE_DATABASE_URL"] = f"sqlite:///{tmp}/leave.db"
+    os.environ["TIMESHEET_DATABASE_URL"] = f"sqlite:///{tmp}/timesheet.db"
+    os.environ["LEAVE_SEED_ON_START"] = "false"
+    os.environ["TIMESHEET_SEED_ON_START"] = "false"
+
+
+def _seed(employees: int, rows: int) -> None:
+    from leave_app.api import db as leave_db, models as leave_models
+    from timesheet_app.api import db as ts_db, models as ts_models
+
+    start = date(2025, 1, 6)
+    with leave_db.SessionLocal() as db:
+        db.add_all([leave_models.Employee(name=f"Employee {i}", email=f"e{i}@example.com", team=f"team-{i % 20}")
+                    for i in range(employees)])
+        db.flush()
+        db.add_all([leave_models.LeaveRequest(employee_id=1, start_date=start + timedelta(days=i),
+                                              end_date=start + timedelta(days=i), leave_type="annual",
+                                              reason="benchmark", status="approved")
+                    for i in range(rows)])
+        db.commit()
+    with ts_db.SessionLocal() as db:
+        db.add_all([ts_models.Employee(name=f"Employee {i}", email=f"e{i}@example.com") for i in range(employees)])
+        db.flush()
+        db.add_all([ts_models.TimesheetEntry(employee_id=1, entry_date=start + timedelta(days=i // 3), hours=8,
+                                             project=f"PROJ{i % 7:03d}", notes="benchmark entry")
+                    for i in range(rows)])
+        db.commit()
+
+
+def _measure(client, url: str, repeat: int, gzip: bool) -> tuple[float, int]:
+    headers = {"Accept-Encoding": "gzip" if gzip else "identity"}
+    client.get(url, headers=headers)  # warm up
+    timings, size = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        r = client.get(url, headers=headers)
+        timings.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+        size = r.num_bytes_downloaded
+    return statistics.median(timings), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=5000, help="leave requests / timesheet entries for employee 1")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _configure(tmp)
+        from fastapi.testclient import TestClient
+        from leave_app.api.main import app as leave_app
+        from timesheet_app.api.main import app as ts_app
+
+        _seed(args.employees, args.rows)
+        targets = [
+            ("leave", TestClient(leave_app), "/employees"),
+            ("leave", TestClient(leave_app), "/employees/1/leave-requests"),
+            ("timesheet", TestClient(ts_app), "/employees"),
+            ("timesheet", TestClient(ts_app), "/employees/1/entries"),
+        ]
+        print(f"{'api':<10} {'endpoint':<28} {'identity ms':>11} {'bytes':>9} {'gzip ms':>9} {'bytes':>9}")
+        for api, client, url in targets:
+            plain_ms, plain_bytes = _measure(client, url, args.repeat, gzip=False)
+            gz_ms, gz_bytes = _measure(client, url, args.repeat, gzip=True)
+            print(f"{api:<10} {url:<28} {plain_ms:>11.1f} {plain_bytes:>9} {gz_ms:>9.1f} {gz_bytes:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Weak ETags for conditional GETs.
+
+Single rows are tagged with their id and row_version. Collections are
+tagged with a fingerprint, meaning count(*), max(updated_at) and max(id)
+over the rows the endpoint would return. This costs one aggregate query
+on an indexed column. Any insert, update or delete changes at least one
+of the three values. When the client's If-None-Match matches, the
+endpoint answers 304 without loading or serializing the list.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+
+
+def _tag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def for_row(obj) -> str:
+    return _tag(type(obj).__name__, obj.id, obj.row_version)
+
+
+def for_collection(db, model, *criteria) -> str:
+    count, last_change, last_id = db.execute(
+        select(func.count(model.id), func.max(model.updated_at), func.max(model.id)).where(*criteria)
+    ).one()
+    return _tag(model.__name__, count, last_change, last_id)
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set the ETag on ``response``; return a 304 response when ``If-None-Match``
+    already matches it (weak comparison), else None.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    header = request.headers.get("if-none-match")
+    if header:
+        wanted = _opaque(etag)
+        if header.strip() == "*" or any(_opaque(t) == wanted for t in header.split(",")):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
@@ -0,0 +1,179 @@
+"""
+Streaming bulk import of timesheet entries (CSV or NDJSON).
+
+The request body is parsed line by line as it arrives (a quoted CSV field
+may span lines), rows are validated with the single-entry fields (hours
+bounded to 1-24, see TimesheetEntryImport) plus a preloaded set of employee
+ids, and valid rows are inserted in chunks with a single executemany per
+chunk.
+
+An import is not atomic: each chunk commits on its own. The result lists
+the line ranges that were committed, so a client whose upload failed part
+way can resume after the last one.
+"""
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from starlette.concurrency import run_in_threadpool
+
+from . import models, rollups, schemas
+from .db import SessionLocal, run_write
+
+IMPORT_FIELDS = ("employee_id", "entry_date", "hours", "project", "notes")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Yield decoded text lines from a byte stream without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def detect_format(content_type: Optional[str], fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt.lower()
+    ct = (content_type or "").split(";")[0].strip().lower()
+    if ct in ("text/csv", "application/csv"):
+        return "csv"
+    return "ndjson"
+
+
+def load_employee_ids() -> set[int]:
+    with SessionLocal() as db:
+        return set(db.scalars(select(models.Employee.id)))
+
+
+async def _records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[tuple[int, int, str]]:
+    """
+    Yield (first line number, last line number, text) per non-blank record.
+    For CSV, lines are joined while a quoted field is still open.
+    """
+    line_no = first = quotes = 0
+    pending: list[str] = []
+    async for line in lines:
+        line_no += 1
+        if not pending:
+            if not line.strip():
+                continue
+            first = line_no
+        pending.append(line)
+        if fmt == "csv":
+            # Quotes inside quoted fields are doubled, so an odd count means one is still open
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+        yield first, line_no, "\n".join(pending)
+        pending, quotes = [], 0
+    if pending:
+        yield first, line_no, "\n".join(pending)
+
+
+def _csv_values(record: str) -> list[str]:
+    try:
+        return next(csv.reader([record], strict=True))
+    except csv.Error as e:
+        raise ValueError(f"malformed CSV: {e}")
+
+
+def _parse_csv_row(record: str, header: list[str]) -> dict[str, Any]:
+    values = _csv_values(record)
+    if len(values) != len(header):
+        raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+    # Empty CSV cells mean "not provided"
+    return {k: (v if v != "" else None) for k, v in zip(header, values)}
+
+
+def _parse_ndjson_row(line: str) -> dict[str, Any]:
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError("each line must be a JSON object")
+    return row
+
+
+def _insert_chunk(rows: list[dict[str, Any]]) -> int:
+    def _job(db):
+        db.execute(insert(models.TimesheetEntry), rows)
+        rollups.apply_inserted_rows(db, rows)
+        return len(rows)
+    return run_write(_job)
+
+
+async def import_entries(
+    lines: AsyncIterator[str],
+    fmt: str,
+    employee_ids: set[int],
+    chunk_size: int,
+    max_errors: int,
+) -> schemas.ImportResult:
+    """
+    Import rows from ``lines``. Invalid rows are reported (up to ``max_errors``)
+    and skipped; valid rows are inserted ``chunk_size`` at a time, each chunk
+    in its own transaction, and recorded in ``committed``.
+    Raises ValueError for an unknown format or an unusable CSV header.
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError("format must be 'csv' or 'ndjson'")
+    result = schemas.ImportResult(inserted=0, failed=0)
+    header: Optional[list[str]] = None
+    chunk: list[dict[str, Any]] = []
+    chunk_first = chunk_last = 0  # input lines the chunk spans
+
+    def _fail(line_no: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < max_errors:
+            result.errors.append(schemas.ImportRowError(line=line_no, error=error))
+        else:
+            result.errors_truncated = True
+
+    async def _flush() -> None:
+        inserted = await run_in_threadpool(_insert_chunk, chunk)
+        result.inserted += inserted
+        result.committed.append(schemas.ImportCommittedLines(
+            first_line=chunk_first, last_line=chunk_last, inserted=inserted,
+        ))
+
+    async for line_no, last_line_no, record in _records(lines, fmt):
+        if fmt == "csv" and header is None:
+            header = [h.strip().lower() for h in _csv_values(record)]
+            missing = {"employee_id", "entry_date", "hours"} - set(header)
+            if missing:
+                raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+            continue
+        try:
+            if fmt == "csv":
+                raw = _parse_csv_row(record, header)
+            else:
+                raw = _parse_ndjson_row(record)
+            # Field names of POST /employees/{id}/entries; hours must be 1-24
+            item = schemas.TimesheetEntryImport.model_validate(raw)
+        except ValidationError as e:
+            _fail(line_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            continue
+        except ValueError as e:
+            _fail(line_no, str(e))
+            continue
+        if item.employee_id not in employee_ids:
+            _fail(line_no, f"employee {item.employee_id} not found")
+            continue
+        if not chunk:
+            chunk_first = line_no
+        chunk_last = last_line_no
+        chunk.append(item.model_dump(include=set(IMPORT_FIELDS)))
+        if len(chunk) >= chunk_size:
+            await _flush()
+            chunk = []
+    if chunk:
+        await _flush()
+    return result
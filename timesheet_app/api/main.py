@@ -1,12 +1,17 @@
 import os
-from typing import List
-from fastapi import Depends, FastAPI, HTTPException
+from datetime import date
+from typing import List, Optional
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.concurrency import run_in_threadpool
 
-from .db import Base, engine, get_db, should_seed, SessionLocal
-from . import models, schemas
+from .db import engine, ensure_schema, get_db, run_write, should_seed, SessionLocal
+from . import etags, importer, models, repository, responses, rollups, schemas, services, sync, weekgrid
 
-Base.metadata.create_all(bind=engine)
+ensure_schema()
 
 if should_seed():
     from sqlalchemy import select
@@ -29,7 +34,20 @@ if should_seed():
     except Exception:
         pass
 
-app = FastAPI(title="Timesheet Application API")
+try:
+    rollups.ensure_built()
+except Exception:
+    # Reports fall back to empty results; POST /reports/rollups/rebuild can fix it later
+    pass
+
+app = FastAPI(title="Timesheet Application API", **responses.app_options())
+# gzip only when the client accepts it and the body is worth compressing
+app.add_middleware(GZipMiddleware, minimum_size=responses.GZIP_MIN_SIZE, compresslevel=responses.GZIP_LEVEL)
+
+@app.exception_handler(StaleDataError)
+def stale_data_handler(request: Request, exc: StaleDataError):
+    # row_version check failed: another request updated the row first
+    return JSONResponse(status_code=409, content={"detail": "Record was modified by another request; reload and retry"})
 
 @app.get("/health")
 def health():
@@ -47,34 +65,134 @@ def create_employee(emp: schemas.EmployeeCreate, db=Depends(get_db)):
     return obj
 
 @app.get("/employees", response_model=List[schemas.Employee])
-def list_employees(db=Depends(get_db)):
+def list_employees(request: Request, response: Response, db=Depends(get_db)):
+    cached = etags.not_modified(request, response, etags.for_collection(db, models.Employee))
+    if cached:
+        return cached
     return db.query(models.Employee).all()
 
+# Change feeds: pass the returned next_cursor as ?since= on the next call
+@app.get("/employees/changes", response_model=schemas.EmployeeChanges)
+def employee_changes(since: Optional[str] = None, limit: int = 500, db=Depends(get_db)):
+    try:
+        return sync.changes(db, models.Employee, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/entries/changes", response_model=schemas.TimesheetEntryChanges)
+def entry_changes(since: Optional[str] = None, limit: int = 500, employee_id: Optional[int] = None, db=Depends(get_db)):
+    """Entries created or updated after ``since``, plus ids of entries deleted after it."""
+    try:
+        return sync.entry_changes(db, since, limit, employee_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/employees/{employee_id}/entries", response_model=schemas.TimesheetEntry)
-def create_entry(employee_id: int, item: schemas.TimesheetEntryCreate, db=Depends(get_db)):
-    emp = db.query(models.Employee).get(employee_id)
-    if not emp:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    obj = models.TimesheetEntry(
-        employee_id=employee_id,
-        entry_date=item.entry_date,
-        hours=item.hours,
-        project=item.project,
-        notes=item.notes,
-    )
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+def create_entry(employee_id: int, item: schemas.TimesheetEntryCreate):
+    return services.create_entry(employee_id, item)
 
 @app.get("/employees/{employee_id}/entries", response_model=List[schemas.TimesheetEntry])
-def list_entries(employee_id: int, db=Depends(get_db)):
-    return (
-        db.query(models.TimesheetEntry)
-        .filter(models.TimesheetEntry.employee_id == employee_id)
-        .order_by(models.TimesheetEntry.entry_date.desc())
-        .all()
-    )
+def list_entries(employee_id: int, request: Request, response: Response, db=Depends(get_db)):
+    etag = etags.for_collection(db, models.TimesheetEntry, models.TimesheetEntry.employee_id == employee_id)
+    cached = etags.not_modified(request, response, etag)
+    if cached:
+        return cached
+    return services.list_entries(db, employee_id)
+
+@app.get("/employees/{employee_id}/entries/page", response_model=schemas.TimesheetEntryPage)
+def entry_page(
+    employee_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """Bounded alternative to the full list: newest first, optional date window, keyset cursor."""
+    return services.entry_page(db, employee_id, start_date, end_date, limit, cursor)
+
+@app.get("/employees/{employee_id}/weeks/{week_start}", response_model=schemas.WeekGrid)
+def get_week(employee_id: int, week_start: date, db=Depends(get_db)):
+    """Week x project grid for the week containing ``week_start`` (weeks start on Monday)."""
+    if not repository.employee_exists(db, employee_id):
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return weekgrid.read_week(db, employee_id, weekgrid.week_start_of(week_start))
+
+@app.put("/employees/{employee_id}/weeks/{week_start}", response_model=schemas.WeekGrid)
+def save_week(employee_id: int, week_start: date, grid: schemas.WeekGridUpdate):
+    """Replace the whole week grid in one request; only changed cells are written."""
+    def _save(db):
+        if not repository.employee_exists(db, employee_id):
+            raise HTTPException(status_code=404, detail="Employee not found")
+        return weekgrid.save_week(db, employee_id, weekgrid.week_start_of(week_start), grid.rows)
+
+    return run_write(_save)
+
+# Reports (served from the rollup tables, not raw entries)
+@app.get("/projects")
+def list_projects(db=Depends(get_db)):
+    """Project codes with hours booked."""
+    return {"projects": [{"code": code} for code in services.project_codes(db)]}
+
+@app.get("/employees/{employee_id}/summary", response_model=schemas.EmployeeHoursSummary)
+def employee_summary(employee_id: int, start_date: date, end_date: date, db=Depends(get_db)):
+    return services.employee_summary(db, employee_id, start_date, end_date)
+
+@app.get("/summaries", response_model=List[schemas.EmployeeHoursSummary])
+def employee_summaries(
+    start_date: date,
+    end_date: date,
+    employee_ids: List[int] = Query(..., description="Repeat for each employee (employee_ids=1&employee_ids=2)"),
+    db=Depends(get_db),
+):
+    """Hour summaries for up to MAX_BATCH_EMPLOYEES employees in one round trip."""
+    return services.employee_summaries(db, employee_ids, start_date, end_date)
+
+@app.get("/employees/{employee_id}/daily-hours", response_model=List[schemas.DailyHours])
+def employee_daily_hours(employee_id: int, start_date: date, end_date: date, db=Depends(get_db)):
+    services.check_range(start_date, end_date)
+    return rollups.daily_hours(db, employee_id, start_date, end_date)
+
+@app.get("/projects/{project:path}/hours", response_model=schemas.ProjectHours)
+def project_hours(project: str, start_date: date, end_date: date, db=Depends(get_db)):
+    return services.project_hours(db, project, start_date, end_date)
+
+@app.get("/projects/{project:path}/weekly-hours", response_model=List[schemas.ProjectWeekHours])
+def project_weekly_hours(project: str, start_date: date, end_date: date, db=Depends(get_db)):
+    services.check_range(start_date, end_date)
+    return rollups.project_weekly_hours(db, project, start_date, end_date)
+
+@app.post("/reports/rollups/rebuild")
+def rebuild_rollups():
+    """Recompute the rollup tables from raw entries (e.g. after loading seed.sql)."""
+    return {"daily_rows": run_write(rollups.rebuild)}
+
+IMPORT_CHUNK_SIZE = int(os.getenv("TIMESHEET_IMPORT_CHUNK_SIZE", "1000"))
+
+@app.post("/entries/import", response_model=schemas.ImportResult)
+async def import_entries(
+    request: Request,
+    format: Optional[str] = Query(default=None, description="csv or ndjson; defaults from Content-Type"),
+    max_errors: int = Query(default=100, ge=0, le=10000),
+):
+    """
+    Bulk import timesheet entries from a streamed CSV (with header row) or NDJSON body.
+    Each row needs employee_id, entry_date and hours; project and notes are optional.
+    Rows are validated individually (hours must be 1-24) and inserted in chunks; failures
+    are reported per line. A quoted CSV field may span lines.
+
+    The import is not atomic: every chunk commits on its own, and ``committed`` lists
+    the input line ranges that were stored. If the upload breaks off or the request
+    fails part way, those rows stay; resume from the line after the last range.
+    """
+    fmt = importer.detect_format(request.headers.get("content-type"), format)
+    employee_ids = await run_in_threadpool(importer.load_employee_ids)
+    try:
+        return await importer.import_entries(
+            importer.iter_lines(request.stream()), fmt, employee_ids, IMPORT_CHUNK_SIZE, max_errors
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Serve simple web UI
 WEB_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "web"))
@@ -1,17 +1,54 @@
-from datetime import date
-from sqlalchemy import Date, ForeignKey, Integer, String
+from datetime import date, datetime, timezone
+from sqlalchemy import Date, DateTime, ForeignKey, Index, text, Integer, String
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.sql.functions import FunctionElement
 
 from .db import Base
 
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp (the form stored in DateTime columns)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class utc_timestamp(FunctionElement):
+    """Database-side UTC now, for server defaults (rows inserted outside the ORM)."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_timestamp)
+def _utc_timestamp(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # UTC on SQLite
+
+
+@compiles(utc_timestamp, "mssql")
+def _utc_timestamp_mssql(element, compiler, **kw):
+    return "SYSUTCDATETIME()"
+
+# Change tracking (see sync.py): every synced table carries updated_at, set on
+# insert and update, and row_version, which the ORM bumps on each UPDATE and
+# checks in its WHERE clause (a concurrent writer gets StaleDataError).
+# Both are NOT NULL with server defaults, so rows inserted by plain SQL
+# (seed.sql) are versioned and show up in the change feeds too.
+# The (updated_at, id) index backs the ?since= keyset scans.
+
 class Employee(Base):
     __tablename__ = "employees"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow, server_default=utc_timestamp(), nullable=False
+    )
+    row_version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"), nullable=False)
 
     timesheets: Mapped[list["TimesheetEntry"]] = relationship("TimesheetEntry", back_populates="employee")
 
+    __table_args__ = (Index("ix_employees_sync", "updated_at", "id"),)
+    __mapper_args__ = {"version_id_col": row_version}
+
 class TimesheetEntry(Base):
     __tablename__ = "timesheet_entries"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -20,5 +57,41 @@ class TimesheetEntry(Base):
     hours: Mapped[int] = mapped_column(Integer, nullable=False)
     project: Mapped[str | None] = mapped_column(String, nullable=True)
     notes: Mapped[str | None] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow, server_default=utc_timestamp(), nullable=False
+    )
+    row_version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"), nullable=False)
 
     employee: Mapped[Employee] = relationship("Employee", back_populates="timesheets")
+
+    __table_args__ = (Index("ix_timesheet_entries_sync", "updated_at", "id"),)
+    __mapper_args__ = {"version_id_col": row_version}
+
+# Deleted entries, so change feeds can report deletions (written by sync.py)
+class TimesheetEntryTombstone(Base):
+    __tablename__ = "timesheet_entry_tombstones"
+    entry_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    employee_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_timesheet_entry_tombstones_sync", "deleted_at", "entry_id"),)
+
+# Incrementally maintained aggregates over timesheet_entries (see rollups.py).
+# Entries without a project are rolled up under project "".
+class DailyHoursRollup(Base):
+    __tablename__ = "timesheet_daily_rollups"
+    employee_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    project: Mapped[str] = mapped_column(String(200), primary_key=True)
+    hours: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_timesheet_daily_rollups_project_day", "project", "day"),)
+
+class ProjectWeekRollup(Base):
+    __tablename__ = "timesheet_project_week_rollups"
+    project: Mapped[str] = mapped_column(String(200), primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    employee_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    hours: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,312 @@
+"""
+Rollup tables for timesheet analytics.
+
+Two aggregates are kept in step with ``timesheet_entries``:
+
+* ``timesheet_daily_rollups``: hours per employee / day / project
+* ``timesheet_project_week_rollups``: hours per project / week / employee
+
+ORM inserts, updates and deletes of TimesheetEntry are picked up by a
+``before_flush`` hook and turned into atomic ``hours = hours + :delta``
+upserts in the same transaction (ON CONFLICT on SQLite, MERGE ... HOLDLOCK
+on MSSQL), so two writers creating the same rollup row do not collide.
+Core bulk inserts (the importer) call
+``apply_inserted_rows`` explicitly.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, event, func, insert, inspect, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .db import SessionLocal, WriterSessionLocal
+
+logger = logging.getLogger(__name__)
+
+NO_PROJECT = ""
+
+DailyKey = tuple[int, date, str]
+WeekKey = tuple[str, date, int]
+
+
+def week_start_of(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+def project_key(project: Optional[str]) -> str:
+    return project if project is not None else NO_PROJECT
+
+
+def project_label(project: str) -> Optional[str]:
+    return project if project != NO_PROJECT else None
+
+
+class _Deltas:
+    def __init__(self) -> None:
+        self.daily: dict[DailyKey, list[int]] = defaultdict(lambda: [0, 0])
+        self.weekly: dict[WeekKey, list[int]] = defaultdict(lambda: [0, 0])
+
+    def add(self, employee_id: int, day: date, project: Optional[str], hours: int, count: int) -> None:
+        proj = project_key(project)
+        d = self.daily[(employee_id, day, proj)]
+        d[0] += hours
+        d[1] += count
+        w = self.weekly[(proj, week_start_of(day), employee_id)]
+        w[0] += hours
+        w[1] += count
+
+
+def _old_value(obj: models.TimesheetEntry, attr: str) -> Any:
+    """Value of ``attr`` as it is currently stored in the database."""
+    hist = inspect(obj).attrs[attr].history
+    if hist.deleted:
+        return hist.deleted[0]
+    if hist.unchanged:
+        return hist.unchanged[0]
+    return getattr(obj, attr)
+
+
+def _upsert(db, model, keys: dict[str, Any], hours: int, count: int) -> None:
+    """Add ``hours``/``count`` to the rollup row at ``keys``, creating it if missing, race-free."""
+    dialect = db.get_bind().dialect
+    if dialect.name == "sqlite":
+        stmt = sqlite_insert(model).values(**keys, hours=hours, entry_count=count)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={"hours": model.hours + stmt.excluded.hours, "entry_count": model.entry_count + stmt.excluded.entry_count},
+        ))
+    elif dialect.name == "mssql":
+        # HOLDLOCK keeps the key range locked from MERGE's match to its insert
+        q = dialect.identifier_preparer.quote
+        cols = [q(k) for k in keys]
+        db.execute(text(
+            f"MERGE {q(model.__tablename__)} WITH (HOLDLOCK) AS t"
+            f" USING (SELECT {', '.join(f':{k} AS {c}' for k, c in zip(keys, cols))}) AS s"
+            f" ON {' AND '.join(f't.{c} = s.{c}' for c in cols)}"
+            " WHEN MATCHED THEN UPDATE SET hours = t.hours + :hours, entry_count = t.entry_count + :entry_count"
+            f" WHEN NOT MATCHED THEN INSERT ({', '.join(cols)}, hours, entry_count)"
+            f" VALUES ({', '.join(f's.{c}' for c in cols)}, :hours, :entry_count);"
+        ), {**keys, "hours": hours, "entry_count": count})
+    else:
+        where = [getattr(model, k) == v for k, v in keys.items()]
+        values = {"hours": model.hours + hours, "entry_count": model.entry_count + count}
+        if db.execute(update(model).where(*where).values(**values)).rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(model).values(**keys, hours=hours, entry_count=count))
+            except IntegrityError:
+                # A concurrent writer created the row first
+                db.execute(update(model).where(*where).values(**values))
+
+
+def _apply(db, deltas: _Deltas) -> None:
+    D, W = models.DailyHoursRollup, models.ProjectWeekRollup
+    for (emp, day, proj), (dh, dc) in deltas.daily.items():
+        if dh == 0 and dc == 0:
+            continue
+        _upsert(db, D, {"employee_id": emp, "day": day, "project": proj}, dh, dc)
+        if dc < 0:
+            db.execute(delete(D).where(D.employee_id == emp, D.day == day, D.project == proj, D.entry_count <= 0))
+    for (proj, week, emp), (dh, dc) in deltas.weekly.items():
+        if dh == 0 and dc == 0:
+            continue
+        _upsert(db, W, {"project": proj, "week_start": week, "employee_id": emp}, dh, dc)
+        if dc < 0:
+            db.execute(delete(W).where(W.project == proj, W.week_start == week, W.employee_id == emp, W.entry_count <= 0))
+
+
+def _before_flush(session, _flush_context, _instances) -> None:
+    deltas = _Deltas()
+    touched = False
+    for obj in session.new:
+        if isinstance(obj, models.TimesheetEntry):
+            deltas.add(obj.employee_id, obj.entry_date, obj.project, obj.hours, 1)
+            touched = True
+    for obj in session.deleted:
+        if isinstance(obj, models.TimesheetEntry):
+            deltas.add(_old_value(obj, "employee_id"), _old_value(obj, "entry_date"), _old_value(obj, "project"), -_old_value(obj, "hours"), -1)
+            touched = True
+    for obj in session.dirty:
+        if not isinstance(obj, models.TimesheetEntry) or not session.is_modified(obj):
+            continue
+        deltas.add(_old_value(obj, "employee_id"), _old_value(obj, "entry_date"), _old_value(obj, "project"), -_old_value(obj, "hours"), -1)
+        deltas.add(obj.employee_id, obj.entry_date, obj.project, obj.hours, 1)
+        touched = True
+    if touched:
+        _apply(session, deltas)
+
+
+for _factory in (SessionLocal, WriterSessionLocal):
+    event.listen(_factory, "before_flush", _before_flush)
+
+# Load the stored value when one of these is assigned on an expired entry, so
+# _old_value sees it in the attribute history instead of the new value
+for _attr in ("employee_id", "entry_date", "project", "hours"):
+    event.listen(getattr(models.TimesheetEntry, _attr), "set", lambda *_: None, active_history=True)
+
+
+def apply_inserted_rows(db, rows: Iterable[dict[str, Any]]) -> None:
+    """Roll up rows written with a Core ``insert()`` (bypassing the ORM hook)."""
+    deltas = _Deltas()
+    for r in rows:
+        deltas.add(r["employee_id"], r["entry_date"], r.get("project"), r["hours"], 1)
+    _apply(db, deltas)
+
+
+def rebuild(db) -> int:
+    """Recompute both rollup tables from timesheet_entries. Returns the number of daily rows."""
+    E, D, W = models.TimesheetEntry, models.DailyHoursRollup, models.ProjectWeekRollup
+    db.execute(delete(W))
+    db.execute(delete(D))
+    proj = func.coalesce(E.project, NO_PROJECT)
+    db.execute(
+        insert(D).from_select(
+            ["employee_id", "day", "project", "hours", "entry_count"],
+            select(E.employee_id, E.entry_date, proj, func.sum(E.hours), func.count(E.id))
+            .group_by(E.employee_id, E.entry_date, proj),
+        )
+    )
+    weekly: dict[WeekKey, list[int]] = defaultdict(lambda: [0, 0])
+    daily_rows = 0
+    for emp, day, p, hours, count in db.execute(select(D.employee_id, D.day, D.project, D.hours, D.entry_count)):
+        w = weekly[(p, week_start_of(day), emp)]
+        w[0] += hours
+        w[1] += count
+        daily_rows += 1
+    if weekly:
+        db.execute(
+            insert(W),
+            [{"project": p, "week_start": wk, "employee_id": emp, "hours": h, "entry_count": c}
+             for (p, wk, emp), (h, c) in weekly.items()],
+        )
+    logger.info(f"Rebuilt timesheet rollups: {daily_rows} daily rows, {len(weekly)} weekly rows")
+    return daily_rows
+
+
+def ensure_built() -> None:
+    """Build the rollups once when they are empty but entries already exist (e.g. SQL seed)."""
+    with WriterSessionLocal() as db:
+        has_rollups = db.execute(select(models.DailyHoursRollup.employee_id).limit(1)).first()
+        has_entries = db.execute(select(models.TimesheetEntry.id).limit(1)).first()
+        if has_entries and not has_rollups:
+            rebuild(db)
+            db.commit()
+
+
+# ---------------------------------------------------------------------------
+# Queries (read only from the rollup tables)
+# ---------------------------------------------------------------------------
+
+def daily_hours(db, employee_id: int, start: date, end: date) -> list[dict[str, Any]]:
+    D = models.DailyHoursRollup
+    rows = db.execute(
+        select(D.day, func.sum(D.hours), func.sum(D.entry_count))
+        .where(D.employee_id == employee_id, D.day >= start, D.day <= end)
+        .group_by(D.day)
+        .order_by(D.day)
+    )
+    return [{"day": day, "hours": int(h), "entries_count": int(c)} for day, h, c in rows]
+
+
+def employee_summary(db, employee_id: int, start: date, end: date) -> dict[str, Any]:
+    D = models.DailyHoursRollup
+    rows = db.execute(
+        select(D.project, func.sum(D.hours), func.sum(D.entry_count))
+        .where(D.employee_id == employee_id, D.day >= start, D.day <= end)
+        .group_by(D.project)
+    ).all()
+    return {
+        "employee_id": employee_id,
+        "start_date": start,
+        "end_date": end,
+        "total_hours": sum(int(h) for _, h, _ in rows),
+        "entries_count": sum(int(c) for _, _, c in rows),
+        "project_breakdown": {p: int(h) for p, h, _ in rows},
+    }
+
+
+def employee_summaries(db, employee_ids: list[int], start: date, end: date) -> list[dict[str, Any]]:
+    """``employee_summary`` for several employees with one grouped query, in ``employee_ids`` order."""
+    D = models.DailyHoursRollup
+    summaries = {
+        emp: {
+            "employee_id": emp,
+            "start_date": start,
+            "end_date": end,
+            "total_hours": 0,
+            "entries_count": 0,
+            "project_breakdown": {},
+        }
+        for emp in employee_ids
+    }
+    rows = db.execute(
+        select(D.employee_id, D.project, func.sum(D.hours), func.sum(D.entry_count))
+        .where(D.employee_id.in_(employee_ids), D.day >= start, D.day <= end)
+        .group_by(D.employee_id, D.project)
+    )
+    for emp, project, h, c in rows:
+        summary = summaries[emp]
+        summary["total_hours"] += int(h)
+        summary["entries_count"] += int(c)
+        summary["project_breakdown"][project] = int(h)
+    return list(summaries.values())
+
+
+def project_weekly_hours(db, project: str, start: date, end: date) -> list[dict[str, Any]]:
+    W = models.ProjectWeekRollup
+    rows = db.execute(
+        select(W.week_start, func.sum(W.hours), func.sum(W.entry_count))
+        .where(W.project == project, W.week_start >= week_start_of(start), W.week_start <= end)
+        .group_by(W.week_start)
+        .order_by(W.week_start)
+    )
+    return [{"week_start": wk, "hours": int(h), "entries_count": int(c)} for wk, h, c in rows]
+
+
+def project_hours(db, project: str, start: date, end: date) -> dict[str, Any]:
+    """
+    Total hours for ``project`` in [start, end]: whole weeks come from the
+    weekly rollup, the partial weeks at either edge from the daily rollup.
+    """
+    D, W = models.DailyHoursRollup, models.ProjectWeekRollup
+    first_full = week_start_of(start) if start.weekday() == 0 else week_start_of(start) + timedelta(days=7)
+    last_full = week_start_of(end) if end.weekday() == 6 else week_start_of(end) - timedelta(days=7)
+    contributors: dict[str, int] = defaultdict(int)
+    entries = 0
+
+    def _collect(rows) -> None:
+        nonlocal entries
+        for emp, h, c in rows:
+            contributors[str(emp)] += int(h)
+            entries += int(c)
+
+    if first_full <= last_full:
+        _collect(db.execute(
+            select(W.employee_id, func.sum(W.hours), func.sum(W.entry_count))
+            .where(W.project == project, W.week_start >= first_full, W.week_start <= last_full)
+            .group_by(W.employee_id)
+        ))
+        edges = [(start, first_full - timedelta(days=1)), (last_full + timedelta(days=7), end)]
+    else:
+        edges = [(start, end)]
+    for lo, hi in edges:
+        if lo > hi:
+            continue
+        _collect(db.execute(
+            select(D.employee_id, func.sum(D.hours), func.sum(D.entry_count))
+            .where(D.project == project, D.day >= lo, D.day <= hi)
+            .group_by(D.employee_id)
+        ))
+    return {
+        "project": project,
+        "start_date": start,
+        "end_date": end,
+        "total_hours": sum(contributors.values()),
+        "entries_count": entries,
+        "contributors": dict(contributors),
+    }
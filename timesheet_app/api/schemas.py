@@ -1,6 +1,7 @@
-from datetime import date
-from typing import Optional
-from pydantic import BaseModel
+import calendar
+from datetime import date, datetime
+from typing import Annotated, Dict, List, Optional
+from pydantic import BaseModel, Field, model_validator
 
 class EmployeeBase(BaseModel):
     name: str
@@ -11,9 +12,13 @@ class EmployeeCreate(EmployeeBase):
 
 class Employee(EmployeeBase):
     id: int
+    updated_at: Optional[datetime] = None
+    row_version: Optional[int] = None
     class Config:
         from_attributes = True
 
+MAX_HOURS_PER_DAY = 24
+
 class TimesheetEntryBase(BaseModel):
     entry_date: date
     hours: int
@@ -26,5 +31,105 @@ class TimesheetEntryCreate(TimesheetEntryBase):
 class TimesheetEntry(TimesheetEntryBase):
     id: int
     employee_id: int
+    updated_at: Optional[datetime] = None
+    row_version: Optional[int] = None
     class Config:
         from_attributes = True
+
+class TimesheetEntryPage(BaseModel):
+    items: List[TimesheetEntry]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+class TimesheetEntryImport(TimesheetEntryCreate):
+    employee_id: int
+    hours: Annotated[int, Field(gt=0, le=MAX_HOURS_PER_DAY)]
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportCommittedLines(BaseModel):
+    first_line: int
+    last_line: int
+    inserted: int
+
+class ImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+    # Chunks commit one by one; these are the input line ranges that are stored
+    committed: List[ImportCommittedLines] = []
+
+class WeekGridRow(BaseModel):
+    project: Optional[str] = None
+    # Hours for Monday..Sunday
+    hours: List[Annotated[int, Field(ge=0, le=MAX_HOURS_PER_DAY)]] = Field(min_length=7, max_length=7)
+
+class WeekGridUpdate(BaseModel):
+    rows: List[WeekGridRow]
+
+    @model_validator(mode="after")
+    def _check_daily_totals(self):
+        # Cells are capped individually; a day's total across projects is capped too
+        for day, total in zip(calendar.day_name, map(sum, zip(*(row.hours for row in self.rows)))):
+            if total > MAX_HOURS_PER_DAY:
+                raise ValueError(f"{day} totals {total} hours across projects; at most {MAX_HOURS_PER_DAY} allowed")
+        return self
+
+class WeekGridChanges(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+class WeekGrid(BaseModel):
+    employee_id: int
+    week_start: date
+    days: List[date]
+    rows: List[WeekGridRow]
+    daily_totals: List[int]
+    total: int
+    changes: Optional[WeekGridChanges] = None
+
+class DailyHours(BaseModel):
+    day: date
+    hours: int
+    entries_count: int
+
+class EmployeeHoursSummary(BaseModel):
+    employee_id: int
+    start_date: date
+    end_date: date
+    total_hours: int
+    entries_count: int
+    project_breakdown: Dict[str, int]
+
+class ProjectWeekHours(BaseModel):
+    week_start: date
+    hours: int
+    entries_count: int
+
+class ProjectHours(BaseModel):
+    project: str
+    start_date: date
+    end_date: date
+    total_hours: int
+    entries_count: int
+    contributors: Dict[str, int]
+
+class EmployeeChanges(BaseModel):
+    items: List[Employee]
+    next_cursor: str
+    has_more: bool
+
+class DeletedEntry(BaseModel):
+    id: int
+    employee_id: int
+    deleted_at: datetime
+
+class TimesheetEntryChanges(BaseModel):
+    items: List[TimesheetEntry]
+    deleted: List[DeletedEntry]
+    next_cursor: str
+    has_more: bool
@@ -0,0 +1,122 @@
+"""
+Timesheet operations shared by the HTTP routes (main.py) and in-process
+callers such as the MCP server's direct backend.
+
+Functions raise HTTPException for client errors so both entry points report
+the same status codes and messages.
+"""
+
+from datetime import date
+from typing import Any, Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+
+from . import models, repository, rollups, schemas
+from .db import run_write
+
+MAX_BATCH_EMPLOYEES = 500
+MAX_HISTORY_PAGE = 500
+
+
+def check_range(start_date: date, end_date: date) -> None:
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+
+
+def create_entry(employee_id: int, item: schemas.TimesheetEntryCreate) -> models.TimesheetEntry:
+    def _create(db):
+        if not repository.employee_exists(db, employee_id):
+            raise HTTPException(status_code=404, detail="Employee not found")
+        obj = models.TimesheetEntry(
+            employee_id=employee_id,
+            entry_date=item.entry_date,
+            hours=item.hours,
+            project=item.project,
+            notes=item.notes,
+        )
+        db.add(obj)
+        db.flush()
+        return obj
+
+    return run_write(_create)
+
+
+def list_entries(db, employee_id: int) -> list[models.TimesheetEntry]:
+    return (
+        db.query(models.TimesheetEntry)
+        .filter(models.TimesheetEntry.employee_id == employee_id)
+        .order_by(models.TimesheetEntry.entry_date.desc())
+        .all()
+    )
+
+
+def _decode_history_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        day, _, row_id = cursor.partition(".")
+        return date.fromisoformat(day), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def entry_page(
+    db,
+    employee_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    One page of an employee's entries, newest first, optionally limited to
+    [start_date, end_date]. Keyset paging on (entry_date, id): pass
+    ``next_cursor`` back as ``cursor``.
+    """
+    E = models.TimesheetEntry
+    limit = max(1, min(limit, MAX_HISTORY_PAGE))
+    stmt = select(E).where(E.employee_id == employee_id)
+    if start_date:
+        stmt = stmt.where(E.entry_date >= start_date)
+    if end_date:
+        stmt = stmt.where(E.entry_date <= end_date)
+    if cursor:
+        day, row_id = _decode_history_cursor(cursor)
+        stmt = stmt.where(or_(E.entry_date < day, and_(E.entry_date == day, E.id < row_id)))
+    rows = list(db.scalars(stmt.order_by(E.entry_date.desc(), E.id.desc()).limit(limit + 1)))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = f"{rows[-1].entry_date.isoformat()}.{rows[-1].id}" if has_more else None
+    return {"items": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def employee_summary(db, employee_id: int, start_date: date, end_date: date) -> dict[str, Any]:
+    check_range(start_date, end_date)
+    return rollups.employee_summary(db, employee_id, start_date, end_date)
+
+
+def batch_ids(employee_ids: Iterable[int]) -> list[int]:
+    """De-duplicate a batch of employee ids (first occurrence wins) and enforce the batch limit."""
+    ids = list(dict.fromkeys(employee_ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="employee_ids must not be empty")
+    if len(ids) > MAX_BATCH_EMPLOYEES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_EMPLOYEES} employee_ids per request")
+    return ids
+
+
+def employee_summaries(db, employee_ids: Iterable[int], start_date: date, end_date: date) -> list[dict[str, Any]]:
+    check_range(start_date, end_date)
+    return rollups.employee_summaries(db, batch_ids(employee_ids), start_date, end_date)
+
+
+def project_hours(db, project: str, start_date: date, end_date: date) -> dict[str, Any]:
+    check_range(start_date, end_date)
+    return rollups.project_hours(db, project, start_date, end_date)
+
+
+def project_codes(db) -> list[str]:
+    """Project codes that have hours booked, from the weekly rollup."""
+    W = models.ProjectWeekRollup
+    return list(db.scalars(
+        select(W.project).where(W.project != rollups.NO_PROJECT).distinct().order_by(W.project)
+    ))
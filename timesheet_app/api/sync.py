@@ -0,0 +1,102 @@
+"""
+Change feeds for incremental sync.
+
+Synced tables carry ``updated_at`` (see models.py). A feed returns the rows
+changed after a cursor, ordered by (updated_at, id), so a client that keeps
+the returned ``next_cursor`` only downloads what changed since its last call.
+Deleted entries leave a tombstone (written by a ``before_flush`` hook) and are
+reported in the same ordering, so clients can drop them.
+
+The cursor is "<timestamp in microseconds since the epoch>-<id>". Rows whose
+timestamp is younger than SYNC_SETTLE_SECONDS are held back: a transaction
+can take its timestamp before a concurrent one and commit after it, and a
+cursor must never move past a row that is not visible yet.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import and_, event, or_, select
+
+from . import models
+from .db import SessionLocal, WriterSessionLocal
+from .models import utcnow
+
+SYNC_SETTLE_SECONDS = float(os.getenv("TIMESHEET_SYNC_SETTLE_SECONDS", "1"))
+MAX_SYNC_PAGE = 1000
+
+_EPOCH = datetime(1970, 1, 1)
+START_CURSOR = "0-0"
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    return f"{(ts - _EPOCH) // timedelta(microseconds=1)}-{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError for a malformed cursor."""
+    micros, sep, row_id = cursor.partition("-")
+    if not sep:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return _EPOCH + timedelta(microseconds=int(micros)), int(row_id)
+
+
+def _before_flush(session, _flush_context, _instances) -> None:
+    for obj in session.deleted:
+        if isinstance(obj, models.TimesheetEntry):
+            # merge: SQLite may reuse the id of a deleted row, so a tombstone can already exist
+            session.merge(models.TimesheetEntryTombstone(
+                entry_id=obj.id, employee_id=obj.employee_id, deleted_at=utcnow(),
+            ))
+
+
+for _factory in (SessionLocal, WriterSessionLocal):
+    event.listen(_factory, "before_flush", _before_flush)
+
+
+def _page(db, model, ts_col, id_col, since: Optional[str], limit: int, criteria) -> list:
+    stmt = select(model).where(ts_col <= utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS), *criteria)
+    if since:
+        ts, row_id = decode_cursor(since)
+        # Range on the timestamp first so the (timestamp, id) index is used
+        stmt = stmt.where(ts_col >= ts, or_(ts_col > ts, and_(ts_col == ts, id_col > row_id)))
+    return list(db.scalars(stmt.order_by(ts_col, id_col).limit(limit + 1)))
+
+
+def changes(db, model, since: Optional[str], limit: int, *criteria) -> dict[str, Any]:
+    """
+    Rows of ``model`` changed after ``since`` (all rows when None), oldest
+    change first, at most ``limit`` of them.
+    """
+    limit = max(1, min(limit, MAX_SYNC_PAGE))
+    rows = _page(db, model, model.updated_at, model.id, since, limit, criteria)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id) if rows else (since or START_CURSOR)
+    return {"items": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def entry_changes(db, since: Optional[str], limit: int, employee_id: Optional[int] = None) -> dict[str, Any]:
+    """Like ``changes`` for timesheet entries, with deletions merged into the same order."""
+    limit = max(1, min(limit, MAX_SYNC_PAGE))
+    E, T = models.TimesheetEntry, models.TimesheetEntryTombstone
+    live = _page(db, E, E.updated_at, E.id, since, limit,
+                 [] if employee_id is None else [E.employee_id == employee_id])
+    dead = _page(db, T, T.deleted_at, T.entry_id, since, limit,
+                 [] if employee_id is None else [T.employee_id == employee_id])
+    merged = sorted(
+        [(e.updated_at, e.id, e) for e in live] + [(t.deleted_at, t.entry_id, t) for t in dead],
+        key=lambda x: (x[0], x[1]),
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+    return {
+        "items": [obj for _, _, obj in merged if isinstance(obj, E)],
+        "deleted": [
+            {"id": obj.entry_id, "employee_id": obj.employee_id, "deleted_at": obj.deleted_at}
+            for _, _, obj in merged if isinstance(obj, T)
+        ],
+        "next_cursor": encode_cursor(merged[-1][0], merged[-1][1]) if merged else (since or START_CURSOR),
+        "has_more": has_more,
+    }
@@ -0,0 +1,114 @@
+"""
+Week-by-project timesheet grid (Mon..Sun x N projects).
+
+A week is read with one range query and saved by diffing the submitted grid
+against the stored entries, so only changed cells turn into INSERT, UPDATE
+or DELETE statements, all inside one transaction.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Optional
+
+from . import models, schemas
+
+
+def week_start_of(d: date) -> date:
+    """Monday of the week containing ``d``."""
+    return d - timedelta(days=d.weekday())
+
+
+def _load_week(db, employee_id: int, week_start: date) -> list[models.TimesheetEntry]:
+    return (
+        db.query(models.TimesheetEntry)
+        .filter(
+            models.TimesheetEntry.employee_id == employee_id,
+            models.TimesheetEntry.entry_date >= week_start,
+            models.TimesheetEntry.entry_date < week_start + timedelta(days=7),
+        )
+        .order_by(models.TimesheetEntry.id)
+        .all()
+    )
+
+
+def _cells(entries: list[models.TimesheetEntry], week_start: date) -> dict[tuple[Optional[str], int], list[models.TimesheetEntry]]:
+    cells: dict[tuple[Optional[str], int], list[models.TimesheetEntry]] = defaultdict(list)
+    for e in entries:
+        cells[(e.project, (e.entry_date - week_start).days)].append(e)
+    return cells
+
+
+def build_grid(employee_id: int, week_start: date, entries: list[models.TimesheetEntry]) -> schemas.WeekGrid:
+    hours_by_project: dict[Optional[str], list[int]] = {}
+    for (project, day), items in _cells(entries, week_start).items():
+        hours_by_project.setdefault(project, [0] * 7)[day] += sum(e.hours for e in items)
+    rows = [
+        schemas.WeekGridRow(project=p, hours=h)
+        for p, h in sorted(hours_by_project.items(), key=lambda kv: (kv[0] is None, kv[0] or ""))
+    ]
+    daily = [sum(r.hours[i] for r in rows) for i in range(7)]
+    return schemas.WeekGrid(
+        employee_id=employee_id,
+        week_start=week_start,
+        days=[week_start + timedelta(days=i) for i in range(7)],
+        rows=rows,
+        daily_totals=daily,
+        total=sum(daily),
+    )
+
+
+def read_week(db, employee_id: int, week_start: date) -> schemas.WeekGrid:
+    return build_grid(employee_id, week_start, _load_week(db, employee_id, week_start))
+
+
+def save_week(db, employee_id: int, week_start: date, rows: list[schemas.WeekGridRow]) -> schemas.WeekGrid:
+    """
+    Replace the employee's week with ``rows``. A cell's hours are kept on a
+    single entry: unchanged cells are left alone, changed cells update their
+    first entry (dropping any duplicates), zero cells are deleted and new
+    cells are inserted. Projects missing from ``rows`` are cleared.
+    """
+    entries = _load_week(db, employee_id, week_start)
+    existing = _cells(entries, week_start)
+    wanted: dict[tuple[Optional[str], int], int] = {}
+    for row in rows:
+        for day, hours in enumerate(row.hours):
+            key = (row.project, day)
+            wanted[key] = wanted.get(key, 0) + hours
+
+    changes = schemas.WeekGridChanges()
+    kept: list[models.TimesheetEntry] = []
+    for key in set(existing) | set(wanted):
+        current = existing.get(key, [])
+        hours = wanted.get(key, 0)
+        if hours == sum(e.hours for e in current):
+            kept.extend(current)
+            continue
+        if hours == 0:
+            for e in current:
+                db.delete(e)
+            changes.deleted += len(current)
+            continue
+        if current:
+            first, extra = current[0], current[1:]
+            first.hours = hours
+            changes.updated += 1
+            for e in extra:
+                db.delete(e)
+            changes.deleted += len(extra)
+            kept.append(first)
+        else:
+            project, day = key
+            obj = models.TimesheetEntry(
+                employee_id=employee_id,
+                entry_date=week_start + timedelta(days=day),
+                hours=hours,
+                project=project,
+            )
+            db.add(obj)
+            changes.inserted += 1
+            kept.append(obj)
+    db.flush()
+    grid = build_grid(employee_id, week_start, kept)
+    grid.changes = changes
+    return grid
@@ -1,8 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 from typing import Dict, List, Any
 import requests
 import os
+import json
+import hashlib
 from datetime import datetime, timedelta
 
 TIMESHEET_API_URL = os.getenv("TIMESHEET_API_URL", "http://localhost:8002")
@@ -23,6 +25,40 @@ class PromptRequest(BaseModel):
 class ResourceRequest(BaseModel):
     uri: str
 
+def _content_version(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+class _StaticBody:
+    """
+    A JSON payload serialized once at import time. ``version`` is a hash of
+    the body, so it only changes when the content does; it doubles as the
+    ETag for conditional GETs and as ``_meta.version`` in listings.
+    """
+
+    def __init__(self, payload: dict, version: str | None = None):
+        self.body = json.dumps(payload, separators=(",", ":")).encode()
+        self.version = version or _content_version(self.body)
+        self.etag = f'"{self.version}"'
+
+    @classmethod
+    def resource(cls, uri: str, mime_type: str, text: str) -> "_StaticBody":
+        version = _content_version(text.encode())
+        contents = {"uri": uri, "mimeType": mime_type, "text": text, "_meta": {"version": version}}
+        return cls({"contents": [contents]}, version)
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match list names this body (weak comparison, ``*`` matches)."""
+        if if_none_match.strip() == "*":
+            return True
+        tags = (tag.strip() for tag in if_none_match.split(","))
+        return any((tag[2:] if tag.startswith("W/") else tag) == self.etag for tag in tags)
+
+    def response(self, request: Request | None = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if request is not None and self.matches(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
 @app.get("/mcp/health")
 def health():
     return {"status": "mcp server ok"}
@@ -31,39 +67,41 @@ def health():
 # MCP TOOLS - Actions the server can perform
 # ============================================================================
 
+TOOL_LIST = _StaticBody({
+    "tools": [
+        {
+            "name": "add_timesheet_entry",
+            "description": "Add a timesheet entry for an employee",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "employee_id": {"type": "integer", "description": "Employee ID"},
+                    "entry_date": {"type": "string", "description": "Entry date (YYYY-MM-DD)"},
+                    "hours": {"type": "integer", "description": "Hours worked"},
+                    "project": {"type": "string", "description": "Project name or code"},
+                    "notes": {"type": "string", "description": "Optional notes about the work"}
+                },
+                "required": ["employee_id", "entry_date", "hours"]
+            }
+        },
+        {
+            "name": "list_timesheet_entries",
+            "description": "List timesheet entries for an employee",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "employee_id": {"type": "integer", "description": "Employee ID"}
+                },
+                "required": ["employee_id"]
+            }
+        }
+    ]
+})
+
 @app.get("/mcp/tools/list")
-def list_tools():
+def list_tools(http_request: Request):
     """List all available tools"""
-    return {
-        "tools": [
-            {
-                "name": "add_timesheet_entry",
-                "description": "Add a timesheet entry for an employee",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "employee_id": {"type": "integer", "description": "Employee ID"},
-                        "entry_date": {"type": "string", "description": "Entry date (YYYY-MM-DD)"},
-                        "hours": {"type": "integer", "description": "Hours worked"},
-                        "project": {"type": "string", "description": "Project name or code"},
-                        "notes": {"type": "string", "description": "Optional notes about the work"}
-                    },
-                    "required": ["employee_id", "entry_date", "hours"]
-                }
-            },
-            {
-                "name": "list_timesheet_entries",
-                "description": "List timesheet entries for an employee",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "employee_id": {"type": "integer", "description": "Employee ID"}
-                    },
-                    "required": ["employee_id"]
-                }
-            }
-        ]
-    }
+    return TOOL_LIST.response(http_request)
 
 @app.post("/mcp/tools/add_timesheet_entry")
 def mcp_add_entry(payload: AddEntryPayload):
@@ -92,39 +130,41 @@ def mcp_list_entries(employee_id: int):
 # MCP PROMPTS - Pre-defined prompt templates for common tasks
 # ============================================================================
 
+PROMPT_LIST = _StaticBody({
+    "prompts": [
+        {
+            "name": "timesheet_reminder",
+            "description": "Generate a friendly reminder about timesheet submission",
+            "arguments": [
+                {"name": "employee_name", "description": "Name of the employee", "required": True},
+                {"name": "period_end", "description": "End date of the timesheet period", "required": True},
+                {"name": "missing_days", "description": "Number of missing days", "required": False}
+            ]
+        },
+        {
+            "name": "project_time_summary",
+            "description": "Create a summary of time spent on projects",
+            "arguments": [
+                {"name": "employee_id", "description": "Employee ID for data retrieval", "required": True},
+                {"name": "period", "description": "Period to summarize (week/month)", "required": False},
+                {"name": "project_filter", "description": "Specific project to focus on", "required": False}
+            ]
+        },
+        {
+            "name": "overtime_analysis",
+            "description": "Analyze overtime patterns and provide recommendations",
+            "arguments": [
+                {"name": "employee_id", "description": "Employee ID for analysis", "required": True},
+                {"name": "threshold_hours", "description": "Daily hours threshold for overtime", "required": False}
+            ]
+        }
+    ]
+})
+
 @app.get("/mcp/prompts/list")
-def list_prompts():
+def list_prompts(http_request: Request):
     """List all available prompts"""
-    return {
-        "prompts": [
-            {
-                "name": "timesheet_reminder",
-                "description": "Generate a friendly reminder about timesheet submission",
-                "arguments": [
-                    {"name": "employee_name", "description": "Name of the employee", "required": True},
-                    {"name": "period_end", "description": "End date of the timesheet period", "required": True},
-                    {"name": "missing_days", "description": "Number of missing days", "required": False}
-                ]
-            },
-            {
-                "name": "project_time_summary",
-                "description": "Create a summary of time spent on projects",
-                "arguments": [
-                    {"name": "employee_id", "description": "Employee ID for data retrieval", "required": True},
-                    {"name": "period", "description": "Period to summarize (week/month)", "required": False},
-                    {"name": "project_filter", "description": "Specific project to focus on", "required": False}
-                ]
-            },
-            {
-                "name": "overtime_analysis",
-                "description": "Analyze overtime patterns and provide recommendations",
-                "arguments": [
-                    {"name": "employee_id", "description": "Employee ID for analysis", "required": True},
-                    {"name": "threshold_hours", "description": "Daily hours threshold for overtime", "required": False}
-                ]
-            }
-        ]
-    }
+    return PROMPT_LIST.response(http_request)
 
 @app.post("/mcp/prompts/get")
 def get_prompt(request: PromptRequest):
@@ -310,55 +350,12 @@ Remember: Sustainable work habits lead to better long-term productivity and job
 # MCP RESOURCES - Data and content the server can provide
 # ============================================================================
 
-@app.get("/mcp/resources/list")
-def list_resources():
-    """List all available resources"""
-    return {
-        "resources": [
-            {
-                "uri": "timesheet://policies/submission",
-                "name": "Timesheet Submission Policy",
-                "description": "Guidelines for timesheet submission and approval",
-                "mimeType": "text/plain"
-            },
-            {
-                "uri": "timesheet://codes/projects",
-                "name": "Project Code Directory",
-                "description": "List of valid project codes and descriptions",
-                "mimeType": "application/json"
-            },
-            {
-                "uri": "timesheet://templates/weekly",
-                "name": "Weekly Timesheet Template",
-                "description": "Standard weekly timesheet template",
-                "mimeType": "text/plain"
-            },
-            {
-                "uri": "timesheet://reports/utilization",
-                "name": "Team Utilization Report",
-                "description": "Current team utilization rates and trends",
-                "mimeType": "application/json"
-            },
-            {
-                "uri": "timesheet://guidelines/best-practices",
-                "name": "Time Tracking Best Practices",
-                "description": "Best practices for accurate time tracking",
-                "mimeType": "text/plain"
-            }
-        ]
-    }
-
-@app.post("/mcp/resources/read")
-def read_resource(request: ResourceRequest):
-    """Read a specific resource"""
-    
-    if request.uri == "timesheet://policies/submission":
-        content = """TIMESHEET SUBMISSION POLICY
+SUBMISSION_POLICY = """TIMESHEET SUBMISSION POLICY
 
 1. SUBMISSION REQUIREMENTS
    - Weekly submission by Friday 5:00 PM
    - All days must be accounted for (including PTO, holidays)
-   - Minimum time increment: 15 minutes (0.25 hours)
+   - Minimum time increment: 1 hour (entries are whole hours)
    - Maximum daily hours: 12 (requires manager approval for >10)
 
 2. PROJECT CODES
@@ -385,60 +382,7 @@ def read_resource(request: ResourceRequest):
    - Payroll delays possible for extended lateness
    - Manager notification for repeated late submissions"""
 
-        return {"contents": [{"uri": request.uri, "mimeType": "text/plain", "text": content}]}
-    
-    elif request.uri == "timesheet://codes/projects":
-        project_codes = {
-            "updated": datetime.now().isoformat(),
-            "projects": [
-                {
-                    "code": "PROJ001",
-                    "name": "Customer Portal Development",
-                    "client": "TechCorp Inc",
-                    "status": "active",
-                    "billable": True
-                },
-                {
-                    "code": "PROJ002", 
-                    "name": "Mobile App Redesign",
-                    "client": "StartupXYZ",
-                    "status": "active",
-                    "billable": True
-                },
-                {
-                    "code": "PROJ003",
-                    "name": "Internal Tools Maintenance",
-                    "client": "Internal",
-                    "status": "active",
-                    "billable": False
-                },
-                {
-                    "code": "ADMIN",
-                    "name": "Administrative Tasks",
-                    "client": "Internal",
-                    "status": "active",
-                    "billable": False
-                },
-                {
-                    "code": "TRAIN",
-                    "name": "Training & Development",
-                    "client": "Internal", 
-                    "status": "active",
-                    "billable": False
-                },
-                {
-                    "code": "MEET",
-                    "name": "Meetings & Collaboration",
-                    "client": "Internal",
-                    "status": "active",
-                    "billable": False
-                }
-            ]
-        }
-        return {"contents": [{"uri": request.uri, "mimeType": "application/json", "text": str(project_codes)}]}
-    
-    elif request.uri == "timesheet://templates/weekly":
-        content = """WEEKLY TIMESHEET TEMPLATE
+WEEKLY_TEMPLATE = """WEEKLY TIMESHEET TEMPLATE
 
 Employee: _______________  Week Ending: _______________
 
@@ -472,9 +416,172 @@ ______________________________________
 Employee Signature: ___________  Date: _______
 Manager Approval: _____________  Date: _______"""
 
-        return {"contents": [{"uri": request.uri, "mimeType": "text/plain", "text": content}]}
-    
-    elif request.uri == "timesheet://reports/utilization":
+BEST_PRACTICES = """TIME TRACKING BEST PRACTICES
+
+1. CONSISTENCY
+   - Log time daily, not weekly
+   - Use consistent project codes
+   - Maintain regular logging habits
+   - Set daily reminders if needed
+
+2. ACCURACY
+   - Round to nearest 15 minutes
+   - Be honest about actual time spent
+   - Include breaks and interruptions
+   - Track all work-related activities
+
+3. DETAIL LEVEL
+   - Include specific task descriptions
+   - Reference tickets or requirements
+   - Note any blockers or issues
+   - Mention tools or technologies used
+
+4. PROJECT ALLOCATION
+   - Understand client vs. internal time
+   - Ask for clarification on project codes
+   - Split time appropriately across projects
+   - Don't forget administrative tasks
+
+5. QUALITY OVER QUANTITY
+   - Focus on value delivered, not hours logged
+   - Include accomplishments in notes
+   - Track learning and improvement time
+   - Note collaboration and knowledge sharing
+
+6. COMMUNICATION
+   - Discuss unclear time allocation with manager
+   - Report unusual patterns or overtime
+   - Coordinate with team on shared tasks
+   - Provide context for unusual entries
+
+7. TOOLS & EFFICIENCY
+   - Use timer apps for accuracy
+   - Set up project shortcuts
+   - Automate recurring entries where possible
+   - Review and adjust weekly
+
+REMEMBER: Good time tracking helps with:
+- Accurate client billing
+- Project planning and estimation
+- Resource allocation decisions
+- Performance evaluation
+- Work-life balance monitoring"""
+
+PROJECT_CODES = {
+    "projects": [
+        {
+            "code": "PROJ001",
+            "name": "Customer Portal Development",
+            "client": "TechCorp Inc",
+            "status": "active",
+            "billable": True
+        },
+        {
+            "code": "PROJ002", 
+            "name": "Mobile App Redesign",
+            "client": "StartupXYZ",
+            "status": "active",
+            "billable": True
+        },
+        {
+            "code": "PROJ003",
+            "name": "Internal Tools Maintenance",
+            "client": "Internal",
+            "status": "active",
+            "billable": False
+        },
+        {
+            "code": "ADMIN",
+            "name": "Administrative Tasks",
+            "client": "Internal",
+            "status": "active",
+            "billable": False
+        },
+        {
+            "code": "TRAIN",
+            "name": "Training & Development",
+            "client": "Internal", 
+            "status": "active",
+            "billable": False
+        },
+        {
+            "code": "MEET",
+            "name": "Meetings & Collaboration",
+            "client": "Internal",
+            "status": "active",
+            "billable": False
+        }
+    ]
+}
+
+# Fixed documents, served from a precomputed body (see _StaticBody)
+STATIC_RESOURCES = {
+    "timesheet://policies/submission": _StaticBody.resource("timesheet://policies/submission", "text/plain", SUBMISSION_POLICY),
+    "timesheet://codes/projects": _StaticBody.resource("timesheet://codes/projects", "application/json", json.dumps(PROJECT_CODES)),
+    "timesheet://templates/weekly": _StaticBody.resource("timesheet://templates/weekly", "text/plain", WEEKLY_TEMPLATE),
+    "timesheet://guidelines/best-practices": _StaticBody.resource("timesheet://guidelines/best-practices", "text/plain", BEST_PRACTICES),
+}
+
+_RESOURCE_LIST = {
+    "resources": [
+        {
+            "uri": "timesheet://policies/submission",
+            "name": "Timesheet Submission Policy",
+            "description": "Guidelines for timesheet submission and approval",
+            "mimeType": "text/plain"
+        },
+        {
+            "uri": "timesheet://codes/projects",
+            "name": "Project Code Directory",
+            "description": "List of valid project codes and descriptions",
+            "mimeType": "application/json"
+        },
+        {
+            "uri": "timesheet://templates/weekly",
+            "name": "Weekly Timesheet Template",
+            "description": "Standard weekly timesheet template",
+            "mimeType": "text/plain"
+        },
+        {
+            "uri": "timesheet://reports/utilization",
+            "name": "Team Utilization Report",
+            "description": "Current team utilization rates and trends",
+            "mimeType": "application/json"
+        },
+        {
+            "uri": "timesheet://guidelines/best-practices",
+            "name": "Time Tracking Best Practices",
+            "description": "Best practices for accurate time tracking",
+            "mimeType": "text/plain"
+        }
+    ]
+}
+for _entry in _RESOURCE_LIST["resources"]:
+    if _entry["uri"] in STATIC_RESOURCES:
+        _entry["_meta"] = {"version": STATIC_RESOURCES[_entry["uri"]].version}
+RESOURCE_LIST = _StaticBody(_RESOURCE_LIST)
+
+@app.get("/mcp/resources/list")
+def list_resources(http_request: Request):
+    """List all available resources"""
+    return RESOURCE_LIST.response(http_request)
+
+@app.get("/mcp/resources/read")
+def read_resource_conditional(uri: str, http_request: Request):
+    """Read a resource by query string; fixed documents honour If-None-Match."""
+    static = STATIC_RESOURCES.get(uri)
+    if static is not None:
+        return static.response(http_request)
+    return read_resource(ResourceRequest(uri=uri))
+
+@app.post("/mcp/resources/read")
+def read_resource(request: ResourceRequest):
+    """Read a specific resource"""
+    static = STATIC_RESOURCES.get(request.uri)
+    if static is not None:
+        return static.response()
+
+    if request.uri == "timesheet://reports/utilization":
         # Generate utilization report with real or demo data
         try:
             # Attempt to get real employee data
@@ -551,59 +658,5 @@ Manager Approval: _____________  Date: _______"""
             }
             return {"contents": [{"uri": request.uri, "mimeType": "application/json", "text": str(demo_report)}]}
     
-    elif request.uri == "timesheet://guidelines/best-practices":
-        content = """TIME TRACKING BEST PRACTICES
-
-1. CONSISTENCY
-   - Log time daily, not weekly
-   - Use consistent project codes
-   - Maintain regular logging habits
-   - Set daily reminders if needed
-
-2. ACCURACY
-   - Round to nearest 15 minutes
-   - Be honest about actual time spent
-   - Include breaks and interruptions
-   - Track all work-related activities
-
-3. DETAIL LEVEL
-   - Include specific task descriptions
-   - Reference tickets or requirements
-   - Note any blockers or issues
-   - Mention tools or technologies used
-
-4. PROJECT ALLOCATION
-   - Understand client vs. internal time
-   - Ask for clarification on project codes
-   - Split time appropriately across projects
-   - Don't forget administrative tasks
-
-5. QUALITY OVER QUANTITY
-   - Focus on value delivered, not hours logged
-   - Include accomplishments in notes
-   - Track learning and improvement time
-   - Note collaboration and knowledge sharing
-
-6. COMMUNICATION
-   - Discuss unclear time allocation with manager
-   - Report unusual patterns or overtime
-   - Coordinate with team on shared tasks
-   - Provide context for unusual entries
-
-7. TOOLS & EFFICIENCY
-   - Use timer apps for accuracy
-   - Set up project shortcuts
-   - Automate recurring entries where possible
-   - Review and adjust weekly
-
-REMEMBER: Good time tracking helps with:
-- Accurate client billing
-- Project planning and estimation
-- Resource allocation decisions
-- Performance evaluation
-- Work-life balance monitoring"""
-
-        return {"contents": [{"uri": request.uri, "mimeType": "text/plain", "text": content}]}
-    
     else:
         raise HTTPException(status_code=404, detail=f"Resource '{request.uri}' not found")
@@ -1,14 +1,25 @@
 import asyncio
 import os
+import sys
 import logging
 import json
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 import requests
+from urllib.parse import quote
+
+try:
+    from mcp_common.sse import PROTOCOL_VERSIONS, JsonRpcError, SseRegistry
+except ImportError:
+    # Started as a script from this directory inside the repository checkout; appended so
+    # uvicorn's "app:app" still finds this module rather than the checkout's top-level app.py
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from mcp_common.sse import PROTOCOL_VERSIONS, JsonRpcError, SseRegistry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -65,6 +76,13 @@ _default_timesheet_api = (
 )
 TIMESHEET_API_URL = os.getenv("TIMESHEET_API_URL", _default_timesheet_api)
 
+# MCP over SSE (see mcp_common/sse.py): GET /sse opens the stream, JSON-RPC messages
+# are POSTed to /messages?session_id=... and answered on the stream.
+SSE_QUEUE_SIZE = int(os.getenv("TIMESHEET_MCP_SSE_QUEUE_SIZE", "64"))
+SSE_MAX_INFLIGHT = int(os.getenv("TIMESHEET_MCP_SSE_MAX_INFLIGHT", "16"))
+SSE_MAX_CONNECTIONS = int(os.getenv("TIMESHEET_MCP_SSE_MAX_CONNECTIONS", "1000"))
+SSE_IDLE_TIMEOUT_SECONDS = float(os.getenv("TIMESHEET_MCP_SSE_IDLE_TIMEOUT_SECONDS", "300"))
+
 @app.get("/")
 async def root():
     """Root endpoint with server information"""
@@ -75,6 +93,8 @@ async def root():
         "transport": "SSE",
         "endpoints": {
             "sse": "/sse",
+            "messages": "/messages?session_id=...",
+            "sse_metrics": "/sse/metrics",
             "health": "/health",
             "tools": "/mcp/tools/list",
             "prompts": "/mcp/prompts/list",
@@ -97,34 +117,17 @@ async def health_check():
 @app.get("/sse")
 async def sse_endpoint(request: Request):
     """SSE endpoint for MCP communication"""
-    logger.info("SSE connection established")
-    
-    async def event_stream():
-        try:
-            # Send initial hello message
-            yield f"data: {json.dumps({'type': 'hello', 'server': 'Timesheet MCP Server v2', 'version': '2.0.0'})}\n\n"
-            
-            # Keep connection alive with periodic pings
-            counter = 0
-            while True:
-                counter += 1
-                yield f"data: {json.dumps({'type': 'ping', 'timestamp': counter})}\n\n"
-                await asyncio.sleep(30)
-                
-        except Exception as e:
-            logger.error(f"SSE stream error: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-    
-    return StreamingResponse(
-        event_stream(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*"
-        }
-    )
+    return await sse_registry.stream(request, "/messages")
+
+@app.post("/messages")
+async def post_message(request: Request, session_id: str):
+    """JSON-RPC messages for the SSE connection `session_id`; answers arrive on its stream"""
+    return await sse_registry.post(request, session_id)
+
+@app.get("/sse/metrics")
+async def sse_metrics():
+    """Open SSE connections, their in-flight requests and queued messages"""
+    return sse_registry.metrics()
 
 @app.post("/mcp/tools/list")
 async def list_tools():
@@ -138,7 +141,7 @@ async def list_tools():
                 "properties": {
                     "employee_id": {"type": "integer", "description": "Employee ID"},
                     "date": {"type": "string", "description": "Work date (YYYY-MM-DD)"},
-                    "hours": {"type": "number", "description": "Number of hours worked"},
+                    "hours": {"type": "integer", "description": "Number of whole hours worked"},
                     "project": {"type": "string", "description": "Project name or code"},
                     "description": {"type": "string", "description": "Description of work performed"}
                 },
@@ -199,18 +202,18 @@ async def add_timesheet_entry(arguments: Dict[str, Any]) -> Dict[str, Any]:
             if field not in arguments:
                 raise ValueError(f"Missing required field: {field}")
         
-        # Prepare request data
+        # Prepare request data (field names of the Timesheet API's TimesheetEntryCreate)
         entry_data = {
-            "employee_id": arguments["employee_id"],
-            "date": arguments["date"],
-            "hours": float(arguments["hours"]),
+            "entry_date": arguments["date"],
+            "hours": int(arguments["hours"]),
             "project": arguments["project"],
-            "description": arguments["description"]
+            "notes": arguments["description"]
         }
         
         # Make API call
-        response = requests.post(
-            f"{TIMESHEET_API_URL}/timesheet",
+        response = await asyncio.to_thread(
+            requests.post,
+            f"{TIMESHEET_API_URL}/employees/{quote(str(arguments['employee_id']), safe='')}/entries",
             json=entry_data,
             timeout=30
         )
@@ -276,8 +279,9 @@ async def get_timesheet_summary(arguments: Dict[str, Any]) -> Dict[str, Any]:
             "start_date": arguments["start_date"],
             "end_date": arguments["end_date"]
         }
-        response = requests.get(
-            f"{TIMESHEET_API_URL}/timesheet/{arguments['employee_id']}/summary",
+        response = await asyncio.to_thread(
+            requests.get,
+            f"{TIMESHEET_API_URL}/employees/{quote(str(arguments['employee_id']), safe='')}/summary",
             params=params,
             timeout=30
         )
@@ -343,8 +347,9 @@ async def get_project_hours(arguments: Dict[str, Any]) -> Dict[str, Any]:
             "start_date": arguments["start_date"],
             "end_date": arguments["end_date"]
         }
-        response = requests.get(
-            f"{TIMESHEET_API_URL}/project/{arguments['project']}/hours",
+        response = await asyncio.to_thread(
+            requests.get,
+            f"{TIMESHEET_API_URL}/projects/{quote(str(arguments['project']), safe='')}/hours",
             params=params,
             timeout=30
         )
@@ -448,6 +453,42 @@ async def list_resources():
     ]
     return {"resources": [resource.dict() for resource in resources]}
 
+TOOL_HANDLERS = {
+    "add_timesheet_entry": add_timesheet_entry,
+    "get_timesheet_summary": get_timesheet_summary,
+    "get_project_hours": get_project_hours,
+}
+
+async def dispatch(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Result of one JSON-RPC request received over SSE"""
+    if method == "initialize":
+        requested = params.get("protocolVersion")
+        return {
+            "protocolVersion": requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0],
+            # Prompts and resources are only listed over REST (no get/read), so not offered here
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": "Timesheet MCP Server v2", "version": "2.0.0"},
+        }
+    if method == "ping":
+        return {}
+    if method == "tools/list":
+        return await list_tools()
+    if method == "tools/call":
+        handler = TOOL_HANDLERS.get(params.get("name"))
+        if handler is None:
+            raise JsonRpcError(-32602, f"Unknown tool: {params.get('name')}")
+        return await handler(params.get("arguments") or {})
+    raise JsonRpcError(-32601, f"Method not found: {method}")
+
+sse_registry = SseRegistry(
+    dispatch,
+    max_connections=SSE_MAX_CONNECTIONS,
+    max_inflight=SSE_MAX_INFLIGHT,
+    queue_size=SSE_QUEUE_SIZE,
+    idle_timeout_seconds=SSE_IDLE_TIMEOUT_SECONDS,
+    logger=logger,
+)
+
 def main():
     """Main entry point for the web application"""
     port = int(os.getenv("PORT", 8000))
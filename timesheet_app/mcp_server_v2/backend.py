@@ -0,0 +1,169 @@
+"""
+Data access for the Timesheet MCP server.
+
+TIMESHEET_MCP_BACKEND picks how tools reach timesheet data:
+
+* ``http`` (default): calls the Timesheet API at TIMESHEET_API_URL over a
+  pooled keep-alive session.
+* ``direct``: imports ``timesheet_app.api`` and runs the same service
+  functions the API routes use, against the database configured for this
+  process (TIMESHEET_DATABASE_URL and friends), without the HTTP hop.
+
+Both backends return JSON-shaped dicts and lists, and raise BackendError
+when the API would have answered with an error status.
+"""
+
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Optional
+from urllib.parse import quote
+
+import requests
+
+TIMESHEET_MCP_BACKEND = os.getenv("TIMESHEET_MCP_BACKEND", "http").strip().lower()
+
+
+class BackendError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _segment(value: Any) -> str:
+    """``value`` escaped for use as one URL path segment."""
+    return quote(str(value), safe="")
+
+
+class HttpBackend:
+    name = "http"
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def _call(self, method: str, path: str, **kwargs) -> Any:
+        response = self._session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        if response.status_code != 200:
+            raise BackendError(response.status_code, response.text)
+        try:
+            return response.json()
+        except ValueError:
+            raise BackendError(502, f"Invalid JSON in response from timesheet API: {response.text[:200]}")
+
+    def create_entry(self, employee_id: int, data: dict[str, Any]) -> dict[str, Any]:
+        return self._call("POST", f"/employees/{_segment(employee_id)}/entries", json=data)
+
+    def list_entries(self, employee_id: int) -> list[dict[str, Any]]:
+        return self._call("GET", f"/employees/{_segment(employee_id)}/entries")
+
+    def entry_page(self, employee_id: int, start: Optional[date], end: Optional[date],
+                   limit: int, cursor: Optional[str]) -> dict[str, Any]:
+        params = {"start_date": start and start.isoformat(), "end_date": end and end.isoformat(),
+                  "limit": limit, "cursor": cursor}
+        return self._call("GET", f"/employees/{_segment(employee_id)}/entries/page", params=params)
+
+    def employee_summary(self, employee_id: int, start: date, end: date) -> dict[str, Any]:
+        params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+        return self._call("GET", f"/employees/{_segment(employee_id)}/summary", params=params)
+
+    def employee_summaries(self, employee_ids: list[int], start: date, end: date) -> list[dict[str, Any]]:
+        params = {"employee_ids": employee_ids, "start_date": start.isoformat(), "end_date": end.isoformat()}
+        return self._call("GET", "/summaries", params=params)
+
+    def project_hours(self, project: str, start: date, end: date) -> dict[str, Any]:
+        params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+        return self._call("GET", f"/projects/{_segment(project)}/hours", params=params)
+
+    def projects(self) -> dict[str, Any]:
+        return self._call("GET", "/projects")
+
+
+def _import_timesheet_api() -> None:
+    try:
+        import timesheet_app.api  # noqa: F401
+    except ImportError:
+        # Running from timesheet_app/mcp_server_v2 inside the repository checkout
+        sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+class DirectBackend:
+    name = "direct"
+
+    def __init__(self) -> None:
+        _import_timesheet_api()
+        from fastapi import HTTPException
+        from pydantic import ValidationError
+        from timesheet_app.api import db, rollups, schemas, services
+
+        db.ensure_schema()
+        rollups.ensure_built()
+        self._SessionLocal = db.SessionLocal
+        self._schemas = schemas
+        self._services = services
+        self._HTTPException = HTTPException
+        self._ValidationError = ValidationError
+
+    def _run(self, fn: Callable[..., Any], *args: Any, with_db: bool = True) -> Any:
+        """Call a service function, mapping its client errors to BackendError like the API would."""
+        try:
+            if not with_db:
+                return fn(*args)
+            with self._SessionLocal() as session:
+                return fn(session, *args)
+        except self._HTTPException as e:
+            raise BackendError(e.status_code, json.dumps({"detail": e.detail}))
+        except self._ValidationError as e:
+            raise BackendError(422, str(e))
+
+    def _dump(self, model, obj) -> dict[str, Any]:
+        return model.model_validate(obj).model_dump(mode="json")
+
+    def create_entry(self, employee_id: int, data: dict[str, Any]) -> dict[str, Any]:
+        def _create() -> Any:
+            item = self._schemas.TimesheetEntryCreate(**data)
+            return self._dump(self._schemas.TimesheetEntry, self._services.create_entry(employee_id, item))
+        return self._run(_create, with_db=False)
+
+    def list_entries(self, employee_id: int) -> list[dict[str, Any]]:
+        return self._run(lambda db: [
+            self._dump(self._schemas.TimesheetEntry, e) for e in self._services.list_entries(db, employee_id)
+        ])
+
+    def entry_page(self, employee_id: int, start: Optional[date], end: Optional[date],
+                   limit: int, cursor: Optional[str]) -> dict[str, Any]:
+        return self._run(lambda db: self._dump(
+            self._schemas.TimesheetEntryPage,
+            self._services.entry_page(db, employee_id, start, end, limit, cursor),
+        ))
+
+    def employee_summary(self, employee_id: int, start: date, end: date) -> dict[str, Any]:
+        return self._run(lambda db: self._dump(
+            self._schemas.EmployeeHoursSummary, self._services.employee_summary(db, employee_id, start, end)
+        ))
+
+    def employee_summaries(self, employee_ids: list[int], start: date, end: date) -> list[dict[str, Any]]:
+        return self._run(lambda db: [
+            self._dump(self._schemas.EmployeeHoursSummary, s)
+            for s in self._services.employee_summaries(db, employee_ids, start, end)
+        ])
+
+    def project_hours(self, project: str, start: date, end: date) -> dict[str, Any]:
+        return self._run(lambda db: self._dump(
+            self._schemas.ProjectHours, self._services.project_hours(db, project, start, end)
+        ))
+
+    def projects(self) -> dict[str, Any]:
+        return self._run(lambda db: {"projects": [{"code": code} for code in self._services.project_codes(db)]})
+
+
+def make_backend(base_url: str, timeout: float):
+    if TIMESHEET_MCP_BACKEND == "direct":
+        return DirectBackend()
+    if TIMESHEET_MCP_BACKEND != "http":
+        raise ValueError(f"Unknown TIMESHEET_MCP_BACKEND '{TIMESHEET_MCP_BACKEND}', expected 'http' or 'direct'")
+    return HttpBackend(base_url, timeout)
@@ -0,0 +1,236 @@
+"""
+Short-lived cache for read-only tool results.
+
+Agents tend to call the same read tool several times in one conversation
+(check a summary, add an entry, check again). Results are kept per tool
+name and normalized arguments for TIMESHEET_MCP_CACHE_TTL_SECONDS (0
+disables caching), with at most TIMESHEET_MCP_CACHE_MAX_SIZE entries.
+
+Each entry carries tags such as ``employee:42`` or ``project:PROJ-001``.
+Every tag has a generation counter that is part of the entry's key; write
+tools call ``invalidate``, which bumps the counters of the tags they touch.
+Entries stored under an old generation are never read again and age out.
+This also covers a read that was in flight during the write: it stores its
+result under the old generation.
+
+TIMESHEET_MCP_CACHE_URL selects where entries and generations live:
+
+* ``memory`` (default): in this process. Fine for a single worker.
+* ``sqlite:///path/to/cache.db``: a file shared by the workers on one host.
+* ``redis://host:6379/0`` (or ``rediss://``): shared by every instance.
+  Needs the ``redis`` package. Size is bounded by the server's maxmemory
+  policy rather than TIMESHEET_MCP_CACHE_MAX_SIZE.
+
+With several workers or instances, use a shared store. Otherwise a write
+handled by one worker leaves stale entries in the others until they
+expire.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+TIMESHEET_MCP_CACHE_TTL_SECONDS = float(os.getenv("TIMESHEET_MCP_CACHE_TTL_SECONDS", "30"))
+TIMESHEET_MCP_CACHE_MAX_SIZE = int(os.getenv("TIMESHEET_MCP_CACHE_MAX_SIZE", "1024"))
+TIMESHEET_MCP_CACHE_URL = os.getenv("TIMESHEET_MCP_CACHE_URL", "memory").strip()
+
+_NAMESPACE = "timesheet-mcp"
+_MISS = object()
+
+
+class MemoryStore:
+    """Process-local LRU of key -> (expiry, value) plus tag generations."""
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return _MISS
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def generations(self, tags: list[str]) -> list[int]:
+        with self._lock:
+            return [self._generations.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteStore:
+    """Entries and generations in a SQLite file, shared by processes on one host."""
+
+    _PURGE_EVERY = 100
+
+    def __init__(self, path: str, max_size: int) -> None:
+        self._path = path
+        self._max_size = max_size
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_expires ON entries (expires)")
+            conn.execute("CREATE TABLE IF NOT EXISTS generations (tag TEXT PRIMARY KEY, gen INTEGER NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any:
+        row = self._conn().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return _MISS if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self._PURGE_EVERY == 0:
+            conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+            # Over the bound: drop the entries closest to expiry
+            conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+                (self._max_size,),
+            )
+
+    def generations(self, tags: list[str]) -> list[int]:
+        found: dict[str, int] = {}
+        for i in range(0, len(tags), 500):  # stay below SQLite's bound-parameter limit
+            chunk = tags[i:i + 500]
+            found.update(self._conn().execute(
+                f"SELECT tag, gen FROM generations WHERE tag IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return [found.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        self._conn().executemany(
+            "INSERT INTO generations (tag, gen) VALUES (?, 1) ON CONFLICT(tag) DO UPDATE SET gen = gen + 1",
+            [(tag,) for tag in tags],
+        )
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM entries")
+
+
+class RedisStore:
+    """Entries and generations in Redis (or a compatible server), shared by every instance."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("TIMESHEET_MCP_CACHE_URL points at Redis but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(f"{_NAMESPACE}:entry:{key}")
+        return _MISS if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.set(f"{_NAMESPACE}:entry:{key}", json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    def generations(self, tags: list[str]) -> list[int]:
+        if not tags:
+            return []
+        return [int(g or 0) for g in self._client.mget([f"{_NAMESPACE}:gen:{tag}" for tag in tags])]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(f"{_NAMESPACE}:gen:{tag}")
+        pipe.execute()
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{_NAMESPACE}:entry:*"):
+            self._client.delete(key)
+
+
+def make_store(url: str, max_size: int):
+    if url == "memory":
+        return MemoryStore(max_size)
+    if url.startswith("sqlite:///"):
+        return SqliteStore(url[len("sqlite:///"):], max_size)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unknown TIMESHEET_MCP_CACHE_URL '{url}', expected 'memory', 'sqlite:///...' or 'redis://...'")
+
+
+class ToolResultCache:
+    """(tool, args) -> result with a TTL and tag invalidation, on top of a store."""
+
+    def __init__(self, store, ttl: float) -> None:
+        self._store = store
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(tool: str, args: dict[str, Any], tags: list[str], generations: list[int]) -> str:
+        raw = json.dumps([tool, args, tags, generations], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get_or_call(self, tool: str, args: dict[str, Any], tags: Iterable[str], fn: Callable[[], Any]) -> Any:
+        """Return the cached result for ``tool(**args)`` or call ``fn`` and cache what it returns."""
+        if self._ttl <= 0:
+            return fn()
+        tags = sorted(set(tags))
+        key = self._key(tool, args, tags, self._store.generations(tags))
+        result = self._store.get(key)
+        if result is not _MISS:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = fn()  # exceptions propagate and are not cached
+        self._store.set(key, result, self._ttl)
+        return result
+
+    def invalidate(self, *tags: str) -> None:
+        """Make every entry carrying any of ``tags`` unreachable."""
+        self._store.bump(set(tags))
+
+    def clear(self) -> None:
+        self._store.clear()
+
+
+tool_cache = ToolResultCache(make_store(TIMESHEET_MCP_CACHE_URL, TIMESHEET_MCP_CACHE_MAX_SIZE), TIMESHEET_MCP_CACHE_TTL_SECONDS)
+
+
+def employee_tag(employee_id: int) -> str:
+    return f"employee:{employee_id}"
+
+
+def project_tag(project: str) -> str:
+    return f"project:{project}"
@@ -0,0 +1,132 @@
+"""
+Compact tool results.
+
+By default (TIMESHEET_MCP_RESULT_MODE=full) FastMCP sends every tool result
+twice, as ``structuredContent`` and as pretty-printed JSON text. An agent
+pays for both in prompt tokens on each call. With
+TIMESHEET_MCP_RESULT_MODE=compact, the server instead:
+
+* returns one minified JSON text block, with no structured duplicate and no
+  output schema in tools/list;
+* accepts an optional ``fields`` argument on every tool that keeps only
+  those keys, in result objects and in the objects of any list they hold;
+* cuts lists longer than TIMESHEET_MCP_RESULT_MAX_ITEMS and adds a
+  ``next_cursor``. Calling the tool again with the same arguments plus
+  ``cursor`` returns the next page; repeated reads are served from the
+  tool result cache.
+"""
+
+import base64
+import binascii
+import json
+import os
+from typing import Any, Optional, Sequence
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.types import ContentBlock, TextContent, Tool
+
+TIMESHEET_MCP_RESULT_MODE = os.getenv("TIMESHEET_MCP_RESULT_MODE", "full").strip().lower()
+TIMESHEET_MCP_RESULT_MAX_ITEMS = int(os.getenv("TIMESHEET_MCP_RESULT_MAX_ITEMS", "50"))
+
+if TIMESHEET_MCP_RESULT_MODE not in {"full", "compact"}:
+    raise ValueError(f"Unknown TIMESHEET_MCP_RESULT_MODE '{TIMESHEET_MCP_RESULT_MODE}', expected 'full' or 'compact'")
+
+_SHAPING_ARGUMENTS = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only return these keys of each result object (default: all)",
+    },
+    "cursor": {
+        "type": "string",
+        "description": "next_cursor from a previous, truncated result of the same call",
+    },
+}
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["o"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ToolError("Invalid cursor")
+    if not isinstance(offset, int) or offset < 0:
+        raise ToolError("Invalid cursor")
+    return offset
+
+
+def _project(value: Any, fields: set[str]) -> Any:
+    if isinstance(value, list):
+        return [_project(item, fields) for item in value]
+    if isinstance(value, dict):
+        # Lists are containers of result objects: keep them and project their items
+        return {k: _project(v, fields) if isinstance(v, list) else v
+                for k, v in value.items() if k in fields or isinstance(v, list)}
+    return value
+
+
+def shape(data: Any, fields: Optional[Sequence[str]] = None, cursor: Optional[str] = None,
+          max_items: int = TIMESHEET_MCP_RESULT_MAX_ITEMS) -> Any:
+    """Apply field projection and list truncation to a JSON-shaped tool result."""
+    if fields:
+        data = _project(data, set(fields))
+    offset = _decode_cursor(cursor)
+    if isinstance(data, list):
+        data = {"items": data}
+    if not isinstance(data, dict) or max_items <= 0:
+        return data
+    truncated = False
+    out = {}
+    for key, value in data.items():
+        if isinstance(value, list):
+            truncated = truncated or len(value) > offset + max_items
+            value = value[offset:offset + max_items]
+        out[key] = value
+    if truncated:
+        out["next_cursor"] = _encode_cursor(offset + max_items)
+    return out
+
+
+def dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ShapedFastMCP(FastMCP):
+    """FastMCP that shapes tool results according to TIMESHEET_MCP_RESULT_MODE."""
+
+    async def list_tools(self) -> list[Tool]:
+        tools = await super().list_tools()
+        if TIMESHEET_MCP_RESULT_MODE != "compact":
+            return tools
+        shaped = []
+        for tool in tools:
+            schema = dict(tool.inputSchema)
+            schema["properties"] = {**_SHAPING_ARGUMENTS, **schema.get("properties", {})}
+            shaped.append(tool.model_copy(update={"inputSchema": schema, "outputSchema": None}))
+        return shaped
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Sequence[ContentBlock] | dict[str, Any]:
+        if TIMESHEET_MCP_RESULT_MODE != "compact":
+            return await super().call_tool(name, arguments)
+        arguments = dict(arguments)
+        fields = arguments.pop("fields", None)
+        cursor = arguments.pop("cursor", None)
+        result = await super().call_tool(name, arguments)
+        if isinstance(result, tuple):
+            data = result[1]
+            if set(data) == {"result"}:  # FastMCP wraps non-object return values
+                data = data["result"]
+        elif len(result) == 1 and isinstance(result[0], TextContent):
+            try:
+                data = json.loads(result[0].text)
+            except ValueError:
+                return result  # plain prose, nothing to shape
+        else:
+            return result
+        return [TextContent(type="text", text=dumps(shape(data, fields, cursor)))]
@@ -1,11 +1,14 @@
 import asyncio
+import functools
 import json
 import os
 import logging
 from typing import Any, Dict, List, Optional, Union, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import requests
+from requests.adapters import HTTPAdapter
 from mcp.server import Server
 from mcp.types import (
     Resource, Tool, Prompt, TextContent, CallToolRequest, CallToolResult,
@@ -17,6 +20,11 @@ from mcp.server.sse import SseServerTransport
 from mcp.server.stdio import StdioServerTransport
 import argparse
 
+try:
+    from results import TIMESHEET_MCP_RESULT_MODE, dumps, shape  # started as a script from this directory
+except ImportError:
+    from .results import TIMESHEET_MCP_RESULT_MODE, dumps, shape
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("timesheet-mcp-v2")
@@ -24,9 +32,27 @@ logger = logging.getLogger("timesheet-mcp-v2")
 # Environment configuration
 TIMESHEET_API_URL = os.getenv("TIMESHEET_API_URL", "http://localhost:8002")
 
+# The API client is blocking: requests run on a bounded thread pool so a slow call does not
+# stall the event loop (and with it every other session), and each tool may have at most
+# TIMESHEET_MCP_TOOL_CONCURRENCY calls in flight so one busy tool cannot take all the threads.
+API_THREADS = int(os.getenv("TIMESHEET_MCP_API_THREADS", "16"))
+TOOL_CONCURRENCY = int(os.getenv("TIMESHEET_MCP_TOOL_CONCURRENCY", "8"))
+API_TIMEOUT = 30
+
+def _render(heading: str, data: Any) -> str:
+    """Tool result text: heading plus indented JSON, or minified JSON alone in compact mode."""
+    if TIMESHEET_MCP_RESULT_MODE == "compact":
+        return dumps(shape(data))
+    return f"{heading}\n{json.dumps(data, indent=2)}"
+
 class TimesheetMcpServer:
     def __init__(self):
         self.app = Server("timesheet-mcp-v2")
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_maxsize=API_THREADS))
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=API_THREADS))
+        self._executor = ThreadPoolExecutor(max_workers=API_THREADS, thread_name_prefix="timesheet-api")
+        self._tool_limits = {name: asyncio.Semaphore(TOOL_CONCURRENCY) for name in ("add_timesheet_entry", "get_timesheet_summary", "get_project_hours")}
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -45,7 +71,7 @@ class TimesheetMcpServer:
                             "properties": {
                                 "employee_id": {"type": "integer", "description": "Employee ID"},
                                 "date": {"type": "string", "description": "Work date (YYYY-MM-DD)"},
-                                "hours": {"type": "number", "description": "Number of hours worked"},
+                                "hours": {"type": "integer", "description": "Number of whole hours worked"},
                                 "project": {"type": "string", "description": "Project name or code"},
                                 "description": {"type": "string", "description": "Description of work performed"}
                             },
@@ -163,14 +189,14 @@ Description: [Brief description of work performed]
 Instructions:
 1. Fill in all required fields
 2. Ensure date is in YYYY-MM-DD format
-3. Hours should be decimal (e.g., 7.5 for 7 hours 30 minutes)
+3. Hours are whole numbers (e.g., 8)
 4. Use standard project codes or names
 5. Provide clear, concise work description
 6. Submit using the add_timesheet_entry tool
 
 Example:
 - Date: 2024-08-17
-- Hours: 8.0
+- Hours: 8
 - Project: WEB-2024-001
 - Description: Frontend development for user dashboard
 
@@ -439,7 +465,7 @@ TIME TRACKING POLICIES AND PROCEDURES
 1. GENERAL REQUIREMENTS
    - All work time must be accurately recorded
    - Timesheets must be submitted weekly by Friday EOB
-   - Minimum entry: 0.25 hours (15 minutes)
+   - Minimum entry: 1 hour (entries are whole hours)
    - Maximum daily hours: 12 hours (requires approval)
 
 2. PROJECT TIME ALLOCATION
@@ -498,6 +524,12 @@ TIME TRACKING POLICIES AND PROCEDURES
                 logger.error(f"Error reading resource {uri}: {str(e)}")
                 raise McpError(ErrorCode.INTERNAL_ERROR, f"Resource reading failed: {str(e)}")
 
+    async def _api(self, tool: str, method: str, path: str, **kwargs) -> requests.Response:
+        """Send an API request from the thread pool, within the calling tool's concurrency limit"""
+        async with self._tool_limits[tool]:
+            call = functools.partial(self._session.request, method, f"{TIMESHEET_API_URL}{path}", timeout=API_TIMEOUT, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
     async def _add_timesheet_entry(self, arguments: Dict[str, Any]) -> CallToolResult:
         """Add a timesheet entry using the timesheet API"""
         try:
@@ -511,17 +543,13 @@ TIME TRACKING POLICIES AND PROCEDURES
             entry_data = {
                 "employee_id": arguments["employee_id"],
                 "date": arguments["date"],
-                "hours": float(arguments["hours"]),
+                "hours": int(arguments["hours"]),
                 "project": arguments["project"],
                 "description": arguments["description"]
             }
             
             # Make API call
-            response = requests.post(
-                f"{TIMESHEET_API_URL}/timesheet",
-                json=entry_data,
-                timeout=30
-            )
+            response = await self._api("add_timesheet_entry", "POST", "/timesheet", json=entry_data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -529,7 +557,7 @@ TIME TRACKING POLICIES AND PROCEDURES
                     content=[
                         TextContent(
                             type="text",
-                            text=f"Timesheet entry added successfully!\n\nDetails:\n{json.dumps(result, indent=2)}"
+                            text=_render("Timesheet entry added successfully!\n\nDetails:", result)
                         )
                     ]
                 )
@@ -584,10 +612,8 @@ TIME TRACKING POLICIES AND PROCEDURES
                 "start_date": arguments["start_date"],
                 "end_date": arguments["end_date"]
             }
-            response = requests.get(
-                f"{TIMESHEET_API_URL}/timesheet/{arguments['employee_id']}/summary",
-                params=params,
-                timeout=30
+            response = await self._api(
+                "get_timesheet_summary", "GET", f"/timesheet/{arguments['employee_id']}/summary", params=params
             )
             
             if response.status_code == 200:
@@ -596,7 +622,7 @@ TIME TRACKING POLICIES AND PROCEDURES
                     content=[
                         TextContent(
                             type="text",
-                            text=f"Timesheet summary for employee {arguments['employee_id']} ({arguments['start_date']} to {arguments['end_date']}):\n\n{json.dumps(summary_data, indent=2)}"
+                            text=_render(f"Timesheet summary for employee {arguments['employee_id']} ({arguments['start_date']} to {arguments['end_date']}):\n", summary_data)
                         )
                     ]
                 )
@@ -651,10 +677,8 @@ TIME TRACKING POLICIES AND PROCEDURES
                 "start_date": arguments["start_date"],
                 "end_date": arguments["end_date"]
             }
-            response = requests.get(
-                f"{TIMESHEET_API_URL}/project/{arguments['project']}/hours",
-                params=params,
-                timeout=30
+            response = await self._api(
+                "get_project_hours", "GET", f"/project/{arguments['project']}/hours", params=params
             )
             
             if response.status_code == 200:
@@ -663,7 +687,7 @@ TIME TRACKING POLICIES AND PROCEDURES
                     content=[
                         TextContent(
                             type="text",
-                            text=f"Project hours for {arguments['project']} ({arguments['start_date']} to {arguments['end_date']}):\n\n{json.dumps(project_data, indent=2)}"
+                            text=_render(f"Project hours for {arguments['project']} ({arguments['start_date']} to {arguments['end_date']}):\n", project_data)
                         )
                     ]
                 )
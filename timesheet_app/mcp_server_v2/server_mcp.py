@@ -4,11 +4,27 @@ A Model Context Protocol compliant server for timesheet management using FastMCP
 """
 
 import os
+import json
+import hashlib
 import logging
 import requests
+from datetime import date as Date
+from pathlib import Path
 from typing import Dict, Any
-from mcp.server.fastmcp import FastMCP
+import anyio
+import uvicorn
 from pydantic import BaseModel, Field
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+try:
+    from backend import BackendError, make_backend  # started as a script from this directory
+    from cache import employee_tag, project_tag, tool_cache
+    from results import ShapedFastMCP
+except ImportError:
+    from .backend import BackendError, make_backend
+    from .cache import employee_tag, project_tag, tool_cache
+    from .results import ShapedFastMCP
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,10 +37,25 @@ _default_timesheet_api = (
 )
 TIMESHEET_API_URL = os.getenv("TIMESHEET_API_URL", _default_timesheet_api)
 
+# Resource pages stay small enough for model context; the NDJSON export streams bigger pages
+RESOURCE_PAGE_SIZE = int(os.getenv("TIMESHEET_MCP_RESOURCE_PAGE_SIZE", "100"))
+EXPORT_PAGE_SIZE = 500
+
+# Timesheet data source: the Timesheet API over HTTP, or in-process (TIMESHEET_MCP_BACKEND=direct)
+backend = make_backend(TIMESHEET_API_URL, 30)
+
+# Horizontal scaling: with several uvicorn workers (or instances behind a load balancer)
+# consecutive requests of one client land on different processes, so streamable-http runs
+# stateless: no MCP session is kept between requests. Share the tool cache through
+# TIMESHEET_MCP_CACHE_URL so writes invalidate it everywhere.
+WORKERS = max(1, int(os.getenv("TIMESHEET_MCP_WORKERS", "1")))
+STATELESS_HTTP = os.getenv("TIMESHEET_MCP_STATELESS_HTTP", "true" if WORKERS > 1 else "false").strip().lower() in {"1", "true", "yes"}
+
 # Create FastMCP server
-mcp = FastMCP(
+mcp = ShapedFastMCP(
     name="Timesheet Management Server v2",
-    instructions="A comprehensive timesheet management system that allows employees to add timesheet entries, get summaries, and track project hours. This server provides tools for time tracking and reporting."
+    instructions="A comprehensive timesheet management system that allows employees to add timesheet entries, get summaries, and track project hours. This server provides tools for time tracking and reporting.",
+    stateless_http=STATELESS_HTTP,
 )
 
 # Pydantic models for structured responses
@@ -32,7 +63,7 @@ class TimesheetEntry(BaseModel):
     """Timesheet entry response structure."""
     employee_id: int = Field(description="Employee ID")
     date: str = Field(description="Work date (YYYY-MM-DD)")
-    hours: float = Field(description="Number of hours worked")
+    hours: int = Field(description="Number of whole hours worked")
     project: str = Field(description="Project name or code")
     description: str = Field(description="Description of work performed")
     entry_id: str = Field(description="Unique entry identifier")
@@ -59,7 +90,7 @@ class ProjectHours(BaseModel):
 def add_timesheet_entry(
     employee_id: int,
     date: str,
-    hours: float,
+    hours: int,
     project: str,
     description: str
 ) -> TimesheetEntry:
@@ -69,7 +100,7 @@ def add_timesheet_entry(
     Args:
         employee_id: The ID of the employee
         date: Work date in YYYY-MM-DD format
-        hours: Number of hours worked (can be decimal)
+        hours: Number of whole hours worked (the API stores integer hours)
         project: Project name or code
         description: Description of work performed
     
@@ -77,37 +108,32 @@ def add_timesheet_entry(
         TimesheetEntry: Details of the created timesheet entry
     """
     try:
-        # Prepare request data
+        # Field names of the Timesheet API (TimesheetEntryCreate)
         entry_data = {
-            "employee_id": employee_id,
-            "date": date,
-            "hours": float(hours),
+            "entry_date": date,
+            "hours": hours,
             "project": project,
-            "description": description
+            "notes": description
         }
         
-        logger.info(f"Adding timesheet entry: {entry_data}")
+        logger.info(f"Adding timesheet entry for employee {employee_id} via {backend.name} backend: {entry_data}")
         
-        # Make API call
-        response = requests.post(
-            f"{TIMESHEET_API_URL}/timesheet",
-            json=entry_data,
-            timeout=30
+        try:
+            result = backend.create_entry(employee_id, entry_data)
+        except BackendError as e:
+            logger.error(f"Timesheet entry failed: {e.status_code} - {e.detail}")
+            raise Exception(f"Timesheet entry failed: {e.detail}")
+        finally:
+            # Even a failed call may have reached the database (e.g. a timeout)
+            tool_cache.invalidate(employee_tag(employee_id), project_tag(project))
+        return TimesheetEntry(
+            employee_id=employee_id,
+            date=date,
+            hours=hours,
+            project=project,
+            description=description,
+            entry_id=str(result.get("id", "N/A"))
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return TimesheetEntry(
-                employee_id=employee_id,
-                date=date,
-                hours=hours,
-                project=project,
-                description=description,
-                entry_id=result.get("id", "N/A")
-            )
-        else:
-            logger.error(f"Timesheet entry failed: {response.status_code} - {response.text}")
-            raise Exception(f"Timesheet entry failed: {response.text}")
             
     except requests.exceptions.RequestException as e:
         logger.error(f"Network error adding timesheet entry: {e}")
@@ -136,37 +162,83 @@ def get_timesheet_summary(
     try:
         logger.info(f"Getting timesheet summary for employee {employee_id} from {start_date} to {end_date}")
         
-        # Make API call
-        params = {
-            "start_date": start_date,
-            "end_date": end_date
-        }
-        response = requests.get(
-            f"{TIMESHEET_API_URL}/timesheet/{employee_id}/summary",
-            params=params,
-            timeout=30
+        try:
+            start, end = Date.fromisoformat(start_date), Date.fromisoformat(end_date)
+            result = tool_cache.get_or_call(
+                "get_timesheet_summary", {"employee_id": employee_id, "start": start, "end": end},
+                [employee_tag(employee_id)],
+                lambda: backend.employee_summary(employee_id, start, end),
+            )
+        except BackendError as e:
+            logger.error(f"Timesheet summary failed: {e.status_code} - {e.detail}")
+            raise Exception(f"Timesheet summary failed: {e.detail}")
+        return TimesheetSummary(
+            employee_id=employee_id,
+            start_date=start_date,
+            end_date=end_date,
+            total_hours=result.get("total_hours", 0.0),
+            project_breakdown=result.get("project_breakdown", {}),
+            entries_count=result.get("entries_count", 0)
         )
+            
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Network error getting timesheet summary: {e}")
+        raise Exception(f"Network error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error getting timesheet summary: {e}")
+        raise Exception(f"Error getting timesheet summary: {str(e)}")
+
+@mcp.tool()
+def get_timesheet_summaries(
+    employee_ids: list[int],
+    start_date: str,
+    end_date: str
+) -> list[TimesheetSummary]:
+    """
+    Get timesheet summaries for several employees for the same period.
+    Prefer this over repeated get_timesheet_summary calls, e.g. for a whole team.
+    
+    Args:
+        employee_ids: IDs of the employees (up to 500)
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+    
+    Returns:
+        list[TimesheetSummary]: One summary per employee, in the order given
+    """
+    try:
+        ids = list(dict.fromkeys(employee_ids))
+        logger.info(f"Getting timesheet summaries for {len(ids)} employees from {start_date} to {end_date}")
         
-        if response.status_code == 200:
-            result = response.json()
-            return TimesheetSummary(
-                employee_id=employee_id,
+        try:
+            start, end = Date.fromisoformat(start_date), Date.fromisoformat(end_date)
+            results = tool_cache.get_or_call(
+                "get_timesheet_summaries", {"employee_ids": sorted(ids), "start": start, "end": end},
+                [employee_tag(i) for i in ids],
+                lambda: backend.employee_summaries(ids, start, end),
+            )
+        except BackendError as e:
+            logger.error(f"Timesheet summaries failed: {e.status_code} - {e.detail}")
+            raise Exception(f"Timesheet summaries failed: {e.detail}")
+        by_id = {r["employee_id"]: r for r in results}
+        return [
+            TimesheetSummary(
+                employee_id=i,
                 start_date=start_date,
                 end_date=end_date,
-                total_hours=result.get("total_hours", 0.0),
-                project_breakdown=result.get("project_breakdown", {}),
-                entries_count=result.get("entries_count", 0)
+                total_hours=by_id[i].get("total_hours", 0.0),
+                project_breakdown=by_id[i].get("project_breakdown", {}),
+                entries_count=by_id[i].get("entries_count", 0)
             )
-        else:
-            logger.error(f"Timesheet summary failed: {response.status_code} - {response.text}")
-            raise Exception(f"Timesheet summary failed: {response.text}")
+            for i in ids if i in by_id
+        ]
             
     except requests.exceptions.RequestException as e:
-        logger.error(f"Network error getting timesheet summary: {e}")
+        logger.error(f"Network error getting timesheet summaries: {e}")
         raise Exception(f"Network error: {str(e)}")
     except Exception as e:
-        logger.error(f"Error getting timesheet summary: {e}")
-        raise Exception(f"Error getting timesheet summary: {str(e)}")
+        logger.error(f"Error getting timesheet summaries: {e}")
+        raise Exception(f"Error getting timesheet summaries: {str(e)}")
 
 @mcp.tool()
 def get_project_hours(
@@ -188,30 +260,24 @@ def get_project_hours(
     try:
         logger.info(f"Getting project hours for {project} from {start_date} to {end_date}")
         
-        # Make API call
-        params = {
-            "start_date": start_date,
-            "end_date": end_date
-        }
-        response = requests.get(
-            f"{TIMESHEET_API_URL}/project/{project}/hours",
-            params=params,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return ProjectHours(
-                project=project,
-                start_date=start_date,
-                end_date=end_date,
-                total_hours=result.get("total_hours", 0.0),
-                contributors=result.get("contributors", {}),
-                entries_count=result.get("entries_count", 0)
+        try:
+            start, end = Date.fromisoformat(start_date), Date.fromisoformat(end_date)
+            result = tool_cache.get_or_call(
+                "get_project_hours", {"project": project, "start": start, "end": end},
+                [project_tag(project)],
+                lambda: backend.project_hours(project, start, end),
             )
-        else:
-            logger.error(f"Project hours query failed: {response.status_code} - {response.text}")
-            raise Exception(f"Project hours query failed: {response.text}")
+        except BackendError as e:
+            logger.error(f"Project hours query failed: {e.status_code} - {e.detail}")
+            raise Exception(f"Project hours query failed: {e.detail}")
+        return ProjectHours(
+            project=project,
+            start_date=start_date,
+            end_date=end_date,
+            total_hours=result.get("total_hours", 0.0),
+            contributors=result.get("contributors", {}),
+            entries_count=result.get("entries_count", 0)
+        )
             
     except requests.exceptions.RequestException as e:
         logger.error(f"Network error getting project hours: {e}")
@@ -220,30 +286,97 @@ def get_project_hours(
         logger.error(f"Error getting project hours: {e}")
         raise Exception(f"Error getting project hours: {str(e)}")
 
+def _entries_page(employee_id: str, start_date: str | None, end_date: str | None, cursor: str | None) -> str:
+    """One page of an employee's entries as the JSON body of the entries resources."""
+    try:
+        start = Date.fromisoformat(start_date) if start_date else None
+        end = Date.fromisoformat(end_date) if end_date else None
+        page = backend.entry_page(int(employee_id), start, end, RESOURCE_PAGE_SIZE, cursor)
+        base = f"timesheet://employee/{employee_id}/entries"
+        if start_date and end_date:
+            base += f"/{start_date}/{end_date}"
+        next_cursor = page.get("next_cursor")
+        return json.dumps({
+            "items": page["items"],
+            "next_cursor": next_cursor,
+            "next_uri": f"{base}/page/{next_cursor}" if next_cursor else None,
+        })
+    except BackendError:
+        return json.dumps({"error": f"Failed to get entries for employee {employee_id}"})
+    except Exception as e:
+        return json.dumps({"error": f"Error getting entries: {str(e)}"})
+
 @mcp.resource("timesheet://employee/{employee_id}/entries")
 def get_employee_entries(employee_id: str) -> str:
     """
-    Get timesheet entries for a specific employee.
+    Get the most recent timesheet entries for a specific employee.
+    
+    Args:
+        employee_id: Employee ID to get entries for
+    
+    Returns:
+        JSON string with up to TIMESHEET_MCP_RESOURCE_PAGE_SIZE entries, newest
+        first, and next_uri for the following page (null on the last page)
+    """
+    return _entries_page(employee_id, None, None, None)
+
+@mcp.resource("timesheet://employee/{employee_id}/entries/page/{cursor}")
+def get_employee_entries_page(employee_id: str, cursor: str) -> str:
+    """Next page of timesheet://employee/{employee_id}/entries (follow next_uri)."""
+    return _entries_page(employee_id, None, None, cursor)
+
+@mcp.resource("timesheet://employee/{employee_id}/entries/{start_date}/{end_date}")
+def get_employee_entries_window(employee_id: str, start_date: str, end_date: str) -> str:
+    """
+    Get an employee's timesheet entries within a date window.
     
     Args:
         employee_id: Employee ID to get entries for
+        start_date: Window start (YYYY-MM-DD)
+        end_date: Window end (YYYY-MM-DD)
     
     Returns:
-        JSON string containing the employee's timesheet entries
+        JSON string with the first page of matching entries and next_uri
+    """
+    return _entries_page(employee_id, start_date, end_date, None)
+
+@mcp.resource("timesheet://employee/{employee_id}/entries/{start_date}/{end_date}/page/{cursor}")
+def get_employee_entries_window_page(employee_id: str, start_date: str, end_date: str, cursor: str) -> str:
+    """Next page of a date-window entries resource (follow next_uri)."""
+    return _entries_page(employee_id, start_date, end_date, cursor)
+
+@mcp.custom_route("/export/employees/{employee_id}/entries.ndjson", methods=["GET"])
+async def export_employee_entries(request: Request) -> Response:
+    """
+    Full entry history as NDJSON (one entry per line), streamed page by page
+    with chunked transfer encoding. Served next to the MCP endpoint when
+    running over streamable-http or SSE; accepts optional start_date and
+    end_date query parameters.
     """
     try:
-        response = requests.get(
-            f"{TIMESHEET_API_URL}/timesheet/{employee_id}/entries",
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            return response.text
-        else:
-            return f'{{"error": "Failed to get entries for employee {employee_id}"}}'
-            
-    except Exception as e:
-        return f'{{"error": "Error getting entries: {str(e)}"}}'
+        employee_id = int(request.path_params["employee_id"])
+        start_date = request.query_params.get("start_date")
+        end_date = request.query_params.get("end_date")
+        start = Date.fromisoformat(start_date) if start_date else None
+        end = Date.fromisoformat(end_date) if end_date else None
+        # Fetch the first page up front so a bad request gets a proper status code
+        first = await anyio.to_thread.run_sync(backend.entry_page, employee_id, start, end, EXPORT_PAGE_SIZE, None)
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    except BackendError as e:
+        return JSONResponse({"detail": e.detail}, status_code=e.status_code)
+
+    async def _lines():
+        page = first
+        while True:
+            yield "".join(json.dumps(item) + "\n" for item in page["items"])
+            if not page.get("next_cursor"):
+                return
+            page = await anyio.to_thread.run_sync(
+                backend.entry_page, employee_id, start, end, EXPORT_PAGE_SIZE, page["next_cursor"]
+            )
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
 
 @mcp.resource("timesheet://projects")
 def get_project_list() -> str:
@@ -254,26 +387,20 @@ def get_project_list() -> str:
         JSON string containing available projects
     """
     try:
-        response = requests.get(
-            f"{TIMESHEET_API_URL}/projects",
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            return response.text
-        else:
-            # Return default project list if API fails
-            projects = {
-                "projects": [
-                    {"code": "PROJ-001", "name": "Website Redesign", "status": "active"},
-                    {"code": "PROJ-002", "name": "Mobile App Development", "status": "active"},
-                    {"code": "PROJ-003", "name": "Database Migration", "status": "active"},
-                    {"code": "ADMIN", "name": "Administrative Tasks", "status": "active"},
-                    {"code": "TRAINING", "name": "Professional Development", "status": "active"}
-                ]
-            }
-            import json
-            return json.dumps(projects, indent=2)
+        result = backend.projects()
+        if result.get("projects"):
+            return json.dumps(result, indent=2)
+        # Return default project list if no hours are booked yet
+        projects = {
+            "projects": [
+                {"code": "PROJ-001", "name": "Website Redesign", "status": "active"},
+                {"code": "PROJ-002", "name": "Mobile App Development", "status": "active"},
+                {"code": "PROJ-003", "name": "Database Migration", "status": "active"},
+                {"code": "ADMIN", "name": "Administrative Tasks", "status": "active"},
+                {"code": "TRAINING", "name": "Professional Development", "status": "active"}
+            ]
+        }
+        return json.dumps(projects, indent=2)
             
     except Exception as e:
         # Return default project list on error
@@ -284,66 +411,52 @@ def get_project_list() -> str:
             ],
             "error": f"Error getting projects: {str(e)}"
         }
-        import json
         return json.dumps(projects, indent=2)
 
-@mcp.resource("timesheet://policies")
-def get_timesheet_policies() -> str:
-    """
-    Get company timesheet policies and guidelines.
-    
-    Returns:
-        JSON string containing timesheet policies
-    """
-    policies = {
-        "submission_deadline": {
-            "description": "Weekly timesheet submission deadline",
-            "deadline": "Every Friday by 5:00 PM",
-            "late_submission": "Requires manager approval"
-        },
-        "minimum_time_unit": {
-            "description": "Minimum time that can be logged",
-            "unit": "0.25 hours (15 minutes)",
-            "rounding": "Round to nearest quarter hour"
-        },
-        "project_codes": {
-            "description": "How to use project codes",
-            "format": "Use official project codes from the project list",
-            "requirement": "All entries must have valid project codes"
-        },
-        "description_requirements": {
-            "description": "Description field requirements",
-            "minimum_length": "At least 10 characters describing work performed",
-            "examples": ["Developed user authentication module", "Client meeting for requirements gathering"]
-        },
-        "corrections": {
-            "description": "How to correct timesheet entries",
-            "same_week": "Can edit entries for current week",
-            "previous_weeks": "Requires manager approval for changes"
-        }
+# ---------------------------------------------------------------------------
+# Static resources and prompts
+#
+# These never depend on request data, so their text is built once at import
+# and every read returns the same string. STATIC_VERSIONS holds a content hash
+# per URI / prompt name; clients can read timesheet://manifest and only
+# refetch entries whose version changed.
+# ---------------------------------------------------------------------------
+
+TIMESHEET_POLICIES = {
+    "submission_deadline": {
+        "description": "Weekly timesheet submission deadline",
+        "deadline": "Every Friday by 5:00 PM",
+        "late_submission": "Requires manager approval"
+    },
+    "minimum_time_unit": {
+        "description": "Minimum time that can be logged",
+        "unit": "1 hour",
+        "rounding": "Round to the nearest whole hour"
+    },
+    "project_codes": {
+        "description": "How to use project codes",
+        "format": "Use official project codes from the project list",
+        "requirement": "All entries must have valid project codes"
+    },
+    "description_requirements": {
+        "description": "Description field requirements",
+        "minimum_length": "At least 10 characters describing work performed",
+        "examples": ["Developed user authentication module", "Client meeting for requirements gathering"]
+    },
+    "corrections": {
+        "description": "How to correct timesheet entries",
+        "same_week": "Can edit entries for current week",
+        "previous_weeks": "Requires manager approval for changes"
     }
-    
-    import json
-    return json.dumps(policies, indent=2)
+}
+TIMESHEET_POLICIES_JSON = json.dumps(TIMESHEET_POLICIES, indent=2)
 
-@mcp.prompt()
-def timesheet_entry_template(employee_name: str, project: str = "PROJ-001") -> str:
-    """
-    Generate a timesheet entry template.
-    
-    Args:
-        employee_name: Name of the employee
-        project: Project code or name
-    
-    Returns:
-        A formatted timesheet entry template
-    """
-    return f"""
+TIMESHEET_ENTRY_TEMPLATE = """
 Timesheet Entry Template for {employee_name}
 
 Date: [YYYY-MM-DD]
 Project: {project}
-Hours: [Number of hours worked, e.g., 8.0 or 7.5]
+Hours: [Number of whole hours worked, e.g., 8]
 Description: [Detailed description of work performed]
 
 Examples of good descriptions:
@@ -353,21 +466,13 @@ Examples of good descriptions:
 - "Database schema design and optimization for reporting module"
 
 Remember:
-- Use quarter-hour increments (0.25, 0.5, 0.75, etc.)
+- Log whole hours; round partial hours
 - Be specific about what work was accomplished
 - Include project context where relevant
 - Submit by Friday 5:00 PM for the current week
     """
 
-@mcp.prompt()
-def timesheet_reporting_guide() -> str:
-    """
-    Generate a guide for timesheet reporting and best practices.
-    
-    Returns:
-        A comprehensive guide for timesheet reporting
-    """
-    return """
+TIMESHEET_REPORTING_GUIDE = """
 Timesheet Reporting Best Practices Guide
 
 1. DAILY TRACKING
@@ -386,7 +491,7 @@ Timesheet Reporting Best Practices Guide
    - Mention deliverables, meetings, or milestones achieved
 
 4. TIME ACCURACY
-   - Round to nearest quarter hour (0.25 increments)
+   - Round to the nearest whole hour (entries are stored as integer hours)
    - Account for all work time including meetings and calls
    - Don't forget to log time for code reviews and documentation
 
@@ -403,20 +508,103 @@ Timesheet Reporting Best Practices Guide
 For questions about timesheet policies or procedures, contact your direct manager or HR department.
     """
 
+
+def _version(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+STATIC_VERSIONS = {
+    "resources": {
+        "timesheet://policies": {"version": _version(TIMESHEET_POLICIES_JSON), "size": len(TIMESHEET_POLICIES_JSON.encode())},
+    },
+    "prompts": {
+        "timesheet_entry_template": {"version": _version(TIMESHEET_ENTRY_TEMPLATE)},
+        "timesheet_reporting_guide": {"version": _version(TIMESHEET_REPORTING_GUIDE)},
+    },
+}
+STATIC_MANIFEST_JSON = json.dumps(STATIC_VERSIONS, indent=2)
+
+@mcp.resource("timesheet://manifest")
+def get_static_manifest() -> str:
+    """
+    Get content versions of the static resources and prompts.
+
+    Returns:
+        JSON string mapping each static resource URI and prompt name to a
+        content hash; an unchanged version means a cached copy is current.
+    """
+    return STATIC_MANIFEST_JSON
+
+@mcp.resource("timesheet://policies")
+def get_timesheet_policies() -> str:
+    """
+    Get company timesheet policies and guidelines.
+    
+    Returns:
+        JSON string containing timesheet policies
+    """
+    return TIMESHEET_POLICIES_JSON
+
+@mcp.prompt()
+def timesheet_entry_template(employee_name: str, project: str = "PROJ-001") -> str:
+    """
+    Generate a timesheet entry template.
+    
+    Args:
+        employee_name: Name of the employee
+        project: Project code or name
+    
+    Returns:
+        A formatted timesheet entry template
+    """
+    return TIMESHEET_ENTRY_TEMPLATE.replace("{employee_name}", employee_name).replace("{project}", project)
+
+@mcp.prompt()
+def timesheet_reporting_guide() -> str:
+    """
+    Generate a guide for timesheet reporting and best practices.
+    
+    Returns:
+        A comprehensive guide for timesheet reporting
+    """
+    return TIMESHEET_REPORTING_GUIDE
+
 def main():
     """Main entry point for the MCP server."""
     port = int(os.getenv("PORT", 8000))
     
     logger.info(f"Starting Timesheet MCP Server v2 on port {port}")
-    logger.info(f"Timesheet API URL: {TIMESHEET_API_URL}")
+    logger.info(f"Timesheet backend: {backend.name}")
+    if backend.name == "http":
+        logger.info(f"Timesheet API URL: {TIMESHEET_API_URL}")
     logger.info(f"Server name: {mcp.name}")
     
     # Configure server settings
     mcp.settings.host = "0.0.0.0"
     mcp.settings.port = port
     
+    if WORKERS > 1:
+        if not STATELESS_HTTP:
+            logger.warning("TIMESHEET_MCP_STATELESS_HTTP=false with several workers: clients must stick to one worker")
+        logger.info(f"Workers: {WORKERS} (stateless HTTP: {STATELESS_HTTP})")
+        # Each worker imports this module and builds its own app through http_app()
+        uvicorn.run(
+            f"{Path(__file__).stem}:http_app",
+            factory=True,
+            app_dir=str(Path(__file__).resolve().parent),
+            host=mcp.settings.host,
+            port=port,
+            workers=WORKERS,
+            log_level=mcp.settings.log_level.lower(),
+        )
+        return
+
     # Run the server with Streamable HTTP transport for better MCP Inspector compatibility
     mcp.run(transport="streamable-http")
 
+def http_app():
+    """Streamable-HTTP ASGI app, for uvicorn workers (``--factory server_mcp:http_app``)."""
+    return mcp.streamable_http_app()
+
 if __name__ == "__main__":
     main()
@@ -2,7 +2,9 @@
 CREATE TABLE dbo.employees (
   id INT IDENTITY(1,1) PRIMARY KEY,
   name NVARCHAR(200) NOT NULL,
-  email NVARCHAR(200) NOT NULL UNIQUE
+  email NVARCHAR(200) NOT NULL UNIQUE,
+  updated_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+  row_version INT NOT NULL DEFAULT 1
 );
 
 CREATE TABLE dbo.timesheet_entries (
@@ -12,8 +14,42 @@ CREATE TABLE dbo.timesheet_entries (
   hours INT NOT NULL,
   project NVARCHAR(200) NULL,
   notes NVARCHAR(1000) NULL,
+  updated_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+  row_version INT NOT NULL DEFAULT 1,
   CONSTRAINT FK_timesheet_entries_employee FOREIGN KEY (employee_id) REFERENCES dbo.employees(id)
 );
 
 CREATE INDEX IX_timesheet_employee ON dbo.timesheet_entries(employee_id);
 CREATE INDEX IX_timesheet_date ON dbo.timesheet_entries(entry_date);
+
+-- Change feeds (?since=) scan these in (updated_at, id) order
+CREATE INDEX ix_employees_sync ON dbo.employees(updated_at, id);
+CREATE INDEX ix_timesheet_entries_sync ON dbo.timesheet_entries(updated_at, id);
+
+CREATE TABLE dbo.timesheet_entry_tombstones (
+  entry_id INT NOT NULL PRIMARY KEY,
+  employee_id INT NOT NULL,
+  deleted_at DATETIME2 NOT NULL
+);
+CREATE INDEX ix_timesheet_entry_tombstones_sync ON dbo.timesheet_entry_tombstones(deleted_at, entry_id);
+
+-- Rollups maintained by the API (rebuild with POST /reports/rollups/rebuild after bulk SQL loads)
+CREATE TABLE dbo.timesheet_daily_rollups (
+  employee_id INT NOT NULL,
+  day DATE NOT NULL,
+  project NVARCHAR(200) NOT NULL,
+  hours INT NOT NULL DEFAULT 0,
+  entry_count INT NOT NULL DEFAULT 0,
+  CONSTRAINT PK_timesheet_daily_rollups PRIMARY KEY (employee_id, day, project)
+);
+
+CREATE INDEX ix_timesheet_daily_rollups_project_day ON dbo.timesheet_daily_rollups(project, day);
+
+CREATE TABLE dbo.timesheet_project_week_rollups (
+  project NVARCHAR(200) NOT NULL,
+  week_start DATE NOT NULL,
+  employee_id INT NOT NULL,
+  hours INT NOT NULL DEFAULT 0,
+  entry_count INT NOT NULL DEFAULT 0,
+  CONSTRAINT PK_timesheet_project_week_rollups PRIMARY KEY (project, week_start, employee_id)
+);
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Point the API at a throwaway SQLite database before timesheet_app.api.db is imported
+_tmp = tempfile.mkdtemp(prefix="timesheet-tests-")
+os.environ.setdefault("TIMESHEET_DATABASE_URL", f"sqlite:///{_tmp}/timesheet.db")
+os.environ.setdefault("TIMESHEET_SEED_ON_START", "false")
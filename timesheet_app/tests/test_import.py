@@ -0,0 +1,90 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from timesheet_app.api import db
+from timesheet_app.api.main import app
+
+
+@pytest.fixture
+def client():
+    db.Base.metadata.drop_all(bind=db.engine)
+    db.Base.metadata.create_all(bind=db.engine)
+    with TestClient(app) as client:
+        yield client
+
+
+def _employee(client) -> int:
+    created = client.post("/employees", json={"name": "Ada Lovelace", "email": "ada@example.com"})
+    assert created.status_code == 200
+    return created.json()["id"]
+
+
+def _import(client, body: str, content_type: str = "text/csv", **params):
+    response = client.post("/entries/import", content=body.encode(), headers={"Content-Type": content_type}, params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_quoted_csv_field_may_span_lines(client):
+    emp = _employee(client)
+    body = (
+        "employee_id,entry_date,hours,project,notes\n"
+        f'{emp},2025-02-03,8,PROJ001,"Design review\n""followed"" by fixes"\n'
+        f"{emp},2025-02-04,6,PROJ001,\n"
+    )
+    result = _import(client, body)
+    assert (result["inserted"], result["failed"]) == (2, 0)
+    assert result["committed"] == [{"first_line": 2, "last_line": 4, "inserted": 2}]
+
+    notes = [e["notes"] for e in client.get(f"/employees/{emp}/entries").json()]
+    assert sorted(notes, key=str) == ['Design review\n"followed" by fixes', None]
+
+
+def test_bad_rows_are_reported_by_line_and_skipped(client):
+    emp = _employee(client)
+    body = (
+        "employee_id,entry_date,hours,project\n"
+        f"{emp},2025-02-03,8,PROJ001\n"
+        f"{emp},2025-02-04,0,PROJ001\n"
+        f"{emp},2025-02-05,25,PROJ001\n"
+        f"{emp},not-a-date,8,PROJ001\n"
+        "999,2025-02-06,8,PROJ001\n"
+        f"{emp},2025-02-07,8\n"
+        f"{emp},2025-02-07,7,PROJ001\n"
+    )
+    result = _import(client, body)
+    assert (result["inserted"], result["failed"]) == (2, 5)
+    assert [e["line"] for e in result["errors"]] == [3, 4, 5, 6, 7]
+    assert "employee 999 not found" in result["errors"][3]["error"]
+    assert "expected 4 columns" in result["errors"][4]["error"]
+
+
+def test_committed_ranges_follow_the_chunks(client, monkeypatch):
+    from timesheet_app.api import main
+
+    monkeypatch.setattr(main, "IMPORT_CHUNK_SIZE", 2)
+    emp = _employee(client)
+    rows = [f'{{"employee_id": {emp}, "entry_date": "2025-02-0{d}", "hours": {d}}}' for d in range(3, 8)]
+    # Blank line and a bad row in the middle of the second chunk
+    body = "\n".join(rows[:3] + ["", '{"employee_id": 999, "entry_date": "2025-02-08", "hours": 1}'] + rows[3:])
+    result = _import(client, body, "application/x-ndjson")
+    assert (result["inserted"], result["failed"]) == (5, 1)
+    assert result["committed"] == [
+        {"first_line": 1, "last_line": 2, "inserted": 2},
+        {"first_line": 3, "last_line": 6, "inserted": 2},
+        {"first_line": 7, "last_line": 7, "inserted": 1},
+    ]
+
+
+def test_unusable_header_is_rejected(client):
+    response = client.post("/entries/import", content=b"employee_id,hours\n1,8\n", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 400
+    assert "entry_date" in response.json()["detail"]
+
+
+def test_single_entry_post_keeps_its_unbounded_hours(client):
+    # Only the importer bounds hours to 1-24
+    emp = _employee(client)
+    created = client.post(f"/employees/{emp}/entries", json={"entry_date": "2025-02-03", "hours": 0})
+    assert created.status_code == 200
+    assert created.json()["hours"] == 0
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mcp_common.sse import SseRegistry
+from timesheet_app.mcp_server_v2 import app as webapp
+
+IDLE_TIMEOUT = 0.6
+
+
+async def _dispatch(method, params):
+    if method == "slow":
+        await asyncio.sleep(0.3)
+        return {"slow": True}
+    return await webapp.dispatch(method, params)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = SseRegistry(
+        _dispatch, max_connections=1, max_inflight=1, queue_size=8,
+        idle_timeout_seconds=IDLE_TIMEOUT, poll_seconds=0.05,
+    )
+    monkeypatch.setattr(webapp, "sse_registry", registry)
+    return registry
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _events(body: str) -> list[tuple[str, str]]:
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], fields["data"]))
+    return events
+
+
+def test_sse_stream_limits_and_idle_eviction(registry):
+    with TestClient(webapp.app) as client:
+        # The test client returns a streamed body only once the stream ends, so read it in a thread
+        streams = {}
+        reader = threading.Thread(target=lambda: streams.setdefault("first", client.get("/sse")))
+        reader.start()
+        _wait_for(lambda: registry.sessions)
+        (session_id,) = registry.sessions
+
+        rejected = client.get("/sse")
+        assert rejected.status_code == 503
+        assert "Retry-After" in rejected.headers
+
+        url = f"/messages?session_id={session_id}"
+        assert client.post(url, json={"jsonrpc": "2.0", "id": 1, "method": "slow"}).status_code == 202
+        busy = client.post(url, json={"jsonrpc": "2.0", "id": 2, "method": "ping"})
+        assert busy.status_code == 429
+        assert busy.headers["Retry-After"] == "1"
+
+        _wait_for(lambda: not registry.sessions[session_id].tasks)
+        assert client.post(url, json={"jsonrpc": "2.0", "id": 3, "method": "ping"}).status_code == 202
+
+        # No traffic from here on: the stream is closed once it has been idle long enough
+        reader.join(timeout=IDLE_TIMEOUT + 5)
+        assert not reader.is_alive()
+        events = _events(streams["first"].text)
+        assert events[0] == ("endpoint", url)
+        assert [json.loads(data) for kind, data in events[1:]] == [
+            {"jsonrpc": "2.0", "id": 1, "result": {"slow": True}},
+            {"jsonrpc": "2.0", "id": 3, "result": {}},
+        ]
+
+        assert registry.sessions == {}
+        assert client.post(url, json={"jsonrpc": "2.0", "id": 4, "method": "ping"}).status_code == 404
+        metrics = client.get("/sse/metrics").json()
+        assert metrics["opened_total"] == 1
+        assert metrics["rejected_total"] == 1
+        assert metrics["closed_idle_total"] == 1
+        assert metrics["open_connections"] == 0
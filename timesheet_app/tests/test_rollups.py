@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from timesheet_app.api import db, models, rollups
+from timesheet_app.api.main import app
+
+WEEK = "2025-02-03"  # a Monday
+
+
+@pytest.fixture
+def client():
+    db.Base.metadata.drop_all(bind=db.engine)
+    db.Base.metadata.create_all(bind=db.engine)
+    with TestClient(app) as client:
+        yield client
+
+
+def _employee(client, email: str = "ada@example.com") -> int:
+    created = client.post("/employees", json={"name": "Ada Lovelace", "email": email})
+    assert created.status_code == 200
+    return created.json()["id"]
+
+
+def _rollup_rows() -> tuple[list[tuple], list[tuple]]:
+    D, W = models.DailyHoursRollup, models.ProjectWeekRollup
+    with db.SessionLocal() as session:
+        daily = session.execute(
+            select(D.employee_id, D.day, D.project, D.hours, D.entry_count).order_by(D.employee_id, D.day, D.project)
+        ).all()
+        weekly = session.execute(
+            select(W.project, W.week_start, W.employee_id, W.hours, W.entry_count).order_by(W.project, W.week_start, W.employee_id)
+        ).all()
+    return [tuple(r) for r in daily], [tuple(r) for r in weekly]
+
+
+def _assert_matches_rebuild() -> tuple[list[tuple], list[tuple]]:
+    incremental = _rollup_rows()
+    db.run_write(rollups.rebuild)
+    assert _rollup_rows() == incremental
+    return incremental
+
+
+def test_rollups_follow_inserts_updates_and_deletes(client):
+    ada, bob = _employee(client), _employee(client, "bob@example.com")
+
+    # Single-entry inserts, one without a project
+    client.post(f"/employees/{ada}/entries", json={"entry_date": WEEK, "hours": 3, "project": "PROJ001"})
+    client.post(f"/employees/{ada}/entries", json={"entry_date": WEEK, "hours": 2, "project": "PROJ001"})
+    client.post(f"/employees/{bob}/entries", json={"entry_date": "2025-02-04", "hours": 5})
+    daily, weekly = _assert_matches_rebuild()
+    assert (ada, date(2025, 2, 3), "PROJ001", 5, 2) in daily
+    assert ("", date(2025, 2, 3), bob, 5, 1) in weekly
+
+    # Bulk import (Core inserts) across two weeks
+    body = f"employee_id,entry_date,hours,project\n{bob},2025-02-07,8,OPS\n{bob},2025-02-10,4,OPS\n"
+    assert client.post("/entries/import", content=body.encode(), headers={"Content-Type": "text/csv"}).json()["inserted"] == 2
+    _assert_matches_rebuild()
+
+    # Week grid save: collapses Monday's two entries (update + delete), adds Tuesday
+    saved = client.put(f"/employees/{ada}/weeks/{WEEK}", json={"rows": [{"project": "PROJ001", "hours": [6, 4, 0, 0, 0, 0, 0]}]})
+    assert saved.json()["changes"] == {"inserted": 1, "updated": 1, "deleted": 1}
+    daily, _ = _assert_matches_rebuild()
+    assert (ada, date(2025, 2, 3), "PROJ001", 6, 1) in daily
+
+    # Week grid save that clears everything removes the rollup rows too
+    client.put(f"/employees/{ada}/weeks/{WEEK}", json={"rows": []})
+    daily, weekly = _assert_matches_rebuild()
+    assert all(row[0] != ada for row in daily)
+    assert all(row[2] != ada for row in weekly)
+
+
+def test_moving_an_expired_entry_updates_both_rollup_rows(client):
+    emp = _employee(client)
+    entry_id = client.post(f"/employees/{emp}/entries", json={"entry_date": WEEK, "hours": 8, "project": "PROJ001"}).json()["id"]
+
+    def _move(session):
+        entry = session.get(models.TimesheetEntry, entry_id)
+        session.expire(entry)
+        # Assigned without loading first: the old values come from the database
+        entry.project = "OPS"
+        entry.entry_date = date(2025, 2, 10)
+        entry.hours = 6
+
+    db.run_write(_move)
+    daily, weekly = _assert_matches_rebuild()
+    assert daily == [(emp, date(2025, 2, 10), "OPS", 6, 1)]
+    assert weekly == [("OPS", date(2025, 2, 10), emp, 6, 1)]
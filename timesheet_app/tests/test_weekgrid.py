@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from timesheet_app.api import db
+from timesheet_app.api.main import app
+
+WEEK = "2025-02-03"  # a Monday
+
+
+@pytest.fixture
+def client():
+    db.Base.metadata.drop_all(bind=db.engine)
+    db.Base.metadata.create_all(bind=db.engine)
+    with TestClient(app) as client:
+        yield client
+
+
+def _employee(client) -> int:
+    created = client.post("/employees", json={"name": "Ada Lovelace", "email": "ada@example.com"})
+    assert created.status_code == 200
+    return created.json()["id"]
+
+
+def _put(client, emp: int, rows: list[dict], week: str = WEEK):
+    return client.put(f"/employees/{emp}/weeks/{week}", json={"rows": rows})
+
+
+def test_save_inserts_updates_and_deletes_only_changed_cells(client):
+    emp = _employee(client)
+    first = _put(client, emp, [
+        {"project": "PROJ001", "hours": [8, 8, 0, 0, 0, 0, 0]},
+        {"project": "OPS", "hours": [0, 0, 4, 0, 0, 0, 0]},
+    ])
+    assert first.status_code == 200
+    assert first.json()["changes"] == {"inserted": 3, "updated": 0, "deleted": 0}
+
+    # Mon unchanged, Tue updated, OPS Wed cleared, Thu added; OPS is dropped from the grid
+    second = _put(client, emp, [{"project": "PROJ001", "hours": [8, 6, 0, 7, 0, 0, 0]}])
+    assert second.status_code == 200
+    grid = second.json()
+    assert grid["changes"] == {"inserted": 1, "updated": 1, "deleted": 1}
+    assert grid["rows"] == [{"project": "PROJ001", "hours": [8, 6, 0, 7, 0, 0, 0]}]
+    assert grid["daily_totals"] == [8, 6, 0, 7, 0, 0, 0]
+    assert grid["total"] == 21
+
+    # Any day of the week addresses the same grid
+    read = client.get(f"/employees/{emp}/weeks/2025-02-06").json()
+    assert read["week_start"] == WEEK
+    assert read["rows"] == grid["rows"]
+    assert len(client.get(f"/employees/{emp}/entries").json()) == 3
+
+
+def test_duplicate_entries_in_a_cell_collapse_into_one(client):
+    emp = _employee(client)
+    for hours in (3, 2):
+        client.post(f"/employees/{emp}/entries", json={"entry_date": WEEK, "hours": hours, "project": "PROJ001"})
+    assert client.get(f"/employees/{emp}/weeks/{WEEK}").json()["rows"][0]["hours"][0] == 5
+
+    saved = _put(client, emp, [{"project": "PROJ001", "hours": [6, 0, 0, 0, 0, 0, 0]}])
+    assert saved.json()["changes"] == {"inserted": 0, "updated": 1, "deleted": 1}
+    assert [e["hours"] for e in client.get(f"/employees/{emp}/entries").json()] == [6]
+
+
+def test_daily_total_across_projects_is_capped(client):
+    emp = _employee(client)
+    too_much = _put(client, emp, [
+        {"project": "PROJ001", "hours": [0, 0, 16, 0, 0, 0, 0]},
+        {"project": "OPS", "hours": [0, 0, 9, 0, 0, 0, 0]},
+    ])
+    assert too_much.status_code == 422
+    assert "Wednesday totals 25 hours" in str(too_much.json()["detail"])
+    assert _put(client, emp, [{"project": "OPS", "hours": [25, 0, 0, 0, 0, 0, 0]}]).status_code == 422
+    assert client.get(f"/employees/{emp}/entries").json() == []
+
+    at_cap = _put(client, emp, [
+        {"project": "PROJ001", "hours": [0, 0, 16, 0, 0, 0, 0]},
+        {"project": "OPS", "hours": [0, 0, 8, 0, 0, 0, 0]},
+    ])
+    assert at_cap.status_code == 200
+    assert at_cap.json()["daily_totals"][2] == 24
+
+
+def test_unknown_employee(client):
+    assert client.get(f"/employees/999/weeks/{WEEK}").status_code == 404
+    assert _put(client, 999, []).status_code == 404